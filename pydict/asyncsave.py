@@ -0,0 +1,111 @@
+import logging
+import threading
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence, XmlSaveMode
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDictMdlSaver(object):
+    """Saves point-in-time snapshots of a dictionary model on a worker thread.
+
+    save() only takes the snapshot (a copy of the guid -> word mapping), the serialisation and
+    the atomic write run on the worker. The words edited after save() go into the next save.
+    When save() is called again while a save is running, only the latest snapshot is written
+    after it, the earlier pending one is dropped.
+
+    The result is reported by the save_finished and save_failed signals of the model, and by
+    the optional on_finished callback (called on the worker thread with the path after a
+    successful save). An exception of on_finished is logged, the save is reported as finished.
+    """
+
+    def __init__(self, dictmdl: DictModel, path: str, dmpclass: type = XmlDictMdlPersistence, on_finished: object = None,
+                 **dmpkwargs):
+        super().__init__()
+        self.dictmdl = dictmdl
+        self.path = path
+        self._dmpclass = dmpclass
+        self._dmpkwargs = dmpkwargs
+        self._on_finished = on_finished
+        self._lock = threading.Lock()
+        self._pending = None
+        self._worker = None
+        self._idle = threading.Event()
+        self._idle.set()
+
+        if (dmpclass is XmlDictMdlPersistence) and ('save_mode' not in dmpkwargs):
+            self._dmpkwargs['save_mode'] = XmlSaveMode.STREAMING
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        assert isinstance(value, str), 'The path property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, str.__name__)
+        self._path = value
+
+    @property
+    def saving(self) -> bool:
+        return not self._idle.is_set()
+
+
+    def save(self) -> bool:
+        """Requests a save of the current model state, returns False if it was coalesced into a pending one."""
+        snapshot = self.dictmdl.snapshot()
+        with self._lock:
+            coalesced = self._pending is not None
+            self._pending = snapshot
+            if self._worker is None:
+                self._idle.clear()
+                self._worker = threading.Thread(target = self._run, name = 'AsyncDictMdlSaver')
+                self._worker.start()
+        return not coalesced
+
+
+    def wait(self, timeout: float = None) -> bool:
+        """Waits until every requested save is finished, returns False on timeout."""
+        return self._idle.wait(timeout)
+
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                snapshot = self._pending
+                self._pending = None
+                if snapshot is None:
+                    self._worker = None
+                    self._idle.set()
+                    return
+
+            try:
+                self._save_snapshot(snapshot)
+            except Exception as ex:
+                logger.exception('The background save of {} failed.'.format(self.path))
+                self.dictmdl.save_failed.emit(self.path, str(ex))
+                continue
+
+            # The file is saved even if the callback fails, so it is not reported as a failed save.
+            if self._on_finished is not None:
+                try:
+                    self._on_finished(self.path)
+                except Exception:
+                    logger.exception('The on_finished callback of the background save of {} failed.'.format(self.path))
+            self.dictmdl.save_finished.emit(self.path)
+
+
+    def _save_snapshot(self, snapshot: DictModel) -> None:
+        dmp = self._dmpclass(dictmdl = snapshot, path = self.path, **self._dmpkwargs)
+        dmp.save_dict()
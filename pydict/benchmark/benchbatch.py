@@ -0,0 +1,44 @@
+import sys
+import time
+from benchmark.benchutil import create_noun
+from dictmdl import DictModel
+from qtdictmdl import WordListModel
+
+WORDCNT_LIST = (50000,)
+# The words of the model before the measured changes.
+BASE_WORDCNT = 10000
+
+
+def measure(wordcnt: int, batch_en: bool) -> tuple:
+    """Returns the time of adding and of removing wordcnt words with a WordListModel attached."""
+    dictmdl = DictModel()
+    dictmdl.add_words(create_noun(guid) for guid in range(BASE_WORDCNT))
+    wlsmdl = WordListModel(dictmdl)
+    words = [create_noun(guid) for guid in range(BASE_WORDCNT, BASE_WORDCNT + wordcnt)]
+
+    time_start = time.perf_counter()
+    if batch_en:
+        dictmdl.add_words(words)
+    else:
+        for word in words:
+            dictmdl.add_word(word)
+    added = time.perf_counter()
+    if batch_en:
+        dictmdl.remove_words([word.guid for word in words])
+    else:
+        for word in words:
+            dictmdl.remove_word(word.guid)
+    removed = time.perf_counter()
+    assert wlsmdl.rowCount() == BASE_WORDCNT
+    return added - time_start, removed - added
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        for name, batch_en in (('word by word', False), ('batch', True)):
+            addtime, removetime = measure(wordcnt, batch_en)
+            print('{:<24} {:>9} words {:>9.3f} s add {:>9.3f} s remove'.format(name, wordcnt, addtime, removetime))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
@@ -0,0 +1,66 @@
+import gc
+import sys
+import time
+import tracemalloc
+from benchmark.benchutil import create_noun
+from dictmdl import DictModel
+from columnardictmdl import ColumnarDictModel
+from language.word import WordClass
+from language.article import GrammaticalGender
+
+WORDCNT_LIST = (1000000,)
+REPEAT_CNT = 5
+
+
+def create_models(wordcnt: int) -> tuple:
+    """Returns the object and the columnar model of the same words and their allocated bytes."""
+    tracemalloc.start()
+    dictmdl = DictModel(event_en = False)
+    for guid in range(wordcnt):
+        dictmdl.add_word(create_noun(guid))
+    dictsize = tracemalloc.get_traced_memory()[0]
+    colmdl = ColumnarDictModel(event_en = False)
+    for word in dictmdl.get_wordlist():
+        colmdl.add_word(word)
+    colsize = tracemalloc.get_traced_memory()[0] - dictsize
+    tracemalloc.stop()
+    return dictmdl, dictsize, colmdl, colsize
+
+
+def scan_objects(dictmdl: DictModel) -> list:
+    return [word.guid for word in dictmdl.get_wordlist()
+            if (word.get_wordclass() == WordClass.NOUN) and (word.gender == GrammaticalGender.FEMININE)
+            and not word.plural_exist]
+
+
+def scan_columns(colmdl: ColumnarDictModel) -> list:
+    return colmdl.find_guids(wordclass = WordClass.NOUN, genders = {GrammaticalGender.FEMININE}, plural_exist = False)
+
+
+def measure_scan(scan: object, dictmdl: DictModel) -> tuple:
+    best = None
+    for _ in range(REPEAT_CNT):
+        time_start = time.perf_counter()
+        guids = scan(dictmdl)
+        elapsed = time.perf_counter() - time_start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(guids)
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        dictmdl, dictsize, colmdl, colsize = create_models(wordcnt)
+        gc.collect()
+        gc.disable()
+        try:
+            for name, scan, model, size in (('object scan', scan_objects, dictmdl, dictsize),
+                                            ('column scan', scan_columns, colmdl, colsize)):
+                elapsed, matchcnt = measure_scan(scan, model)
+                print('{:<24} {:>9} words {:>9.3f} s {:>9} matches {:>7.1f} bytes/word'
+                      .format(name, wordcnt, elapsed, matchcnt, size / wordcnt))
+        finally:
+            gc.enable()
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
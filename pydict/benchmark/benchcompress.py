@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+from benchmark.benchutil import create_dictmdl, measure
+from persistence import XmlDictMdlPersistence, XmlLoadMode, XmlSaveMode, XmlCompression
+
+WORDCNT_LIST = (50000,)
+LEVEL_LIST = {
+    XmlCompression.NONE : (None,),
+    XmlCompression.GZIP : (1, 6, 9),
+    XmlCompression.XZ   : (0, 6, 9)
+}
+
+
+def setup_save(wordcnt: int, compression: XmlCompression, level: int, path: str) -> object:
+    dmp = XmlDictMdlPersistence(save_mode = XmlSaveMode.STREAMING)
+    dmp.dictmdl = create_dictmdl(wordcnt)
+    dmp.compression = compression
+    dmp.compress_level = level
+    dmp.path = path
+    return dmp.save_dict
+
+
+def setup_load(path: str) -> object:
+    dmp = XmlDictMdlPersistence(load_mode = XmlLoadMode.STREAMING)
+    dmp.path = path
+    return dmp.load_dict
+
+
+def main(wordcnt_list: tuple) -> None:
+    # The file size is the I/O side of the tradeoff, the save and load times are the CPU side.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'dict.xml')
+        for wordcnt in wordcnt_list:
+            for compression, level_list in LEVEL_LIST.items():
+                for level in level_list:
+                    save_elapsed, save_rss = measure(setup_save, wordcnt, compression, level, path)
+                    load_elapsed, load_rss = measure(setup_load, path)
+                    print('{:<5} level {:<4} {:>9} words {:>12} bytes save {:>7.3f} s load {:>7.3f} s'
+                          .format(compression.name, str(level), wordcnt, os.path.getsize(path), save_elapsed, load_elapsed))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
@@ -0,0 +1,78 @@
+import sys
+import time
+import random
+import threading
+from benchmark.benchutil import create_noun
+from dictmdl import DictModel
+from concurrentdictmdl import ConcurrentDictModel
+
+WORDCNT_LIST = (100000,)
+READER_COUNT = 3
+DURATION = 2.0
+# The number of the words updated by a write, in a batch.
+WRITE_SIZE = 10
+
+
+def measure(dictmdl: DictModel, wordcnt: int, writer_en: bool, lock: object = None) -> tuple:
+    """Returns the lookups/s of READER_COUNT readers and the writes/s of a writer during DURATION.
+
+    The readers of a ConcurrentDictModel read its versions, the readers of a DictModel take
+    the lock which is held by the writer for every write.
+    """
+    stop = threading.Event()
+    readcounts = []
+    writecount = [0]
+
+    def read(seed: int) -> None:
+        rnd = random.Random(seed)
+        guids = [rnd.randrange(wordcnt) for _ in range(1000)]
+        count = 0
+        while not stop.is_set():
+            if lock is None:
+                version = dictmdl.get_version()
+                for guid in guids:
+                    version.get_word(guid)
+            else:
+                with lock:
+                    for guid in guids:
+                        dictmdl.get_word(guid)
+            count += len(guids)
+        readcounts.append(count)
+
+    def write() -> None:
+        rnd = random.Random(0)
+        while not stop.is_set():
+            words = [create_noun(rnd.randrange(wordcnt)) for _ in range(WRITE_SIZE)]
+            if lock is None:
+                dictmdl.update_words(words)
+            else:
+                with lock:
+                    dictmdl.update_words(words)
+            writecount[0] += 1
+
+    threads = [threading.Thread(target = read, args = (seed,)) for seed in range(READER_COUNT)]
+    if writer_en:
+        threads.append(threading.Thread(target = write))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(readcounts) / DURATION, writecount[0] / DURATION
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        for name, dictmdlclass, lock in (('DictModel + lock', DictModel, threading.Lock()),
+                                         ('ConcurrentDictModel', ConcurrentDictModel, None)):
+            dictmdl = dictmdlclass(event_en = False)
+            dictmdl.add_words(create_noun(guid) for guid in range(wordcnt))
+            for writer_en in (False, True):
+                reads, writes = measure(dictmdl, wordcnt, writer_en, lock)
+                print('{:<20} {:>9} words, writer {:<3}: {:>12.0f} lookups/s {:>9.0f} writes/s'
+                      .format(name, wordcnt, 'on' if writer_en else 'off', reads, writes))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
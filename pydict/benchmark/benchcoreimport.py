@@ -0,0 +1,42 @@
+import os
+import sys
+import json
+import subprocess
+
+REPEAT_CNT = 5
+MODULES = ('dictmdl', 'qtdictmdl')
+
+# Run in a fresh interpreter: the import time, the RSS growth in KiB and whether Qt is loaded.
+IMPORT_CODE = '''
+import sys, time, json, resource
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+time_start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - time_start
+dictmdl = sys.modules['dictmdl'].DictModel(event_en = False)
+print(json.dumps([elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+                  any(name.startswith('PyQt5') for name in sys.modules)]))
+'''
+
+
+def measure_import(module: str) -> tuple:
+    """Returns the best import time, the RSS growth of that run and whether PyQt5 was imported."""
+    pydictdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(REPEAT_CNT):
+        output = subprocess.run([sys.executable, '-c', IMPORT_CODE.format(module = module)], cwd = pydictdir,
+                                check = True, capture_output = True, text = True).stdout
+        result = json.loads(output)
+        if (best is None) or (result[0] < best[0]):
+            best = result
+    return tuple(best)
+
+
+def main() -> None:
+    for module in MODULES:
+        elapsed, rss, qt_loaded = measure_import(module)
+        print('{:<24} {:>9.1f} ms {:>10} KiB RSS growth   PyQt5 loaded: {}'.format(module, elapsed * 1e3, rss, qt_loaded))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import gc
+import sys
+import copy
+import time
+from benchmark.benchutil import create_noun
+from dictdiff import diff_words, merge_words
+
+WORDCNT_LIST = (100000, 1000000)
+# Every CHANGE_STEP-th word is edited on one of the sides.
+CHANGE_STEP = 100
+
+
+def create_sides(wordcnt: int) -> tuple:
+    # Every side has its own word objects, as if the sides were loaded from files.
+    base = [create_noun(guid) for guid in range(wordcnt)]
+    ours = [create_noun(guid) for guid in range(wordcnt)]
+    theirs = [create_noun(guid) for guid in range(wordcnt)]
+    for idx in range(0, wordcnt, CHANGE_STEP):
+        side = ours if (idx // CHANGE_STEP) % 2 else theirs
+        side[idx] = copy.copy(base[idx])
+        side[idx].hun.add('módosított')
+    return base, ours, theirs
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        base, ours, theirs = create_sides(wordcnt)
+        gc.collect()
+
+        time_start = time.perf_counter()
+        changecnt = sum(1 for change in diff_words(base, ours))
+        elapsed = time.perf_counter() - time_start
+        print('{:<24} {:>9} words {:>9.3f} s {:>9} changes'.format('diff', wordcnt, elapsed, changecnt))
+
+        conflicts = []
+        time_start = time.perf_counter()
+        mergedcnt = sum(1 for word in merge_words(base, ours, theirs, conflicts))
+        elapsed = time.perf_counter() - time_start
+        print('{:<24} {:>9} words {:>9.3f} s {:>9} conflicts'.format('three-way merge', mergedcnt, elapsed, len(conflicts)))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+from benchmark.benchutil import measure, print_result
+from dictmdl import DictModel
+from importer import CsvDictMdlImporter
+
+ROWCNT_LIST = (100000, 500000)
+WORKERS_LIST = (1, 2, 4)
+
+
+def create_tsv(rowcnt: int, path: str) -> None:
+    with open(path, 'w', encoding = 'UTF-8') as fd:
+        for idx in range(rowcnt):
+            fd.write('das\tWort{0}\tWorte{0}\tszó{0}; kifejezés\n'.format(idx))
+
+
+def setup_import(workers: int, path: str) -> object:
+    dictmdl = DictModel(event_en = False)
+    dictmdl.guid_alloc_en = True
+    return CsvDictMdlImporter(dictmdl, path, workers = workers).run
+
+
+def main(rowcnt_list: tuple) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'words.tsv')
+        for rowcnt in rowcnt_list:
+            create_tsv(rowcnt, path)
+            for workers in WORKERS_LIST:
+                elapsed, peak_rss = measure(setup_import, workers, path)
+                print_result('import/{} ({:.0f} rows/s)'.format(workers, rowcnt / elapsed), rowcnt, elapsed, peak_rss)
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or ROWCNT_LIST)
@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+from benchmark.benchutil import create_dictmdl, measure, run, print_result
+from binpersistence import BinDictMdlPersistence
+from lazydictmdl import LazyDictModel
+
+WORDCNT_LIST = (100000, 500000)
+
+
+def create_snapshot(wordcnt: int, path: str) -> None:
+    BinDictMdlPersistence(dictmdl = create_dictmdl(wordcnt), path = path).save_dict()
+
+
+def setup_eager(path: str) -> object:
+    dmp = BinDictMdlPersistence(path = path)
+    return dmp.load_dict
+
+def setup_lazy(path: str) -> object:
+    return lambda: LazyDictModel(path = path)
+
+
+def main(wordcnt_list: tuple) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'dict.snapshot')
+        for wordcnt in wordcnt_list:
+            run(create_snapshot, wordcnt, path)
+            for name, setup in (('load eager', setup_eager), ('load lazy', setup_lazy)):
+                elapsed, peak_rss = measure(setup, path)
+                print_result(name, wordcnt, elapsed, peak_rss)
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
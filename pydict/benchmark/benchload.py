@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+from benchmark.benchutil import create_dictmdl, measure, run, print_result
+from persistence import XmlDictMdlPersistence, XmlLoadMode, XmlSaveMode
+
+WORDCNT_LIST = (100000, 500000)
+WORKERS_LIST = (1, 2, 4, 8)
+
+
+def create_xml(wordcnt: int, path: str) -> None:
+    dmp = XmlDictMdlPersistence(save_mode = XmlSaveMode.STREAMING)
+    dmp.dictmdl = create_dictmdl(wordcnt)
+    dmp.path = path
+    dmp.save_dict()
+
+
+def setup_load(load_mode: XmlLoadMode, workers: int, path: str) -> object:
+    dmp = XmlDictMdlPersistence(load_mode = load_mode)
+    dmp.workers = workers
+    dmp.path = path
+    return dmp.load_dict
+
+
+def main(wordcnt_list: tuple) -> None:
+    # The peak RSS growth is measured in the loading process only, without the workers.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'dict.xml')
+        for wordcnt in wordcnt_list:
+            run(create_xml, wordcnt, path)
+
+            for load_mode in (XmlLoadMode.DOM, XmlLoadMode.STREAMING):
+                elapsed, peak_rss = measure(setup_load, load_mode, 1, path)
+                print_result('load_dict ' + load_mode.name, wordcnt, elapsed, peak_rss)
+            for workers in WORKERS_LIST:
+                elapsed, peak_rss = measure(setup_load, XmlLoadMode.PARALLEL, workers, path)
+                print_result('load_dict PARALLEL/{}'.format(workers), wordcnt, elapsed, peak_rss)
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
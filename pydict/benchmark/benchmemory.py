@@ -0,0 +1,76 @@
+import sys
+import tracemalloc
+from abc import ABC
+from language.noun import Noun
+from language.article import GrammaticalGender
+
+WORDCNT_LIST = (100000,)
+# The translations are drawn from a small vocabulary, as the translations of a real dictionary repeat.
+HUN_VOCABULARY_SIZE = 1000
+
+
+class DictNoun(ABC):
+    """The noun layout before the slots: a per-instance dict and an own set for the translations."""
+
+    def __init__(self):
+        self._guid = None
+        self._hun = set()
+        self._gender = None
+        self._singular_exist = False
+        self._plural_exist = False
+        self._nounsn = None
+        self._nounpl = None
+
+
+def get_texts(guid: int, hun_en: bool) -> tuple:
+    # The texts are built at run time like the texts of a loaded file, so equal texts are distinct objects.
+    hun = ['szó{}'.format(guid % HUN_VOCABULARY_SIZE), 'kifejezés{}'.format(guid % 7)] if hun_en else []
+    return 'Wort{}'.format(guid), 'Worte{}'.format(guid), hun
+
+
+def create_dict_noun(guid: int, hun_en: bool) -> DictNoun:
+    nounsn, nounpl, hun = get_texts(guid, hun_en)
+    noun = DictNoun()
+    noun._guid = guid
+    noun._gender = GrammaticalGender.NEUTRAL
+    noun._singular_exist = noun._plural_exist = True
+    noun._nounsn = nounsn
+    noun._nounpl = nounpl
+    noun._hun.update(hun)
+    return noun
+
+
+def create_slot_noun(guid: int, hun_en: bool) -> Noun:
+    nounsn, nounpl, hun = get_texts(guid, hun_en)
+    noun = Noun()
+    noun.guid = guid
+    noun.gender = GrammaticalGender.NEUTRAL
+    noun.singular_exist = noun.plural_exist = True
+    noun.nounsn = nounsn
+    noun.nounpl = nounpl
+    if hun:
+        noun.hun.update(map(sys.intern, hun))
+    return noun
+
+
+def measure_bytes(create: object, wordcnt: int, hun_en: bool) -> float:
+    """Returns the bytes allocated per noun, including its texts."""
+    tracemalloc.start()
+    try:
+        nouns = [create(guid, hun_en) for guid in range(wordcnt)]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size / len(nouns)
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        for hun_en in (True, False):
+            for name, create in (('dict', create_dict_noun), ('slots', create_slot_noun)):
+                name = '{} {}'.format(name, 'with hun' if hun_en else 'without hun')
+                print('{:<24} {:>9} words {:>9.1f} bytes/noun'.format(name, wordcnt, measure_bytes(create, wordcnt, hun_en)))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
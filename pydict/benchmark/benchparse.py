@@ -0,0 +1,96 @@
+import sys
+import time
+from lxml import etree
+from benchmark.benchutil import create_dictmdl
+from dictmdl import DictModel
+from language.noun import Noun
+from language.article import GrammaticalGender
+from persistence import XmlDictMdlPersistence
+
+WORDCNT_LIST = (100000,)
+REPEAT_CNT = 5
+
+
+class MultiPassXmlDictMdlPersistence(XmlDictMdlPersistence):
+    """The word parser before the single pass dispatch: the children are scanned three times."""
+
+    def _load_word(self, xmlword: etree._Element) -> Noun:
+        guid = None
+        xmlguid = None
+        for element in xmlword:
+            if element.tag == self.XML_GUID_TAG:
+               xmlguid = element
+               guid = self._parse_guid(element.text)
+        if (guid is None) or (guid in self.dictmdl):
+            raise ValueError('Invalid GUID in the benchmark input.')
+
+        word = None
+        xmlhun = None
+        for element in xmlword:
+            if element.tag == self.XML_WORDCLASS_TAG:
+                if element.text == self.XML_WORDCLASS_NOUN_TEXT:
+                    word = self._load_noun(xmlword)
+            elif element.tag == self.XML_WORD_HUN_TAG:
+                xmlhun = element
+
+        if word is not None:
+            if xmlhun is not None:
+                xmlhunlongtext = element.text
+                if xmlhunlongtext is not None:
+                    word.hun.update([hunstr.strip() for hunstr in xmlhunlongtext.split(self.XML_WORD_HUN_TEXT_SEP)])
+                word.guid = guid
+            self.dictmdl.add_word(word)
+        return word
+
+    def _load_noun(self, xmlword: etree._Element) -> Noun:
+        noun = Noun()
+        xmlger = None
+        for element in xmlword:
+            if element.tag == self.XML_WORD_GER_TAG:
+                xmlger = element
+        xmlarticletext = xmlnounsntext = xmlnounpltext = None
+        if xmlger is not None:
+            for gersubelement in xmlger:
+                if gersubelement.tag == self.XML_NOUN_GER_ART_TAG:
+                    xmlarticletext = gersubelement.text
+                elif gersubelement.tag == self.XML_NOUN_GER_SN_TAG:
+                    xmlnounsntext = gersubelement.text
+                elif gersubelement.tag == self.XML_NOUN_GER_PL_TAG:
+                    xmlnounpltext = gersubelement.text
+            noun.singular_exist = (xmlnounsntext is None) or (xmlnounsntext.strip() != self.XML_NONE_TEXT)
+            noun.plural_exist = (xmlnounpltext is None) or (xmlnounpltext.strip() != self.XML_NONE_TEXT)
+            noun.nounsn = xmlnounsntext if noun.singular_exist else None
+            noun.nounpl = xmlnounpltext if noun.plural_exist else None
+            xmlarticletext = (xmlarticletext or '').strip()
+            if xmlarticletext == self.XML_NOUN_GER_ART_DER_TEXT:
+                noun.gender = GrammaticalGender.MASCULINE
+            elif xmlarticletext == self.XML_NOUN_GER_ART_DIE_TEXT:
+                noun.gender = GrammaticalGender.FEMININE if noun.singular_exist else GrammaticalGender.PLURAL
+            elif xmlarticletext == self.XML_NOUN_GER_ART_DAS_TEXT:
+                noun.gender = GrammaticalGender.NEUTRAL
+        return noun
+
+
+def measure_words(dmpclass: type, xmlwordcoll: etree._Element) -> float:
+    """Returns the best time of parsing the already built <Word> elements, without the XML parse."""
+    best = None
+    for _ in range(REPEAT_CNT):
+        dmp = dmpclass(dictmdl = DictModel(event_en = False))
+        time_start = time.perf_counter()
+        for xmlword in xmlwordcoll:
+            dmp._load_word(xmlword)
+        elapsed = time.perf_counter() - time_start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        xmlwordcoll = etree.fromstring(XmlDictMdlPersistence(dictmdl = create_dictmdl(wordcnt)).to_string())[0]
+        for name, dmpclass in (('multi pass', MultiPassXmlDictMdlPersistence), ('single pass', XmlDictMdlPersistence)):
+            elapsed = measure_words(dmpclass, xmlwordcoll)
+            print('{:<24} {:>9} words {:>9.3f} s {:>9.3f} us/word'.format(name, wordcnt, elapsed, elapsed / wordcnt * 1e6))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
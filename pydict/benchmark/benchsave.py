@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+from benchmark.benchutil import create_dictmdl, measure, print_result
+from persistence import XmlDictMdlPersistence, XmlSaveMode
+
+WORDCNT_LIST = (10000, 100000, 300000)
+
+
+def setup_save(wordcnt: int, save_mode: XmlSaveMode, path: str) -> object:
+    dmp = XmlDictMdlPersistence(save_mode = save_mode)
+    dmp.dictmdl = create_dictmdl(wordcnt)
+    dmp.path = path
+    return dmp.save_dict
+
+
+def main(wordcnt_list: tuple) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'dict.xml')
+        for wordcnt in wordcnt_list:
+            for save_mode in XmlSaveMode:
+                elapsed, peak_rss = measure(setup_save, wordcnt, save_mode, path)
+                print_result('save_dict ' + save_mode.name, wordcnt, elapsed, peak_rss)
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
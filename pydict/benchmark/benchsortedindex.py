@@ -0,0 +1,44 @@
+import sys
+import time
+from benchmark.benchutil import create_noun
+from dictmdl import DictModel, WordOrder
+from sortedindex import get_alphabetical_key
+
+WORDCNT_LIST = (100000,)
+# The number of ordered reads, each after a single change, as when a view is refreshed.
+READCNT = 20
+
+
+def measure(wordcnt: int) -> tuple:
+    """Returns the time of READCNT changes and ordered reads by re-sorting and by the indexes."""
+    dictmdl = DictModel(event_en = False)
+    dictmdl.add_words(create_noun(guid) for guid in range(wordcnt))
+
+    time_start = time.perf_counter()
+    for readidx in range(READCNT):
+        dictmdl.update_word(create_noun(readidx))
+        wordlist = list(dictmdl._worddict.values())
+        wordlist.sort(key = lambda word: word.guid)
+        wordlist.sort(key = get_alphabetical_key)
+    resorted = time.perf_counter()
+
+    # The first access builds the indexes, the later ones only walk them.
+    dictmdl.get_range('a', 'b')
+    indexed_start = time.perf_counter()
+    for readidx in range(READCNT):
+        dictmdl.update_word(create_noun(readidx))
+        wordlist = dictmdl.get_wordlist(is_ordered = True)
+        wordlist = list(dictmdl.iter_words(WordOrder.ALPHABETICAL))
+    indexed = time.perf_counter()
+    return resorted - time_start, indexed_start - resorted, indexed - indexed_start
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        resorttime, buildtime, indextime = measure(wordcnt)
+        print('{:>9} words {:>9.3f} s re-sort {:>9.3f} s index build {:>9.3f} s indexed'
+              .format(wordcnt, resorttime, buildtime, indextime))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
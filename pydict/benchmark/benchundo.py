@@ -0,0 +1,70 @@
+import sys
+import time
+import random
+import tracemalloc
+from benchmark.benchutil import create_noun
+from dictmdl import DictModel
+from undostack import DictMdlUndoStack
+
+WORDCNT_LIST = (10000,)
+EDITCNT = 10000
+# The snapshot per edit is measured on a few edits only, it is projected to EDITCNT edits.
+SNAPSHOT_EDITCNT = 20
+
+
+def edit(dictmdl: DictModel, rnd: random.Random, wordcnt: int, editidx: int) -> None:
+    word = create_noun(rnd.randrange(wordcnt))
+    word.nounpl = 'Edit{}'.format(editidx)
+    dictmdl.update_word(word)
+
+
+def measure_undostack(wordcnt: int) -> tuple:
+    """Returns the memory of the undo stack after EDITCNT edits and the time of the edits and of undoing them."""
+    rnd = random.Random(wordcnt)
+    dictmdl = DictModel()
+    dictmdl.add_words(create_noun(guid) for guid in range(wordcnt))
+    tracemalloc.start()
+    undostack = DictMdlUndoStack(dictmdl, limit = EDITCNT)
+    undostack.attach()
+    basesize = tracemalloc.get_traced_memory()[0]
+    time_start = time.perf_counter()
+    for editidx in range(EDITCNT):
+        edit(dictmdl, rnd, wordcnt, editidx)
+    edited = time.perf_counter()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    while undostack.undo():
+        pass
+    undone = time.perf_counter()
+    undostack.detach()
+    return basesize, size - basesize, edited - time_start, undone - edited
+
+
+def measure_snapshots(wordcnt: int) -> int:
+    """Returns the memory of a point-in-time copy of the model (DictModel.snapshot) per edit."""
+    rnd = random.Random(wordcnt)
+    dictmdl = DictModel(event_en = False)
+    dictmdl.add_words(create_noun(guid) for guid in range(wordcnt))
+    tracemalloc.start()
+    snapshots = []
+    for editidx in range(SNAPSHOT_EDITCNT):
+        snapshots.append(dictmdl.snapshot())
+        edit(dictmdl, rnd, wordcnt, editidx)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size // SNAPSHOT_EDITCNT
+
+
+def main(wordcnt_list: tuple) -> None:
+    for wordcnt in wordcnt_list:
+        basesize, stepsize, edittime, undotime = measure_undostack(wordcnt)
+        snapshotsize = measure_snapshots(wordcnt)
+        print('{:>9} words {:>9} edits: base state {:>7.2f} MiB, undo steps {:>7.2f} MiB ({:>5} B/edit), '
+              '{:.3f} s edit {:.3f} s undo'.format(wordcnt, EDITCNT, basesize / (1 << 20), stepsize / (1 << 20),
+                                                  stepsize // EDITCNT, edittime, undotime))
+        print('{:>9} words {:>9} edits: snapshot per edit {:>7.2f} MiB ({:>5} B/edit, projected)'
+              .format(wordcnt, EDITCNT, snapshotsize * EDITCNT / (1 << 20), snapshotsize))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or WORDCNT_LIST)
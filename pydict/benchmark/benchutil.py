@@ -0,0 +1,71 @@
+import gc
+import time
+import resource
+import multiprocessing
+import concurrent.futures
+from dictmdl import DictModel
+from language.noun import Noun
+from language.article import GrammaticalGender
+
+
+def create_noun(guid: int) -> Noun:
+    noun = Noun()
+    noun.guid = guid
+    noun.gender = GrammaticalGender(guid % len(GrammaticalGender))
+    noun.singular_exist = (noun.gender != GrammaticalGender.PLURAL)
+    noun.plural_exist = (guid % 5 != 0)
+    noun.nounsn = 'Wort{}'.format(guid) if noun.singular_exist else None
+    noun.nounpl = 'Worte{}'.format(guid) if noun.plural_exist else None
+    noun.hun.update(['szó{}'.format(guid), 'kifejezés'])
+    return noun
+
+
+def create_dictmdl(wordcnt: int) -> DictModel:
+    dictmdl = DictModel()
+    for guid in range(wordcnt):
+        dictmdl.add_word(create_noun(guid))
+    dictmdl.guid_alloc_en = True
+    return dictmdl
+
+
+def get_peak_rss() -> int:
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(setup: object, args: tuple) -> tuple:
+    operation = setup(*args)
+    gc.collect()
+    rss_before = get_peak_rss()
+    time_start = time.perf_counter()
+    operation()
+    elapsed = time.perf_counter() - time_start
+    return elapsed, get_peak_rss() - rss_before
+
+
+def measure(setup: object, *args) -> tuple:
+    """Runs setup(*args) in a fresh process and measures the operation it returns.
+
+    Returns the elapsed time in seconds and the peak RSS growth in KiB caused by the
+    operation. A new process is used for every measurement so that the peak RSS of one
+    variant does not hide the peak of the next one.
+    """
+    # The worker of a ProcessPoolExecutor may start processes itself (e.g. the parallel load).
+    ctx = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(1, mp_context = ctx) as executor:
+        return executor.submit(_measure, setup, args).result()
+
+
+def run(func: object, *args) -> object:
+    """Runs func(*args) in a fresh process, e.g. to create the input files of a benchmark.
+
+    The peak RSS of a process is inherited by the processes it starts, so the large inputs
+    shall not be created in the process which starts the measurements.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(1, mp_context = ctx) as executor:
+        return executor.submit(func, *args).result()
+
+
+def print_result(name: str, wordcnt: int, elapsed: float, peak_rss: int) -> None:
+    print('{:<24} {:>9} words {:>9.3f} s {:>10} KiB peak RSS growth'.format(name, wordcnt, elapsed, peak_rss))
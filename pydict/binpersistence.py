@@ -0,0 +1,235 @@
+import os
+import sys
+import mmap
+import base64
+import struct
+import logging
+from language.noun import Noun
+from language.word import Word, WordClass
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import IDictMdlPersistence, DictMdlLoadException, atomic_open
+
+logger = logging.getLogger(__name__)
+
+
+class BinDictMdlPersistence(IDictMdlPersistence):
+    """Versioned binary snapshot of a dictionary model.
+
+    Layout (little endian):
+        header   magic, version, record size, word count, heap size
+        records  one fixed width record per word, see BIN_RECORD
+        heap     UTF-8 strings referenced by (offset, length) pairs of the records
+
+    The Hungarian translations of a word are stored as one heap string, separated by
+    BIN_HUN_SEP, together with their count.
+    """
+
+    BIN_MAGIC = b'PDSN'
+    BIN_VERSION = 1
+    BIN_HEADER = struct.Struct('<4sHHII')
+    # guid, wordclass, gender, flags, nounsn offset/length, nounpl offset/length, hun offset/length/count
+    BIN_RECORD = struct.Struct('<QBBBxIIIIIII')
+    BIN_GENDER_NONE = 0xFF
+    BIN_GENDERS = dict([(BIN_GENDER_NONE, None)] + [(int(gender), gender) for gender in GrammaticalGender])
+    BIN_FLAG_SINGULAR_EXIST = 0x01
+    BIN_FLAG_PLURAL_EXIST = 0x02
+    BIN_FLAG_NOUNSN_NONE = 0x04
+    BIN_FLAG_NOUNPL_NONE = 0x08
+    BIN_HUN_SEP = '\x00'
+    BIN_TEXT_CODING = 'UTF-8'
+
+    WORDCLASS_CODES = {
+        WordClass.NOUN : 0,
+        WordClass.VERB : 1
+    }
+
+
+    def is_uptodate(self, srcpath: str) -> bool:
+        """Returns True if the snapshot exists and is not older than the file at srcpath."""
+        if (self.path is None) or not os.path.exists(self.path):
+            return False
+        return os.stat(self.path).st_mtime_ns >= os.stat(srcpath).st_mtime_ns
+
+
+    def load_dict(self) -> DictModel:
+        with open(self.path, 'rb') as fd:
+            if os.fstat(fd.fileno()).st_size == 0:
+                raise DictMdlLoadException(DictMdlLoadException.ID_SNAPSHOT_INVALID,
+                        filepath = self.path, reason = 'empty file')
+            with mmap.mmap(fd.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+                self._load_dict_buffer(mm)
+        self.dictmdl.guid_alloc_en = True
+
+    def from_string(self, string: str) -> DictModel:
+        self.from_bytes(base64.b64decode(string))
+
+    def from_bytes(self, data: bytes) -> DictModel:
+        self._load_dict_buffer(data)
+
+
+    def _load_dict_buffer(self, buffer: object) -> DictModel:
+        created = self.dictmdl is None
+        if created:
+            self.dictmdl = IDictMdlPersistence.DEFAULT_DICTMDL_CLASS()
+
+        try:
+            with memoryview(buffer) as view:
+                tablestart, heapstart = self._check_header(view)
+                with view[tablestart:heapstart] as table, view[heapstart:] as heap:
+                    for record in self.BIN_RECORD.iter_unpack(table):
+                        word = self._unpack_word(record, heap)
+                        if word.guid in self.dictmdl:
+                            raise DictMdlLoadException(DictMdlLoadException.ID_GUID_NOT_UNIQUE,
+                                    filepath = self.path, guid_value = word.guid)
+                        self.dictmdl.add_word(word)
+        except BaseException:
+            # The model created for the failed load shall not serve the word requests of the application.
+            if created:
+                self.dictmdl.disable_events()
+                self.dictmdl = None
+            raise
+
+
+    def _check_header(self, view: memoryview) -> tuple:
+        """Validates the header of a snapshot, returns the start offsets of the record table and the heap."""
+        if len(view) < self.BIN_HEADER.size:
+            self._raise_invalid('truncated header')
+
+        magic, version, recsize, wordcnt, heapsize = self.BIN_HEADER.unpack_from(view)
+        if magic != self.BIN_MAGIC:
+            self._raise_invalid('bad magic {}'.format(magic))
+        if version != self.BIN_VERSION:
+            self._raise_invalid('unsupported version {}'.format(version))
+        if recsize != self.BIN_RECORD.size:
+            self._raise_invalid('unexpected record size {}'.format(recsize))
+
+        tablestart = self.BIN_HEADER.size
+        heapstart = tablestart + wordcnt * recsize
+        if len(view) != heapstart + heapsize:
+            self._raise_invalid('size mismatch')
+        return tablestart, heapstart
+
+
+    def _unpack_word(self, record: tuple, heap: memoryview) -> Word:
+        guid, wordclass, gender, flags, snoff, snlen, ploff, pllen, hunoff, hunlen, huncnt = record
+        if wordclass != self.WORDCLASS_CODES[WordClass.NOUN]:
+            self._raise_invalid('unsupported wordclass {} (guid: {})'.format(wordclass, guid))
+        if max(snoff + snlen, ploff + pllen, hunoff + hunlen) > len(heap):
+            self._raise_invalid('string out of heap (guid: {})'.format(guid))
+
+        noun = Noun()
+        noun.guid = guid
+        try:
+            noun.gender = None if gender == self.BIN_GENDER_NONE else GrammaticalGender(gender)
+            noun.singular_exist = bool(flags & self.BIN_FLAG_SINGULAR_EXIST)
+            noun.plural_exist = bool(flags & self.BIN_FLAG_PLURAL_EXIST)
+            if not (flags & self.BIN_FLAG_NOUNSN_NONE):
+                noun.nounsn = str(heap[snoff:snoff + snlen], self.BIN_TEXT_CODING)
+            if not (flags & self.BIN_FLAG_NOUNPL_NONE):
+                noun.nounpl = str(heap[ploff:ploff + pllen], self.BIN_TEXT_CODING)
+            if huncnt > 0:
+                noun.hun.update(map(sys.intern, str(heap[hunoff:hunoff + hunlen], self.BIN_TEXT_CODING).split(self.BIN_HUN_SEP)))
+        except ValueError as ex:
+            # Corrupt gender code or text (UnicodeDecodeError is a ValueError too).
+            self._raise_invalid('{} (guid: {})'.format(ex, guid))
+        return noun
+
+
+    def pack_word(self, word: Word) -> bytes:
+        """Packs a single word as one record followed by its own string heap."""
+        heap = bytearray()
+        record = self.BIN_RECORD.pack(*self._pack_word(word, heap, {}))
+        return record + heap
+
+    def unpack_word(self, data: bytes) -> Word:
+        if len(data) < self.BIN_RECORD.size:
+            self._raise_invalid('truncated word record')
+        with memoryview(data) as view, view[self.BIN_RECORD.size:] as heap:
+            return self._unpack_word(self.BIN_RECORD.unpack_from(view), heap)
+
+
+    def repack_record(self, record: tuple, heap: memoryview) -> bytes:
+        """Packs a record of a snapshot and its strings in heap as pack_word packs its word, without building it."""
+        guid, wordclass, gender, flags, snoff, snlen, ploff, pllen, hunoff, hunlen, huncnt = record
+        if max(snoff + snlen, ploff + pllen, hunoff + hunlen) > len(heap):
+            self._raise_invalid('string out of heap (guid: {})'.format(guid))
+        record = self.BIN_RECORD.pack(guid, wordclass, gender, flags, 0, snlen, snlen, pllen,
+                                      snlen + pllen, hunlen, huncnt)
+        return b''.join((record, heap[snoff:snoff + snlen], heap[ploff:ploff + pllen], heap[hunoff:hunoff + hunlen]))
+
+
+    def peek_record(self, record: tuple) -> tuple:
+        """Returns the WordClass, gender, plural_exist and the number of the translations of a
+        BIN_RECORD tuple, without building its word."""
+        guid, wordclass, gender, flags = record[:4]
+        if wordclass != self.WORDCLASS_CODES[WordClass.NOUN]:
+            self._raise_invalid('unsupported wordclass {} (guid: {})'.format(wordclass, guid))
+        if gender not in self.BIN_GENDERS:
+            self._raise_invalid('{} is not a valid {} (guid: {})'.format(gender, GrammaticalGender.__name__, guid))
+        return WordClass.NOUN, self.BIN_GENDERS[gender], bool(flags & self.BIN_FLAG_PLURAL_EXIST), record[-1]
+
+
+    def _raise_invalid(self, reason: str) -> None:
+        raise DictMdlLoadException(DictMdlLoadException.ID_SNAPSHOT_INVALID,
+                filepath = self.path, reason = reason)
+
+
+    def save_dict(self) -> None:
+        with atomic_open(self.path, 'wb') as fd:
+            fd.write(self.to_bytes())
+
+    def to_string(self) -> str:
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+    def to_bytes(self) -> bytes:
+        if self.dictmdl is None:
+            raise ValueError('The dictmdl shall not be None during save.')
+
+        wordlist = self.dictmdl.get_wordlist()
+        table = bytearray(len(wordlist) * self.BIN_RECORD.size)
+        heap = bytearray()
+        heapidx = {}
+
+        for idx, word in enumerate(wordlist):
+            self.BIN_RECORD.pack_into(table, idx * self.BIN_RECORD.size, *self._pack_word(word, heap, heapidx))
+
+        header = self.BIN_HEADER.pack(self.BIN_MAGIC, self.BIN_VERSION, self.BIN_RECORD.size, len(wordlist), len(heap))
+        return b''.join((header, table, heap))
+
+
+    def _pack_word(self, word: Word, heap: bytearray, heapidx: dict) -> tuple:
+        if word.guid is None:
+            raise ValueError('The guid of Word object shall not be None.')
+        if word.get_wordclass() != WordClass.NOUN:
+            raise ValueError('The {} word class is not supported by {}.'
+                             .format(word.get_wordclass().name, self.__class__.__name__))
+
+        flags = 0
+        if word.singular_exist:
+            flags |= self.BIN_FLAG_SINGULAR_EXIST
+        if word.plural_exist:
+            flags |= self.BIN_FLAG_PLURAL_EXIST
+        if word.nounsn is None:
+            flags |= self.BIN_FLAG_NOUNSN_NONE
+        if word.nounpl is None:
+            flags |= self.BIN_FLAG_NOUNPL_NONE
+
+        gender = self.BIN_GENDER_NONE if word.gender is None else int(word.gender)
+        snoff, snlen = self._pack_text(word.nounsn or '', heap, heapidx)
+        ploff, pllen = self._pack_text(word.nounpl or '', heap, heapidx)
+        hunoff, hunlen = self._pack_text(self.BIN_HUN_SEP.join(word.hun_view), heap, heapidx)
+
+        return (word.guid, self.WORDCLASS_CODES[WordClass.NOUN], gender, flags,
+                snoff, snlen, ploff, pllen, hunoff, hunlen, len(word.hun_view))
+
+
+    def _pack_text(self, text: str, heap: bytearray, heapidx: dict) -> tuple:
+        # Identical strings (e.g. common translations) are stored only once in the heap.
+        location = heapidx.get(text)
+        if location is None:
+            data = text.encode(self.BIN_TEXT_CODING)
+            location = (len(heap), len(data))
+            heap += data
+            heapidx[text] = location
+        return location
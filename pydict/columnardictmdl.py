@@ -0,0 +1,322 @@
+import re
+import logging
+from array import array
+from language.noun import Noun
+from language.word import Word, WordClass
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from binpersistence import BinDictMdlPersistence
+
+logger = logging.getLogger(__name__)
+
+
+class NounRowView(Noun):
+    """Read-only view of a noun stored in a row of a ColumnarDictModel.
+
+    The fields are read from the columns at every access, so the view follows the updates
+    of the word. copy.copy returns an editable Noun, which can be stored by update_word.
+    """
+
+    __slots__ = ('_dictmdl',)
+
+    def __init__(self, dictmdl: 'ColumnarDictModel', guid: int):
+        # Noun.__init__ is not called, the fields of the view are in the columns.
+        self._dictmdl = dictmdl
+        self._guid = guid
+
+    @property
+    def guid(self) -> int:
+        return self._guid
+
+    @property
+    def gender(self) -> GrammaticalGender:
+        return self._dictmdl._get_gender(self._dictmdl._rows[self._guid])
+
+    @property
+    def singular_exist(self) -> bool:
+        return bool(self._dictmdl._flags[self._dictmdl._rows[self._guid]] & ColumnarDictModel.FLAG_SINGULAR_EXIST)
+
+    @property
+    def plural_exist(self) -> bool:
+        return bool(self._dictmdl._flags[self._dictmdl._rows[self._guid]] & ColumnarDictModel.FLAG_PLURAL_EXIST)
+
+    @property
+    def nounsn(self) -> str:
+        return self._dictmdl._get_texts(self._dictmdl._rows[self._guid])[0]
+
+    @property
+    def nounpl(self) -> str:
+        return self._dictmdl._get_texts(self._dictmdl._rows[self._guid])[1]
+
+    @property
+    def hun(self) -> frozenset:
+        return self._dictmdl._get_texts(self._dictmdl._rows[self._guid])[2]
+
+    @property
+    def hun_view(self) -> frozenset:
+        return self.hun
+
+    def __copy__(self) -> Noun:
+        return self._dictmdl._build_noun(self._dictmdl._rows[self._guid])
+
+
+
+class ColumnarDictModel(DictModel):
+    """Dictionary model which stores the nouns in columns instead of Word objects.
+
+    A row holds a noun: its guid (an array), its wordclass, gender and flags (bytearrays)
+    and the offset of its texts in a UTF-8 heap with the lengths of nounsn, nounpl and the
+    joined translations (arrays). A removed row is replaced by the last row, and the heap
+    space of the removed and updated texts is reclaimed by compact(), which is called when
+    more than half of the heap is garbage.
+
+    get_word and get_wordlist return NounRowView objects. find_guids and count_words scan
+    the wordclass, gender and flags columns by bytes.translate masks, without touching the
+    rows one by one.
+    """
+
+    FLAG_SINGULAR_EXIST = BinDictMdlPersistence.BIN_FLAG_SINGULAR_EXIST
+    FLAG_PLURAL_EXIST = BinDictMdlPersistence.BIN_FLAG_PLURAL_EXIST
+    FLAG_NOUNSN_NONE = BinDictMdlPersistence.BIN_FLAG_NOUNSN_NONE
+    FLAG_NOUNPL_NONE = BinDictMdlPersistence.BIN_FLAG_NOUNPL_NONE
+    GENDER_NONE = BinDictMdlPersistence.BIN_GENDER_NONE
+    WORDCLASS_CODES = BinDictMdlPersistence.WORDCLASS_CODES
+    HUN_SEP = BinDictMdlPersistence.BIN_HUN_SEP
+    TEXT_CODING = BinDictMdlPersistence.BIN_TEXT_CODING
+    COMPACT_MIN_GARBAGE = 1 << 16
+
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rows = {}
+        self._guids = array('Q')
+        self._wordclasses = bytearray()
+        self._genders = bytearray()
+        self._flags = bytearray()
+        self._textoffs = array('Q')
+        self._snlens = array('I')
+        self._pllens = array('I')
+        self._hunlens = array('I')
+        self._heap = bytearray()
+        self._garbage = 0
+
+
+    def _get_columns(self) -> tuple:
+        return (self._guids, self._wordclasses, self._genders, self._flags,
+                self._textoffs, self._snlens, self._pllens, self._hunlens)
+
+
+    def _get_gender(self, row: int) -> GrammaticalGender:
+        gender = self._genders[row]
+        return None if gender == self.GENDER_NONE else GrammaticalGender(gender)
+
+
+    def _get_texts(self, row: int) -> tuple:
+        """Returns nounsn, nounpl and the translations (a frozenset) of a row."""
+        flags = self._flags[row]
+        offset = self._textoffs[row]
+        snend = offset + self._snlens[row]
+        plend = snend + self._pllens[row]
+        hunend = plend + self._hunlens[row]
+        nounsn = None if flags & self.FLAG_NOUNSN_NONE else str(self._heap[offset:snend], self.TEXT_CODING)
+        nounpl = None if flags & self.FLAG_NOUNPL_NONE else str(self._heap[snend:plend], self.TEXT_CODING)
+        if hunend == plend:
+            return nounsn, nounpl, Word.EMPTY_HUN
+        return nounsn, nounpl, frozenset(str(self._heap[plend:hunend], self.TEXT_CODING).split(self.HUN_SEP))
+
+
+    def _build_noun(self, row: int) -> Noun:
+        noun = Noun()
+        noun.guid = self._guids[row]
+        noun.gender = self._get_gender(row)
+        noun.singular_exist = bool(self._flags[row] & self.FLAG_SINGULAR_EXIST)
+        noun.plural_exist = bool(self._flags[row] & self.FLAG_PLURAL_EXIST)
+        noun.nounsn, noun.nounpl, hun = self._get_texts(row)
+        if hun:
+            noun.hun.update(hun)
+        return noun
+
+
+    def _pack_word(self, word: Word) -> tuple:
+        """Returns the column values of a noun (without the guid) and appends its texts to the heap."""
+        if word.get_wordclass() != WordClass.NOUN:
+            raise ValueError('The {} word class is not supported by {}.'
+                             .format(word.get_wordclass().name, self.__class__.__name__))
+        flags = 0
+        if word.singular_exist:
+            flags |= self.FLAG_SINGULAR_EXIST
+        if word.plural_exist:
+            flags |= self.FLAG_PLURAL_EXIST
+        if word.nounsn is None:
+            flags |= self.FLAG_NOUNSN_NONE
+        if word.nounpl is None:
+            flags |= self.FLAG_NOUNPL_NONE
+
+        offset = len(self._heap)
+        sntext = (word.nounsn or '').encode(self.TEXT_CODING)
+        pltext = (word.nounpl or '').encode(self.TEXT_CODING)
+        huntext = self.HUN_SEP.join(word.hun_view).encode(self.TEXT_CODING)
+        self._heap += sntext
+        self._heap += pltext
+        self._heap += huntext
+        gender = self.GENDER_NONE if word.gender is None else int(word.gender)
+        return (self.WORDCLASS_CODES[WordClass.NOUN], gender, flags, offset, len(sntext), len(pltext), len(huntext))
+
+
+    def _get_text_size(self, row: int) -> int:
+        return self._snlens[row] + self._pllens[row] + self._hunlens[row]
+
+
+    def add_word(self, word: Word) -> None:
+        assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
+               .format(self.add_word.__name__, self.__class__.__name__, Word.__name__)
+        assert (word.guid not in self._rows), 'The guid property of the word parameter of {} method in {} class shall '\
+               'not exist in dictionary model. (guid: {})'.format(self.add_word.__name__,self.__class__.__name__,word.guid)
+        values = self._pack_word(word)
+        self._rows[word.guid] = len(self._guids)
+        self._guids.append(word.guid)
+        for column, value in zip(self._get_columns()[1:], values):
+            column.append(value)
+        if word.guid > self._maxguid:
+            self._maxguid = word.guid
+        self._notify_added(word.guid)
+
+
+    def remove_word(self, guid: int) -> Word:
+        assert isinstance(guid, int), 'The guid parameter of {} method in {} class shall have {} type.'\
+               .format(self.remove_word.__name__, self.__class__.__name__, int.__name__)
+        row = self._rows[guid]
+        self._notify_removed(guid)
+        del self._rows[guid]
+        word = self._build_noun(row)
+        self._garbage += self._get_text_size(row)
+
+        lastrow = len(self._guids) - 1
+        columns = self._get_columns()
+        if row != lastrow:
+            for column in columns:
+                column[row] = column[lastrow]
+            self._rows[self._guids[row]] = row
+        for column in columns:
+            column.pop()
+        self._compact_if_needed()
+        return word
+
+
+    def update_word(self, word: Word) -> None:
+        assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
+               .format(self.update_word.__name__, self.__class__.__name__, Word.__name__)
+        assert (word.guid in self._rows), 'The guid property of the word parameter of {} method in {} class shall '\
+               'exist in dictionary model. (guid: {})'.format(self.update_word.__name__,self.__class__.__name__,word.guid)
+        row = self._rows[word.guid]
+        # A view of the same row is read before its texts are replaced.
+        values = self._pack_word(word)
+        self._garbage += self._get_text_size(row)
+        for column, value in zip(self._get_columns()[1:], values):
+            column[row] = value
+        self._compact_if_needed()
+        self._notify_updated(word.guid)
+
+
+    def _compact_if_needed(self) -> None:
+        if (self._garbage >= self.COMPACT_MIN_GARBAGE) and (2 * self._garbage > len(self._heap)):
+            self.compact()
+
+
+    def compact(self) -> None:
+        """Drops the texts of the removed and updated words from the heap."""
+        heap = bytearray()
+        for row, offset in enumerate(self._textoffs):
+            size = self._get_text_size(row)
+            self._textoffs[row] = len(heap)
+            heap += self._heap[offset:offset + size]
+        logger.debug('The heap of {} is compacted from {} to {} bytes.'.format(self.__class__.__name__,
+                     len(self._heap), len(heap)))
+        self._heap = heap
+        self._garbage = 0
+
+
+    def get_word(self, guid: int) -> Word:
+        if guid not in self._rows:
+            return None
+        return NounRowView(self, guid)
+
+
+    def _get_words(self, guids: object) -> object:
+        return (NounRowView(self, guid) for guid in guids)
+
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+
+    def get_wordlist(self, is_ordered: bool = False, guid_asc_ndesc: bool = True) -> list:
+        guids = self._get_ordered_guids(guid_asc_ndesc) if is_ordered == True else self._guids.tolist()
+        return [NounRowView(self, guid) for guid in guids]
+
+
+    def get_wordguidlist(self) -> list:
+        return self._guids.tolist()
+
+
+    def __len__(self) -> int:
+        return len(self._guids)
+
+
+    def _get_mask(self, wordclass: WordClass, genders: set, singular_exist: bool, plural_exist: bool) -> bytes:
+        """Returns a byte per row, 1 for the matching rows, or None if there is no condition."""
+        conditions = []
+        if wordclass is not None:
+            code = self.WORDCLASS_CODES[wordclass]
+            conditions.append((self._wordclasses, lambda value: value == code))
+        if genders is not None:
+            codes = {self.GENDER_NONE if gender is None else int(gender) for gender in genders}
+            conditions.append((self._genders, lambda value: value in codes))
+        if (singular_exist is not None) or (plural_exist is not None):
+            conditions.append((self._flags, lambda value:
+                ((singular_exist is None) or (bool(value & self.FLAG_SINGULAR_EXIST) == singular_exist)) and
+                ((plural_exist is None) or (bool(value & self.FLAG_PLURAL_EXIST) == plural_exist))))
+        if not conditions:
+            return None
+
+        # Each column is mapped to 0/1 bytes by a translation table, and the masks of the
+        # columns are combined by a single AND of big integers.
+        mask = -1
+        for column, accept in conditions:
+            table = bytes(1 if accept(value) else 0 for value in range(256))
+            mask &= int.from_bytes(column.translate(table), 'little')
+        return mask.to_bytes(len(self._guids), 'little')
+
+
+    def find_guids(self, wordclass: WordClass = None, genders: set = None, singular_exist: bool = None,
+                   plural_exist: bool = None) -> list:
+        """Returns the guids of the words matching every given condition, in row order.
+
+        genders is a set of GrammaticalGender values, None in the set matches the words without gender.
+        E.g. the feminine nouns without plural: find_guids(genders = {GrammaticalGender.FEMININE},
+        plural_exist = False).
+        """
+        mask = self._get_mask(wordclass, genders, singular_exist, plural_exist)
+        if mask is None:
+            return self._guids.tolist()
+        guids = self._guids
+        return [guids[match.start()] for match in re.finditer(b'\x01', mask)]
+
+
+    def count_words(self, wordclass: WordClass = None, genders: set = None, singular_exist: bool = None,
+                    plural_exist: bool = None) -> int:
+        """Returns the number of the words matching every given condition, see find_guids."""
+        mask = self._get_mask(wordclass, genders, singular_exist, plural_exist)
+        return len(self._guids) if mask is None else mask.count(1)
+
+
+    def snapshot(self) -> 'ColumnarDictModel':
+        # The columns and the heap are copied as whole buffers, no word is built.
+        snapshot = ColumnarDictModel(event_en = False)
+        for name in ('_guids', '_wordclasses', '_genders', '_flags', '_textoffs', '_snlens', '_pllens', '_hunlens',
+                     '_heap'):
+            setattr(snapshot, name, getattr(self, name)[:])
+        snapshot._rows = dict(self._rows)
+        snapshot._garbage = self._garbage
+        snapshot._maxguid = self._maxguid
+        return snapshot
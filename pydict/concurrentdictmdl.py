@@ -0,0 +1,183 @@
+import copy
+import logging
+import threading
+import contextlib
+from language.word import Word
+from dictmdl import DictModel
+from persistentmap import PersistentMap
+
+logger = logging.getLogger(__name__)
+
+
+class DictMdlVersion(object):
+    """Immutable state of a ConcurrentDictModel, the result of every change up to its number.
+
+    The words are shared by the versions and the model, so they shall not be edited in place
+    (the GUI edits copies of the words anyway).
+    """
+
+    __slots__ = ('_number', '_words')
+
+
+    def __init__(self, number: int, words: PersistentMap, **kwargs):
+        super().__init__(**kwargs)
+        self._number = number
+        self._words = words
+
+
+    @property
+    def number(self) -> int:
+        return self._number
+
+
+    def get_word(self, guid: int) -> Word:
+        return self._words.get(guid)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._words
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def get_wordlist(self, is_ordered: bool = False, guid_asc_ndesc: bool = True) -> list:
+        # The words are kept in guid order, the ordering is free.
+        wordlist = list(self._words.values())
+        if (is_ordered == True) and not guid_asc_ndesc:
+            wordlist.reverse()
+        return wordlist
+
+    def get_wordguidlist(self) -> list:
+        return list(self._words.keys())
+
+
+
+class ConcurrentDictModel(DictModel):
+    """Dictionary model which can be read from any thread while it is changed.
+
+    The writers are serialized by a reentrant lock, which is held by a batch() for its whole
+    block, so a batch is applied by one thread at a time. The words are kept in a PersistentMap
+    and every change creates a new map, so a reader never sees a map being changed.
+
+    get_version returns the last published DictMdlVersion without locking. A version is
+    published after every change outside of a batch and at the end of the outermost batch, so
+    the readers of the versions (search, export, lookup service threads) never see a part of a
+    batch. The methods of the model itself return the current state, including the changes of
+    a running batch, and are meant for the writer thread. The SortedIndex based queries
+    (iter_words, get_range) take the lock.
+
+    The model stores a copy of the added and updated words, the words it returns shall not be
+    edited in place.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.RLock()
+        self._words = PersistentMap()
+        self._version = DictMdlVersion(0, self._words)
+        self._batchdepth = 0
+
+
+    def get_version(self) -> DictMdlVersion:
+        return self._version
+
+
+    def _publish(self) -> None:
+        if (self._batchdepth == 0) and (self._version._words is not self._words):
+            self._version = DictMdlVersion(self._version.number + 1, self._words)
+
+
+    @contextlib.contextmanager
+    def batch(self) -> object:
+        with self._lock:
+            self._batchdepth += 1
+            with super().batch():
+                try:
+                    yield self
+                finally:
+                    # Published before the EventWordBatch, so its handlers see the new version.
+                    self._batchdepth -= 1
+                    self._publish()
+
+
+    def allocate_guid(self) -> int:
+        with self._lock:
+            return super().allocate_guid()
+
+    def allocate_guid_block(self, count: int) -> range:
+        with self._lock:
+            return super().allocate_guid_block(count)
+
+
+    def add_word(self, word: Word) -> None:
+        assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
+               .format(self.add_word.__name__, self.__class__.__name__, Word.__name__)
+        with self._lock:
+            assert (word.guid not in self._words), 'The guid property of the word parameter of {} method in {} class shall '\
+                   'not exist in dictionary model. (guid: {})'.format(self.add_word.__name__,self.__class__.__name__,word.guid)
+            self._words = self._words.set(word.guid, copy.copy(word))
+            if word.guid > self._maxguid:
+                self._maxguid = word.guid
+            self._publish()
+            self._notify_added(word.guid)
+
+
+    def remove_word(self, guid: int) -> Word:
+        assert isinstance(guid, int), 'The guid parameter of {} method in {} class shall have {} type.'\
+               .format(self.remove_word.__name__, self.__class__.__name__, int.__name__)
+        with self._lock:
+            word = self._words.get(guid)
+            if word is None:
+                raise KeyError(guid)
+            self._notify_removed(guid)
+            self._words = self._words.remove(guid)
+            self._publish()
+            return word
+
+
+    def update_word(self, word: Word) -> None:
+        assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
+               .format(self.update_word.__name__, self.__class__.__name__, Word.__name__)
+        with self._lock:
+            assert (word.guid in self._words), 'The guid property of the word parameter of {} method in {} class shall '\
+                   'exist in dictionary model. (guid: {})'.format(self.update_word.__name__,self.__class__.__name__,word.guid)
+            self._words = self._words.set(word.guid, copy.copy(word))
+            self._publish()
+            self._notify_updated(word.guid)
+
+
+    def get_word(self, guid: int) -> Word:
+        return self._words.get(guid)
+
+    def _get_words(self, guids: object) -> object:
+        return map(self._words.get, guids)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._words
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def get_wordlist(self, is_ordered: bool = False, guid_asc_ndesc: bool = True) -> list:
+        return DictMdlVersion(None, self._words).get_wordlist(is_ordered, guid_asc_ndesc)
+
+    def get_wordguidlist(self) -> list:
+        return list(self._words.keys())
+
+
+    def iter_words(self, *args, **kwargs) -> object:
+        with self._lock:
+            return iter(list(super().iter_words(*args, **kwargs)))
+
+    def get_range(self, *args, **kwargs) -> list:
+        with self._lock:
+            return super().get_range(*args, **kwargs)
+
+
+    def snapshot(self) -> 'ConcurrentDictModel':
+        # The words are immutable, the snapshot shares the map of the current state.
+        with self._lock:
+            snapshot = ConcurrentDictModel(event_en = False)
+            snapshot._words = self._words
+            snapshot._version = DictMdlVersion(0, self._words)
+            snapshot._maxguid = self._maxguid
+            return snapshot
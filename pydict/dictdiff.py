@@ -0,0 +1,179 @@
+import sys
+import json
+import logging
+import argparse
+from collections import namedtuple
+from enum import Enum, unique
+from language.word import Word
+
+logger = logging.getLogger(__name__)
+
+# The diff and merge of the words do not need Qt, so dictmdl and persistence are imported only by
+# the helpers which create models or read and write files.
+
+
+@unique
+class ChangeType(Enum):
+    ADDED   = 0
+    REMOVED = 1
+    UPDATED = 2
+
+
+_END_GUID = float('inf')
+
+# The old or new word is None if the word does not exist on that side.
+Change = namedtuple('Change', ['guid', 'changetype', 'old', 'new'])
+
+# The words of the three sides, None where the word does not exist.
+Conflict = namedtuple('Conflict', ['guid', 'base', 'ours', 'theirs'])
+
+
+
+def get_fingerprint(word: Word) -> int:
+    """Returns the fingerprint of the content of a word, comparable only within the process."""
+    if word is None:
+        return None
+    return hash((word.guid, word.get_wordclass(), word.gender, word.singular_exist, word.plural_exist,
+                 word.nounsn, word.nounpl, frozenset(word.hun_view)))
+
+
+def is_equal(word: Word, other: Word) -> bool:
+    """Returns whether two words (or None) have the same content, faster than comparing the fingerprints."""
+    if (word is None) or (other is None):
+        return word is other
+    return (word is other) or ((word.__class__ is other.__class__) and (word.guid == other.guid)
+            and (word.gender is other.gender) and (word.singular_exist == other.singular_exist)
+            and (word.plural_exist == other.plural_exist) and (word.nounsn == other.nounsn)
+            and (word.nounpl == other.nounpl) and (word.hun_view == other.hun_view))
+
+
+def get_word_dict(word: Word) -> dict:
+    if word is None:
+        return None
+    return {
+        'guid'           : word.guid,
+        'gender'         : None if word.gender is None else word.gender.name,
+        'singular_exist' : word.singular_exist,
+        'plural_exist'   : word.plural_exist,
+        'nounsn'         : word.nounsn,
+        'nounpl'         : word.nounpl,
+        'hun'            : sorted(word.hun_view)
+    }
+
+
+def _iter_joined(names: tuple, *sides: object) -> object:
+    """Merge-joins iterables of words sorted by guid, yields (guid, word of each side or None)."""
+    iters = [iter(words) for words in sides]
+    heads = [None] * len(sides)
+    guids = [_END_GUID] * len(sides)
+    sideidxs = range(len(sides))
+    for idx in sideidxs:
+        heads[idx] = next(iters[idx], None)
+        if heads[idx] is not None:
+            guids[idx] = heads[idx].guid
+
+    while True:
+        guid = min(guids)
+        if guid == _END_GUID:
+            return
+        row = [None] * len(sides)
+        for idx in sideidxs:
+            if guids[idx] == guid:
+                row[idx] = heads[idx]
+                word = next(iters[idx], None)
+                heads[idx] = word
+                if word is None:
+                    guids[idx] = _END_GUID
+                elif word.guid > guid:
+                    guids[idx] = word.guid
+                else:
+                    raise ValueError('The words of the {} dictionary are not sorted by guid (guid {} after {}).'
+                                     .format(names[idx], word.guid, guid))
+        yield (guid, *row)
+
+
+def diff_words(oldwords: object, newwords: object) -> object:
+    """Yields the Change of every differing word of two iterables of words sorted by guid."""
+    for guid, old, new in _iter_joined(('old', 'new'), oldwords, newwords):
+        if old is None:
+            yield Change(guid, ChangeType.ADDED, None, new)
+        elif new is None:
+            yield Change(guid, ChangeType.REMOVED, old, None)
+        elif not is_equal(old, new):
+            yield Change(guid, ChangeType.UPDATED, old, new)
+
+
+def merge_words(basewords: object, ourwords: object, theirwords: object, conflicts: list) -> object:
+    """Three-way merges iterables of words sorted by guid, yields the merged words in guid order.
+
+    A word changed (added, updated or removed) only on one side gets that change, a word changed
+    identically on both sides is taken once. A word changed differently on the two sides is a
+    conflict: it is appended to conflicts and our version is kept.
+    """
+    for guid, base, ours, theirs in _iter_joined(('base', 'our', 'their'), basewords, ourwords, theirwords):
+        if is_equal(ours, theirs) or is_equal(theirs, base):
+            merged = ours
+        elif is_equal(ours, base):
+            merged = theirs
+        else:
+            conflicts.append(Conflict(guid, base, ours, theirs))
+            merged = ours
+        if merged is not None:
+            yield merged
+
+
+def merge_two_words(ourwords: object, theirwords: object, conflicts: list) -> object:
+    """Two-way merges without a common base: the union of the words, differing words are conflicts."""
+    return merge_words((), ourwords, theirwords, conflicts)
+
+
+def create_dictmdl(words: object) -> 'DictModel':
+    """Returns a DictModel without events of the words, e.g. of the merged ones."""
+    from dictmdl import DictModel
+    dictmdl = DictModel(event_en = False)
+    for word in words:
+        dictmdl.add_word(word)
+    dictmdl.guid_alloc_en = True
+    return dictmdl
+
+
+def load_words(path: str) -> list:
+    """Returns the words of an XML dictionary file sorted by guid."""
+    from persistence import XmlDictMdlPersistence
+    words = list(XmlDictMdlPersistence(path = path).iter_words())
+    # The saved files are usually in guid order already, which is sorted in linear time.
+    words.sort(key = lambda word: word.guid)
+    return words
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Compares or merges PyDict dictionary files. The changes and '
+                                     'the conflicts are written to the standard output as JSON lines.')
+    parser.add_argument('ours', help = 'our (or the old) dictionary file')
+    parser.add_argument('theirs', help = 'their (or the new) dictionary file')
+    parser.add_argument('--base', help = 'the common base of the two files for the three-way merge')
+    parser.add_argument('--merge', metavar = 'OUTPUT', help = 'writes the merged dictionary to OUTPUT')
+    args = parser.parse_args(argv)
+
+    ourwords = load_words(args.ours)
+    theirwords = load_words(args.theirs)
+    if args.merge is None:
+        for change in diff_words(ourwords, theirwords):
+            print(json.dumps({'guid': change.guid, 'change': change.changetype.name,
+                              'old': get_word_dict(change.old), 'new': get_word_dict(change.new)}, ensure_ascii = False))
+        return 0
+
+    from persistence import XmlDictMdlPersistence, XmlSaveMode
+    conflicts = []
+    basewords = () if args.base is None else load_words(args.base)
+    merged = create_dictmdl(merge_words(basewords, ourwords, theirwords, conflicts))
+    XmlDictMdlPersistence(save_mode = XmlSaveMode.STREAMING, dictmdl = merged, path = args.merge).save_dict()
+    for conflict in conflicts:
+        print(json.dumps({'guid': conflict.guid, 'change': 'CONFLICT', 'base': get_word_dict(conflict.base),
+                          'ours': get_word_dict(conflict.ours), 'theirs': get_word_dict(conflict.theirs)},
+                         ensure_ascii = False))
+    return 1 if conflicts else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,62 @@
 import abc
 import numbers
+import contextlib
 from abc import ABC
+from enum import Enum, unique
 from language.word import Word
-from PyQt5.QtCore import QObject, QAbstractListModel, QAbstractTableModel, QModelIndex
-from PyQt5.QtCore import pyqtSignal, pyqtSlot
-from PyQt5.Qt import Qt, QPixmap, QIcon, QFont, QColor
 from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordAddRequest, EventWordRemoveRequest, EventWordUpdateRequest
+from event import EventWordBatch
+from event import Signal
+from sortedindex import SortedIndex, get_din5007_key, get_alphabetical_key
 
-   
-class DictModel(QObject):
-    
-    def __init__(self, **kwargs):
+
+@unique
+class WordOrder(Enum):
+    GUID = 0
+    # By the DIN 5007-1 collation key of the singular (or the plural), see sortedindex.
+    ALPHABETICAL = 1
+
+
+
+class DictModel(object):
+    """The words of a dictionary by guid, with the guid allocation and the word events.
+
+    The model does not depend on Qt, so it can be used in worker processes and services.
+    The Qt adapters of the GUI are in qtdictmdl.
+
+    Every change fires an EventWordAdded, EventWordRemoved or EventWordUpdated, except within
+    a batch() transaction: there the changes are only collected, and their net result is
+    fired as a single EventWordBatch when the outermost batch is left.
+
+    The guid and alphabetical orders are kept in SortedIndex objects, built on the first
+    ordered access and then maintained by every change in O(log n), so the ordered iteration
+    and the range queries (get_range) do not sort.
+    """
+
+    # The net change of a guid within a batch.
+    BATCH_ADDED = 0
+    BATCH_REMOVED = 1
+    BATCH_UPDATED = 2
+
+    def __init__(self, event_en: bool = True, **kwargs):
         super().__init__(**kwargs)
+        # Emitted by the background savers with the path of the saved file (and the error message).
+        self.save_finished = Signal()
+        self.save_failed = Signal()
         self._worddict = {}
         self._maxguid = -1
         self._guid_alloc_en = False
-        EventWordAddRequest.subscribe(self.handler_word_add_req)
-        EventWordRemoveRequest.subscribe(self.handler_word_rem_req)
-        EventWordUpdateRequest.subscribe(self.handler_word_upd_req)
+        # A model without events (e.g. a temporary copy) is invisible to the rest of the
+        # application: it neither serves the word requests nor announces its changes.
+        self._event_en = event_en
+        self._batch = None
+        self._guidindex = None
+        self._alphaindex = None
+        self._alphakeys = None
+        if self.event_en:
+            EventWordAddRequest.subscribe(self.handler_word_add_req)
+            EventWordRemoveRequest.subscribe(self.handler_word_rem_req)
+            EventWordUpdateRequest.subscribe(self.handler_word_upd_req)
         
 
     def allocate_guid(self) -> int:
@@ -28,6 +67,16 @@ class DictModel(QObject):
             raise Exception('GUID allocation attempt when it is explicitly forbidden.')
 
 
+    def allocate_guid_block(self, count: int) -> range:
+        """Allocates count consecutive guids at once, e.g. for a bulk import."""
+        if self.guid_alloc_en:
+            block = range(self._maxguid + 1, self._maxguid + 1 + count)
+            self._maxguid += count
+            return block
+        else:
+            raise Exception('GUID allocation attempt when it is explicitly forbidden.')
+
+
     @property
     def guid_alloc_en(self) -> bool:
         return self._guid_alloc_en
@@ -40,6 +89,19 @@ class DictModel(QObject):
         self._guid_alloc_en = value
 
 
+    @property
+    def event_en(self) -> bool:
+        return self._event_en
+
+    def disable_events(self) -> None:
+        """Stops serving the word requests and announcing the changes, e.g. for a model which failed to load."""
+        if self.event_en:
+            EventWordAddRequest.unsubscribe(self.handler_word_add_req)
+            EventWordRemoveRequest.unsubscribe(self.handler_word_rem_req)
+            EventWordUpdateRequest.unsubscribe(self.handler_word_upd_req)
+            self._event_en = False
+
+
     def add_word(self, word: Word) -> None:
         assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
                .format(self.add_word.__name__, self.__class__.__name__, Word.__name__)
@@ -48,16 +110,15 @@ class DictModel(QObject):
         self._worddict[word.guid] = word
         if word.guid > self._maxguid:
             self._maxguid = word.guid
-        event_wordadded = EventWordAdded(word.guid)
-        event_wordadded.fire()
+        self._notify_added(word.guid)
 
 
     def remove_word(self, guid: int) -> Word:
         assert isinstance(guid, int), 'The guid parameter of {} method in {} class shall have {} type.'\
                .format(self.remove_word.__name__, self.__class__.__name__, int.__name__)
-        event_wordremoved = EventWordRemoved(guid)
-        event_wordremoved.fire()
-        word = self._worddict.pop(guid)
+        word = self._worddict[guid]
+        self._notify_removed(guid)
+        del self._worddict[guid]
         return word
 
 
@@ -67,8 +128,158 @@ class DictModel(QObject):
         assert (word.guid in self._worddict), 'The guid property of the word parameter of {} method in {} class shall '\
                'exist in dictionary model. (guid: {})'.format(self.update_word.__name__,self.__class__.__name__,word.guid)
         self._worddict[word.guid] = word
-        event_wordupdated = EventWordUpdated(guid)
-        event_wordupdated.fire()
+        self._notify_updated(word.guid)
+
+
+    def add_words(self, words: object) -> None:
+        with self.batch():
+            for word in words:
+                self.add_word(word)
+
+    def remove_words(self, guids: object) -> list:
+        with self.batch():
+            return [self.remove_word(guid) for guid in guids]
+
+    def update_words(self, words: object) -> None:
+        with self.batch():
+            for word in words:
+                self.update_word(word)
+
+
+    @contextlib.contextmanager
+    def batch(self) -> object:
+        """Collects the changes of the block and fires them as one EventWordBatch at its end.
+
+        The event is fired even if the block raises, for the changes made before the exception.
+        A nested batch is part of the outermost one.
+        """
+        if (self._batch is not None) or not self.event_en:
+            yield self
+            return
+        self._batch = {}
+        try:
+            yield self
+        finally:
+            changes = self._batch
+            self._batch = None
+            self._fire_batch(changes)
+
+
+    def _fire_batch(self, changes: dict) -> None:
+        guids = ([], [], [])
+        for guid, change in changes.items():
+            guids[change].append(guid)
+        if changes:
+            event_wordbatch = EventWordBatch(*(EventWordBatch.get_guid_ranges(changeguids) for changeguids in guids),
+                                             dictmdl = self)
+            event_wordbatch.fire()
+
+
+    # The subclasses report their changes by these, so the events, the batches and the indexes
+    # work the same way. A word is already in the model when it is reported as added or
+    # updated, and still in the model when it is reported as removed.
+    def _notify_added(self, guid: int) -> None:
+        if self._guidindex is not None:
+            self._guidindex.add(guid)
+        if self._alphaindex is not None:
+            self._index_alphabetical(guid)
+        if self._batch is not None:
+            # A word removed earlier in the batch is reported as updated.
+            self._batch[guid] = self.BATCH_UPDATED if guid in self._batch else self.BATCH_ADDED
+        elif self.event_en:
+            event_wordadded = EventWordAdded(guid, self)
+            event_wordadded.fire()
+
+    def _notify_removed(self, guid: int) -> None:
+        if self._guidindex is not None:
+            self._guidindex.remove(guid)
+        if self._alphaindex is not None:
+            self._alphaindex.remove(self._alphakeys.pop(guid))
+        if self._batch is not None:
+            if self._batch.get(guid) == self.BATCH_ADDED:
+                del self._batch[guid]
+            else:
+                self._batch[guid] = self.BATCH_REMOVED
+        elif self.event_en:
+            event_wordremoved = EventWordRemoved(guid, self)
+            event_wordremoved.fire()
+
+    def _notify_updated(self, guid: int) -> None:
+        if self._alphaindex is not None:
+            # The word may be edited in place, so its previous key is the stored one.
+            self._alphaindex.remove(self._alphakeys.pop(guid))
+            self._index_alphabetical(guid)
+        if self._batch is not None:
+            self._batch.setdefault(guid, self.BATCH_UPDATED)
+        elif self.event_en:
+            event_wordupdated = EventWordUpdated(guid, self)
+            event_wordupdated.fire()
+
+
+    def _index_alphabetical(self, guid: int) -> None:
+        key = get_alphabetical_key(self.get_word(guid))
+        self._alphaindex.add(key)
+        self._alphakeys[guid] = key
+
+
+    def _get_index(self, order: 'WordOrder') -> SortedIndex:
+        if order == WordOrder.GUID:
+            if self._guidindex is None:
+                self._guidindex = SortedIndex(self.get_wordguidlist())
+            return self._guidindex
+        if self._alphaindex is None:
+            self._alphakeys = {word.guid: get_alphabetical_key(word) for word in self.get_wordlist()}
+            self._alphaindex = SortedIndex(self._alphakeys.values())
+        return self._alphaindex
+
+
+    def _clear_indexes(self) -> None:
+        # For the subclasses which replace their words without reporting the changes.
+        self._guidindex = None
+        self._alphaindex = None
+        self._alphakeys = None
+
+
+    def _get_ordered_guids(self, guid_asc_ndesc: bool = True) -> object:
+        guidindex = self._get_index(WordOrder.GUID)
+        return iter(guidindex) if guid_asc_ndesc else reversed(guidindex)
+
+
+    def _iter_index_guids(self, order: 'WordOrder', low: object = None, high: object = None,
+                          reverse: bool = False) -> object:
+        index = self._get_index(order)
+        if order == WordOrder.GUID:
+            return index.irange(low, high, reverse)
+        # The keys are (collation key, text, guid) tuples: (key,) precedes and (key, MAX) follows
+        # every word with the collation key.
+        lowkey = None if low is None else (get_din5007_key(low),)
+        highkey = None if high is None else (get_din5007_key(high), chr(0x10ffff))
+        return (key[2] for key in index.irange(lowkey, highkey, reverse))
+
+
+    def iter_words(self, order: 'WordOrder' = WordOrder.GUID, reverse: bool = False) -> object:
+        """Iterates the words in the order. The model shall not be changed during the iteration."""
+        assert isinstance(order, WordOrder), 'The order parameter of {} method in {} class shall have {} type.'\
+               .format(self.iter_words.__name__, self.__class__.__name__, WordOrder.__name__)
+        return self._get_words(self._iter_index_guids(order, reverse = reverse))
+
+
+    def get_range(self, low: object = None, high: object = None, order: 'WordOrder' = WordOrder.ALPHABETICAL,
+                  reverse: bool = False) -> list:
+        """Returns the words from low to high (both inclusive, None is unbounded) in the order.
+
+        By WordOrder.ALPHABETICAL the bounds are German texts compared by their DIN 5007-1 key,
+        e.g. get_range('Haus', 'Hof') returns every word from haus to hof, Häuschen and Hof too.
+        By WordOrder.GUID the bounds are guids.
+        """
+        assert isinstance(order, WordOrder), 'The order parameter of {} method in {} class shall have {} type.'\
+               .format(self.get_range.__name__, self.__class__.__name__, WordOrder.__name__)
+        return list(self._get_words(self._iter_index_guids(order, low, high, reverse)))
+
+
+    def _get_words(self, guids: object) -> object:
+        # The words of existing guids, for the subclasses which do not keep every word in _worddict.
+        return map(self._worddict.__getitem__, guids)
 
 
     def get_word(self, guid: int) -> Word:
@@ -82,26 +293,31 @@ class DictModel(QObject):
 
     
     def get_wordlist(self, is_ordered: bool = False, guid_asc_ndesc: bool = True) -> list:
-        wordlist = list(self._worddict.values())
         if is_ordered == True:
-            if guid_asc_ndesc:
-                wordlist.sort(key = lambda word: word.guid, reverse = False)
-            else:
-                wordlist.sort(key = lambda word: word.guid, reverse = True)
-        return wordlist
+            return list(self._get_words(self._get_ordered_guids(guid_asc_ndesc)))
+        return list(self._worddict.values())
 
 
     def get_wordguidlist(self) -> list:
         return list(self._worddict.keys())
 
 
-    def __len__(self) -> int:
-        return len(self._worddict)
+    def snapshot(self) -> 'DictModel':
+        """Returns a point-in-time copy of the model without events.
 
+        The snapshot shares the word objects with the model, only the guid -> word map is
+        copied. add_word and update_word store a new object instead of changing the stored one
+        (copy on write), so a word of the model shall not be edited in place: edit a copy of it
+        (see Word.__copy__) and store that by update_word.
+        """
+        snapshot = DictModel(event_en = False)
+        snapshot._worddict = dict(self._worddict)
+        snapshot._maxguid = self._maxguid
+        return snapshot
 
-    def create_wordlistmodel(self) -> QAbstractListModel:
-        wlsmdl = WordListModel(self)
-        return wlsmdl
+
+    def __len__(self) -> int:
+        return len(self._worddict)
 
 
     def handler_word_add_req(self, event: EventWordAddRequest, *args, **kwargs):
@@ -112,82 +328,3 @@ class DictModel(QObject):
 
     def handler_word_upd_req(self, event: EventWordUpdateRequest, *args, **kwargs):
         self.update_word(event.word)
-        
-        
-
-class WordListModel(QAbstractListModel):
-    ICON_DEFAULT_SIZE = 16
-    ICON_DEFAULT_BRIGHTNESS = 0.8
-
-    def __init__(self, dictmdl: DictModel, parent: QObject = None, **kwargs):
-        super().__init__(parent, **kwargs)
-        self.dictmdl = dictmdl
-        EventWordAdded.subscribe(self.handle_word_added)
-        EventWordRemoved.subscribe(self.handle_word_removed)
-        EventWordUpdated.subscribe(self.handle_word_updated)
-
-    def allocate_guid(self) -> int:
-        return self.dictmdl.allocate_guid()
-
-    @property
-    def dictmdl(self) -> DictModel:
-        return self._dictmdl
-
-    @dictmdl.setter
-    def dictmdl(self, value: DictModel) -> None:
-        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
-               .format(self.__class__.__name__, DictModel.__name__)
-        
-        self._dictmdl = value
-        self._guidlist = self.dictmdl.get_wordguidlist()
-        
-
-    def rowCount(self, parent = QModelIndex()):
-        return len(self._guidlist)
-
-    def data(self, index: QModelIndex, role: int, parent: QModelIndex = QModelIndex()):
-        if role == Qt.DisplayRole:
-            return str(self.get_word(index))
-
-        if role == Qt.DecorationRole:
-            pixmap = QPixmap(self.ICON_DEFAULT_SIZE, self.ICON_DEFAULT_SIZE)
-            quality = self.get_word(index).get_quality()
-            green = max(min((quality * 255 * self.ICON_DEFAULT_BRIGHTNESS), 255), 0)
-            red =  max(min(((1.0 - quality) * 255 * self.ICON_DEFAULT_BRIGHTNESS), 255), 0)
-            color = QColor(red, green, 0)
-            pixmap.fill(color)
-            icon = QIcon(pixmap)
-            return icon
-            
-
-    def get_guid(self, index: QModelIndex) -> int:
-        return self._guidlist[index.row()]
-
-    def get_word(self, index: QModelIndex) -> Word:
-        guid = self.get_guid(index)
-        return self.dictmdl.get_word(guid)
-
-    def insertRows(self, row: int, count: int, parent: QModelIndex) -> None:
-        raise NotImplementedError('The insertRows is not implemented in WordListModel.')
-        
-    def removeRows(self, row: int, count: int, parent: QModelIndex) -> None:
-        guidrmls = self._guidlist[row : row + count]
-        for guid in guidrmls:
-            self.dictmdl.remove_word(guid)
- 
-
-    def handle_word_added(self, event: EventWordAdded) -> None:
-        self.beginInsertRows(QModelIndex(), len(self._guidlist), len(self._guidlist))
-        self._guidlist.append(event.guid)
-        self.endInsertRows()
-
-
-    def handle_word_removed(self, event: EventWordRemoved) -> None:
-        self.beginRemoveRows(QModelIndex(), self._guidlist.index(event.guid), self._guidlist.index(event.guid))
-        self._guidlist.remove(event.guid)
-        self.endRemoveRows()
-
-
-    def handle_word_updated(self, event: EventWordUpdated) -> None:
-        row = self._guidlist.index(event.guid)
-        self.dataChanged.emit(self.index(row), self.index(row))
\ No newline at end of file
@@ -0,0 +1,189 @@
+import logging
+from collections import Counter, namedtuple
+from dictmdl import DictModel
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from event import Signal
+from language.word import Word, WordClass
+from language.article import GrammaticalGender
+from binpersistence import BinDictMdlPersistence
+from lazydictmdl import LazyDictModel
+
+logger = logging.getLogger(__name__)
+
+
+# The statistics of a dictionary at a point in time: the number of the words, the number of the
+# words by WordClass and of the nouns by GrammaticalGender (None for a noun without gender), the
+# number of the nouns without plural, the number of the words without Hungarian translation,
+# the number of the translations and the number of the words by their number of translations.
+DictMdlStatsSummary = namedtuple('DictMdlStatsSummary', ['word_count', 'wordclass_counts', 'gender_counts',
+                                                         'no_plural_count', 'no_translation_count',
+                                                         'translation_count', 'translation_histogram'])
+
+
+class DictMdlStatistics(object):
+    """Statistics of a dictionary model, kept up to date by the word events.
+
+    The model is scanned once on construction (and by rescan), then every added, removed or
+    updated word changes the aggregates in O(1). The statistics keep the contribution of every
+    word, because a removed or updated word is not available any more (or is edited in place)
+    when its event arrives. changed is emitted after every change of the statistics. The scan
+    of a LazyDictModel reads its snapshot records, without building the words.
+    """
+
+    def __init__(self, dictmdl: DictModel, **kwargs):
+        super().__init__(**kwargs)
+        self.dictmdl = dictmdl
+        self.changed = Signal()
+        self.rescan()
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+
+
+    def attach(self) -> None:
+        EventWordAdded.subscribe(self.handler_word_added)
+        EventWordRemoved.subscribe(self.handler_word_removed)
+        EventWordUpdated.subscribe(self.handler_word_updated)
+        EventWordBatch.subscribe(self.handler_word_batch)
+
+    def detach(self) -> None:
+        EventWordAdded.unsubscribe(self.handler_word_added)
+        EventWordRemoved.unsubscribe(self.handler_word_removed)
+        EventWordUpdated.unsubscribe(self.handler_word_updated)
+        EventWordBatch.unsubscribe(self.handler_word_batch)
+
+
+    def rescan(self) -> None:
+        """Recomputes the statistics by a full pass over the words of the model."""
+        if isinstance(self.dictmdl, LazyDictModel):
+            # The records of the snapshot are read without building the words.
+            codec = BinDictMdlPersistence()
+            self._records = {record[0]: codec.peek_record(record) for record, heap in self.dictmdl.iter_records()}
+        else:
+            self._records = {word.guid: self._get_record(word) for word in self.dictmdl.get_wordlist()}
+        self._wordclass_counts = Counter()
+        self._gender_counts = Counter()
+        self._no_plural_count = 0
+        self._translation_count = 0
+        self._translation_histogram = Counter()
+        # Most of the words share their contribution, every distinct one is counted once.
+        for record, count in Counter(self._records.values()).items():
+            self._count_record(record, count)
+        self.changed.emit()
+
+
+    @staticmethod
+    def _get_record(word: Word) -> tuple:
+        # The contribution of a word: its wordclass, its gender and plural_exist (None for the
+        # other wordclasses than noun) and its number of translations.
+        wordclass = word.get_wordclass()
+        if wordclass == WordClass.NOUN:
+            return (wordclass, word.gender, word.plural_exist, len(word.hun_view))
+        return (wordclass, None, None, len(word.hun_view))
+
+
+    def _add_record(self, guid: int, record: tuple) -> None:
+        self._records[guid] = record
+        self._count_record(record, 1)
+
+
+    def _count_record(self, record: tuple, count: int) -> None:
+        wordclass, gender, plural_exist, huncnt = record
+        self._wordclass_counts[wordclass] += count
+        if wordclass == WordClass.NOUN:
+            self._gender_counts[gender] += count
+            if not plural_exist:
+                self._no_plural_count += count
+        self._translation_count += huncnt * count
+        self._translation_histogram[huncnt] += count
+
+
+    def _remove_record(self, guid: int) -> None:
+        wordclass, gender, plural_exist, huncnt = self._records.pop(guid)
+        self._decrement(self._wordclass_counts, wordclass)
+        if wordclass == WordClass.NOUN:
+            self._decrement(self._gender_counts, gender)
+            if not plural_exist:
+                self._no_plural_count -= 1
+        self._translation_count -= huncnt
+        self._decrement(self._translation_histogram, huncnt)
+
+
+    @staticmethod
+    def _decrement(counter: Counter, key: object) -> None:
+        # The keys without words are removed, so the counters compare equal to the ones of a rescan.
+        if counter[key] == 1:
+            del counter[key]
+        else:
+            counter[key] -= 1
+
+
+    def _update_record(self, guid: int) -> None:
+        if guid in self._records:
+            self._remove_record(guid)
+        self._add_record(guid, self._get_record(self.dictmdl.get_word(guid)))
+
+
+    @property
+    def word_count(self) -> int:
+        return len(self._records)
+
+    @property
+    def no_plural_count(self) -> int:
+        return self._no_plural_count
+
+    @property
+    def no_translation_count(self) -> int:
+        return self._translation_histogram[0]
+
+    @property
+    def translation_count(self) -> int:
+        return self._translation_count
+
+
+    def get_wordclass_count(self, wordclass: WordClass) -> int:
+        return self._wordclass_counts[wordclass]
+
+    def get_gender_count(self, gender: GrammaticalGender) -> int:
+        """Returns the number of the nouns of the gender, gender None counts the nouns without gender."""
+        return self._gender_counts[gender]
+
+    def get_translations_per_word(self) -> float:
+        return self._translation_count / len(self._records) if self._records else 0.0
+
+    def get_summary(self) -> DictMdlStatsSummary:
+        return DictMdlStatsSummary(len(self._records), dict(self._wordclass_counts), dict(self._gender_counts),
+                                   self._no_plural_count, self.no_translation_count, self._translation_count,
+                                   dict(self._translation_histogram))
+
+
+    def handler_word_added(self, event: EventWordAdded, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._update_record(event.guid)
+            self.changed.emit()
+
+    def handler_word_removed(self, event: EventWordRemoved, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._remove_record(event.guid)
+            self.changed.emit()
+
+    def handler_word_updated(self, event: EventWordUpdated, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._update_record(event.guid)
+            self.changed.emit()
+
+    def handler_word_batch(self, event: EventWordBatch, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            for guid in EventWordBatch.iter_guids(event.removed):
+                self._remove_record(guid)
+            for guid in EventWordBatch.iter_guids(event.added + event.updated):
+                self._update_record(guid)
+            self.changed.emit()
@@ -17,6 +17,7 @@ class EventId(IntEnum):
     EVENT_WORD_ADDED = 5
     EVENT_WORD_REMOVED = 6
     EVENT_WORD_UPDATED = 7
+    EVENT_WORD_BATCH = 8
 
 
 class Event(ABC):
@@ -45,8 +46,8 @@ class Event(ABC):
     def unsubscribe(cls, handler: object) -> None:
         if callable(handler):
             eid = cls.eventid()
-            if (eid in cls.handlers) and (handler in cls.handlers[id]):
-                cls.handlers[id].remove(handler)
+            if (eid in cls.handlers) and (handler in cls.handlers[eid]):
+                cls.handlers[eid].remove(handler)
                 logger.info('The {} is unsubscribed to the {} event.'
                             .format(str(handler), cls.eventid().name))
             else:
@@ -164,8 +165,10 @@ class EventWordAdded(Event):
     def eventid(cls) -> EventId:
         return EventId.EVENT_WORD_ADDED
     
-    def __init__(self, guid: int, **kwargs):
+    def __init__(self, guid: int, dictmdl: object = None, **kwargs):
         self.guid = guid
+        # The model which fired the event, so the handlers can ignore the other models.
+        self.dictmdl = dictmdl
 
     @property
     def guid(self) -> int:
@@ -186,8 +189,10 @@ class EventWordRemoved(Event):
     def eventid(cls) -> EventId:
         return EventId.EVENT_WORD_REMOVED
     
-    def __init__(self, guid: int, **kwargs):
+    def __init__(self, guid: int, dictmdl: object = None, **kwargs):
         self.guid = guid
+        # The model which fired the event, so the handlers can ignore the other models.
+        self.dictmdl = dictmdl
 
     @property
     def guid(self) -> int:
@@ -208,8 +213,10 @@ class EventWordUpdated(Event):
     def eventid(cls) -> EventId:
         return EventId.EVENT_WORD_UPDATED
     
-    def __init__(self, guid: int, **kwargs):
+    def __init__(self, guid: int, dictmdl: object = None, **kwargs):
         self.guid = guid
+        # The model which fired the event, so the handlers can ignore the other models.
+        self.dictmdl = dictmdl
 
     @property
     def guid(self) -> int:
@@ -224,6 +231,55 @@ class EventWordUpdated(Event):
 
 
 
+class EventWordBatch(Event):
+    """The net changes of a DictModel.batch() transaction, fired once after the batch.
+
+    added, removed and updated are lists of guid ranges (ascending, disjoint). Unlike
+    EventWordRemoved, the event is fired after the removal, the removed words are gone.
+    A word added and removed within the batch is not reported, a word removed and added
+    again is reported as updated.
+    """
+
+    @classmethod
+    def eventid(cls) -> EventId:
+        return EventId.EVENT_WORD_BATCH
+
+    def __init__(self, added: list, removed: list, updated: list, dictmdl: object = None, **kwargs):
+        self.added = added
+        self.removed = removed
+        self.updated = updated
+        # The model which fired the event, so the handlers can ignore the other models.
+        self.dictmdl = dictmdl
+
+    @staticmethod
+    def get_guid_ranges(guids: object) -> list:
+        """Returns the guids as a list of ranges of consecutive guids."""
+        ranges = []
+        start = stop = None
+        for guid in sorted(guids):
+            if guid != stop:
+                if start is not None:
+                    ranges.append(range(start, stop))
+                start = guid
+            stop = guid + 1
+        if start is not None:
+            ranges.append(range(start, stop))
+        return ranges
+
+    @staticmethod
+    def iter_guids(ranges: list) -> object:
+        for guidrange in ranges:
+            yield from guidrange
+
+    def get_count(self) -> int:
+        return sum(len(guidrange) for guidrange in self.added + self.removed + self.updated)
+
+    def __str__(self) -> str:
+        return '{}{{added: {}, removed: {}, updated: {}}}'.format(self.eventid().name, self.added, self.removed,
+                                                                 self.updated)
+
+
+
 class EventSource(object):
 
     def __init__(self, eventid: EventId, **kwargs):
@@ -269,6 +325,39 @@ class EventSource(object):
 
 
 
+class Signal(object):
+    """Notification of a single object, with the connect/disconnect/emit interface of a Qt signal.
+
+    The slots are called directly on the emitting thread (like a Qt.DirectConnection), a GUI
+    relays the signal to its own thread itself (see qtdictmdl.DictMdlSignalRelay). The slots
+    are kept in a tuple which is replaced on change, so a signal can be emitted on any thread.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._slots = ()
+
+
+    def connect(self, slot: object) -> None:
+        if callable(slot):
+            self._slots += (slot,)
+        else:
+            raise TypeError('Signal slot shall be callable but {} is not callable.'
+                            .format(str(slot)))
+
+
+    def disconnect(self, slot: object) -> None:
+        slots = list(self._slots)
+        slots.remove(slot)
+        self._slots = tuple(slots)
+
+
+    def emit(self, *args) -> None:
+        for slot in self._slots:
+            slot(*args)
+
+
+
 class EventBus(object):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -0,0 +1,206 @@
+import os
+import csv
+import json
+import logging
+import concurrent.futures
+from enum import Enum, unique
+from language.word import Word, WordClass
+from language.article import GrammaticalGender, GrammaticalCase, ArticleType, Article
+from dictmdl import DictModel
+from persistence import atomic_open
+from lazydictmdl import LazyDictModel
+
+logger = logging.getLogger(__name__)
+
+
+@unique
+class ExportFormat(Enum):
+    JSONL = 0
+    CSV   = 1
+    TSV   = 2
+
+
+def iter_dictmdl_words(dictmdl: DictModel) -> object:
+    """Yields the words of a model one by one, so a lazy model builds only the exported word."""
+    for guid in dictmdl.get_wordguidlist():
+        yield dictmdl.get_word(guid)
+
+
+class DictMdlExporter(object):
+    """Writes words to a JSON Lines, CSV or TSV file, one record per word, as a stream.
+
+    Only the words of the wordclasses and genders sets are written (every word if the set is
+    None, a None gender matches the words without gender). fields selects and orders the columns,
+    the default columns of CSV and TSV are the ones read by CsvDictMdlImporter. The Hungarian
+    translations are sorted, a JSON list in JSON Lines and joined by ';' in CSV and TSV.
+
+    export_shards writes a binary snapshot to shardcnt files in parallel: every worker process
+    maps the snapshot itself, so no word is transferred between the processes.
+    """
+
+    EXPORT_FIELDS = ('guid', 'wordclass', 'gender', 'article', 'singular', 'plural', 'hungarian')
+    EXPORT_DEFAULT_FIELDS = {
+        ExportFormat.JSONL : EXPORT_FIELDS,
+        ExportFormat.CSV   : ('article', 'singular', 'plural', 'hungarian'),
+        ExportFormat.TSV   : ('article', 'singular', 'plural', 'hungarian')
+    }
+    EXPORT_EXTENSIONS = {
+        '.jsonl' : ExportFormat.JSONL,
+        '.csv'   : ExportFormat.CSV,
+        '.tsv'   : ExportFormat.TSV
+    }
+    EXPORT_HUN_TEXT_SEP = ';'
+    EXPORT_ARTICLE_TEXTS = {
+        Article.DER : 'der',
+        Article.DIE : 'die',
+        Article.DAS : 'das'
+    }
+
+
+    def __init__(self, path: str, export_format: ExportFormat = None, fields: tuple = None, wordclasses: set = None,
+                 genders: set = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.wordclasses = wordclasses
+        self.genders = genders
+
+        if export_format is None:
+            self.export_format = self.EXPORT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), ExportFormat.JSONL)
+        else:
+            self.export_format = export_format
+
+        if fields is None:
+            self.fields = self.EXPORT_DEFAULT_FIELDS[self.export_format]
+        else:
+            self.fields = fields
+
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        assert isinstance(value, str), 'The path property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, str.__name__)
+        self._path = value
+
+    @property
+    def export_format(self) -> ExportFormat:
+        return self._export_format
+
+    @export_format.setter
+    def export_format(self, value: ExportFormat) -> None:
+        assert isinstance(value, ExportFormat), 'The export_format property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, ExportFormat.__name__)
+        self._export_format = value
+
+    @property
+    def fields(self) -> tuple:
+        return self._fields
+
+    @fields.setter
+    def fields(self, value: tuple) -> None:
+        assert (len(value) > 0) and all(field in self.EXPORT_FIELDS for field in value), 'The fields property of {} '\
+               'class shall be a non-empty selection of {}.'.format(self.__class__.__name__, self.EXPORT_FIELDS)
+        self._fields = tuple(value)
+
+
+    def _is_exported(self, word: Word) -> bool:
+        return (((self.wordclasses is None) or (word.get_wordclass() in self.wordclasses))
+                and ((self.genders is None) or (word.gender in self.genders)))
+
+
+    def _get_article_text(self, word: Word) -> str:
+        if word.gender is None:
+            return None
+        return self.EXPORT_ARTICLE_TEXTS.get(Article.get_article(ArticleType.DEFINITE, word.gender,
+                                                                 GrammaticalCase.NOMINATIVE))
+
+
+    def _get_values(self, word: Word) -> list:
+        values = []
+        for field in self.fields:
+            if field == 'guid':
+                values.append(word.guid)
+            elif field == 'wordclass':
+                values.append(word.get_wordclass().name)
+            elif field == 'gender':
+                values.append(None if word.gender is None else word.gender.name)
+            elif field == 'article':
+                values.append(self._get_article_text(word))
+            elif field == 'singular':
+                values.append(word.nounsn if word.singular_exist else None)
+            elif field == 'plural':
+                values.append(word.nounpl if word.plural_exist else None)
+            else:
+                values.append(sorted(word.hun_view))
+        return values
+
+
+    def export(self, words: object) -> int:
+        """Writes the exported words of the iterable, returns their number."""
+        wordcnt = 0
+        with atomic_open(self.path, 'w', encoding = 'UTF-8', newline = '') as fd:
+            if self.export_format == ExportFormat.JSONL:
+                for word in words:
+                    if self._is_exported(word):
+                        fd.write(json.dumps(dict(zip(self.fields, self._get_values(word))), ensure_ascii = False))
+                        fd.write('\n')
+                        wordcnt += 1
+            else:
+                writer = csv.writer(fd, delimiter = '\t' if self.export_format == ExportFormat.TSV else ',',
+                                    lineterminator = '\n')
+                writer.writerow(self.fields)
+                for word in words:
+                    if self._is_exported(word):
+                        writer.writerow([self._get_cell(value) for value in self._get_values(word)])
+                        wordcnt += 1
+        logger.info('{} words are exported to {}.'.format(wordcnt, self.path))
+        return wordcnt
+
+
+    def _get_cell(self, value: object) -> object:
+        if value is None:
+            return ''
+        elif isinstance(value, list):
+            return self.EXPORT_HUN_TEXT_SEP.join(value)
+        return value
+
+
+    def export_dictmdl(self, dictmdl: DictModel) -> int:
+        return self.export(iter_dictmdl_words(dictmdl))
+
+
+    def get_shard_path(self, shardidx: int) -> str:
+        base, extension = os.path.splitext(self.path)
+        return '{}.{}{}'.format(base, shardidx, extension)
+
+
+    def export_shards(self, snapshot_path: str, shardcnt: int, workers: int = None) -> list:
+        """Writes the words of a binary snapshot to shardcnt files in parallel, returns their paths.
+
+        The shards hold consecutive slices of the snapshot, so their concatenation is the export
+        (apart from the header of every CSV and TSV shard).
+        """
+        shardpaths = [self.get_shard_path(shardidx) for shardidx in range(shardcnt)]
+        with concurrent.futures.ProcessPoolExecutor(workers or min(shardcnt, os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(_export_snapshot_shard, self, snapshot_path, shardidx, shardcnt, shardpath)
+                       for shardidx, shardpath in enumerate(shardpaths)]
+            wordcnt = sum(future.result() for future in futures)
+        logger.info('{} words are exported to {} shards.'.format(wordcnt, shardcnt))
+        return shardpaths
+
+
+
+def _export_snapshot_shard(exporter: DictMdlExporter, snapshot_path: str, shardidx: int, shardcnt: int,
+                           shardpath: str) -> int:
+    dictmdl = LazyDictModel(path = snapshot_path, event_en = False)
+    try:
+        guids = dictmdl.get_wordguidlist()
+        start = len(guids) * shardidx // shardcnt
+        end = len(guids) * (shardidx + 1) // shardcnt
+        exporter.path = shardpath
+        return exporter.export(dictmdl.get_word(guid) for guid in guids[start:end])
+    finally:
+        dictmdl.close()
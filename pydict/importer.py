@@ -0,0 +1,286 @@
+import gc
+import os
+import sys
+import csv
+import logging
+import unicodedata
+import collections
+import concurrent.futures
+from collections import namedtuple
+from language.noun import Noun
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+
+logger = logging.getLogger(__name__)
+
+
+# Counts of the imported rows: added words, rows skipped as duplicates and invalid rows.
+ImportResult = namedtuple('ImportResult', ['added', 'duplicates', 'invalid'])
+
+
+def normalize_text(text: str) -> str:
+    """Returns text in NFC form with the whitespace runs collapsed to single spaces, or None if it is empty."""
+    if text is None:
+        return None
+    if not (text.isascii() or unicodedata.is_normalized('NFC', text)):
+        text = unicodedata.normalize('NFC', text)
+    text = ' '.join(text.split())
+    return text if text else None
+
+
+def get_dedup_key(nounsn: str, nounpl: str) -> tuple:
+    return (nounsn.casefold() if nounsn else '', nounpl.casefold() if nounpl else '')
+
+
+class CsvDictMdlImporter(object):
+    """Imports the nouns of a CSV or TSV word list into a dictionary model.
+
+    The rows are read as a stream in chunks of chunk_size rows, and the chunks are parsed and
+    normalised by a process pool of workers (in the importing process if workers is 1). A row is
+    (article, singular, plural, hungarian): the article is der, die, das or empty, a missing
+    singular or plural is empty or '-', and the Hungarian translations are separated by ';'. The
+    first non-empty row is skipped if it is a header of these column names, which may also
+    reorder them.
+
+    The rows whose singular and plural (case insensitive) are already in the model or earlier in
+    the file are skipped as duplicates. The guids are allocated for a whole batch of batch_size
+    words at once, and the words are added to the model batch by batch.
+    """
+
+    CSV_COLUMNS = ('article', 'singular', 'plural', 'hungarian')
+    CSV_MISSING_TEXTS = ('', '-')
+    CSV_HUN_TEXT_SEP = ';'
+    CSV_ARTICLE_GENDERS = {
+        ''    : None,
+        'der' : GrammaticalGender.MASCULINE,
+        'die' : GrammaticalGender.FEMININE,
+        'das' : GrammaticalGender.NEUTRAL
+    }
+    TSV_EXTENSIONS = ('.tsv', '.tab')
+
+    DEFAULT_CHUNK_SIZE = 10000
+    DEFAULT_BATCH_SIZE = 10000
+
+
+    def __init__(self, dictmdl: DictModel, path: str, delimiter: str = None, workers: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.dictmdl = dictmdl
+        self.path = path
+        self.chunk_size = self.DEFAULT_CHUNK_SIZE
+        self.batch_size = self.DEFAULT_BATCH_SIZE
+
+        if delimiter is None:
+            self.delimiter = '\t' if os.path.splitext(path)[1].lower() in self.TSV_EXTENSIONS else ','
+        else:
+            self.delimiter = delimiter
+
+        if workers is None:
+            self.workers = os.cpu_count() or 1
+        else:
+            self.workers = workers
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+
+    @property
+    def delimiter(self) -> str:
+        return self._delimiter
+
+    @delimiter.setter
+    def delimiter(self, value: str) -> None:
+        assert isinstance(value, str) and (len(value) == 1), 'The delimiter property of {} class shall be a single '\
+               'character {}.'.format(self.__class__.__name__, str.__name__)
+        self._delimiter = value
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @workers.setter
+    def workers(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The workers property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._workers = value
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The chunk_size property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._chunk_size = value
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The batch_size property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._batch_size = value
+
+
+    def run(self) -> ImportResult:
+        # The collector stays enabled, but the added words are moved to its permanent generation
+        # batch by batch (gc.freeze), so the collections during the import do not scan them again
+        # and again. A freeze of the application is left alone.
+        freeze = gc.get_freeze_count() == 0
+        try:
+            return self._run(freeze)
+        finally:
+            if freeze:
+                gc.unfreeze()
+
+
+    def _run(self, freeze: bool) -> ImportResult:
+        dedupindex = {get_dedup_key(word.nounsn, word.nounpl) for word in self.dictmdl.get_wordlist()}
+        added = duplicates = invalid = 0
+        batch = []
+
+        for lineno, record in self._iter_records():
+            if isinstance(record, str):
+                logger.warning('Line {} of {} is not imported: {}'.format(lineno, self.path, record))
+                invalid += 1
+                continue
+            key = get_dedup_key(record[3], record[4])
+            if key in dedupindex:
+                duplicates += 1
+                continue
+            dedupindex.add(key)
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                added += self._commit_batch(batch)
+                batch = []
+                if freeze:
+                    gc.freeze()
+        added += self._commit_batch(batch)
+
+        logger.info('{} words are imported from {} ({} duplicates, {} invalid rows).'
+                    .format(added, self.path, duplicates, invalid))
+        return ImportResult(added, duplicates, invalid)
+
+
+    def _iter_records(self) -> object:
+        """Yields (line number, record or error message) of the data rows in file order."""
+        chunks = self._iter_chunks()
+        if self.workers == 1:
+            for chunk in chunks:
+                yield from _parse_csv_chunk(chunk, self._columns)
+            return
+
+        # Only a few chunks are in flight, so the file is not read ahead of the import.
+        with concurrent.futures.ProcessPoolExecutor(self.workers) as executor:
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_parse_csv_chunk, chunk, self._columns))
+                if len(pending) >= 2 * self.workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+
+    def _iter_chunks(self) -> object:
+        with open(self.path, 'r', encoding = 'UTF-8-sig', newline = '') as fd:
+            reader = csv.reader(fd, delimiter = self.delimiter)
+            self._columns = self.CSV_COLUMNS
+            chunk = []
+            headerrow = True
+            for row in reader:
+                # The header may follow empty rows, which are skipped by the parser too.
+                if headerrow and any(cell.strip() for cell in row):
+                    headerrow = False
+                    if self._read_header(row):
+                        continue
+                chunk.append((reader.line_num, row))
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+
+    def _read_header(self, row: list) -> bool:
+        names = [cell.strip().lower() for cell in row]
+        if set(names) != set(self.CSV_COLUMNS):
+            return False
+        self._columns = tuple(names)
+        return True
+
+
+    def _commit_batch(self, batch: list) -> int:
+        if not batch:
+            return 0
+        genders = {gender.value: gender for gender in GrammaticalGender}
+        genders[None] = None
+        nouns = []
+        for guid, record in zip(self.dictmdl.allocate_guid_block(len(batch)), batch):
+            gender, singular_exist, plural_exist, nounsn, nounpl, hun = record
+            noun = Noun()
+            noun.guid = guid
+            noun.gender = genders[gender]
+            noun.singular_exist = singular_exist
+            noun.plural_exist = plural_exist
+            noun.nounsn = nounsn
+            noun.nounpl = nounpl
+            if hun:
+                noun.hun.update(map(sys.intern, hun))
+            nouns.append(noun)
+        # One EventWordBatch per batch instead of an event per word.
+        self.dictmdl.add_words(nouns)
+        return len(batch)
+
+
+
+def _parse_csv_chunk(chunk: list, columns: tuple) -> list:
+    """Normalises the rows of a chunk in a worker process, returns (line number, record or error message) pairs.
+
+    A record is (gender value, singular_exist, plural_exist, nounsn, nounpl, hun tuple).
+    """
+    artidx, snidx, plidx, hunidx = (columns.index(name) for name in CsvDictMdlImporter.CSV_COLUMNS)
+    genders = {text: (None if gender is None else gender.value)
+               for text, gender in CsvDictMdlImporter.CSV_ARTICLE_GENDERS.items()}
+    missingtexts = CsvDictMdlImporter.CSV_MISSING_TEXTS
+    hunsep = CsvDictMdlImporter.CSV_HUN_TEXT_SEP
+    femininevalue = GrammaticalGender.FEMININE.value
+    pluralvalue = GrammaticalGender.PLURAL.value
+
+    results = []
+    for lineno, row in chunk:
+        if len(row) < len(columns):
+            if any(cell.strip() for cell in row):
+                results.append((lineno, '{} columns instead of {}'.format(len(row), len(columns))))
+            continue
+
+        articletext = row[artidx].strip().lower()
+        gender = genders.get(articletext, False)
+        if gender is False:
+            results.append((lineno, 'unknown article "{}"'.format(articletext)))
+            continue
+        nounsn = row[snidx].strip()
+        nounsn = None if nounsn in missingtexts else normalize_text(nounsn)
+        nounpl = row[plidx].strip()
+        nounpl = None if nounpl in missingtexts else normalize_text(nounpl)
+        if (nounsn is None) and (nounpl is None):
+            results.append((lineno, 'neither singular nor plural'))
+            continue
+
+        if (gender == femininevalue) and (nounsn is None):
+            gender = pluralvalue
+        hun = []
+        for huntext in row[hunidx].split(hunsep):
+            huntext = normalize_text(huntext)
+            if huntext is not None:
+                hun.append(huntext)
+        results.append((lineno, (gender, nounsn is not None, nounpl is not None, nounsn, nounpl, tuple(hun))))
+    return results
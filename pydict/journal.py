@@ -0,0 +1,297 @@
+import os
+import zlib
+import struct
+import logging
+from enum import IntEnum, unique
+from dictmdl import DictModel
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from persistence import DictMdlLoadException
+from binpersistence import BinDictMdlPersistence
+from asyncsave import AsyncDictMdlSaver
+
+logger = logging.getLogger(__name__)
+
+
+@unique
+class JournalOp(IntEnum):
+    ADD    = 0
+    UPDATE = 1
+    REMOVE = 2
+
+
+
+class DictMdlJournal(object):
+    """Append-only journal of the word changes made after the base dictionary file was saved.
+
+    Every added, updated or removed word is appended to an in-memory tail as one record,
+    flush() writes the tail to the end of the journal file. On startup replay() applies the
+    journal to the model loaded from the base file.
+
+    When the journal grows beyond compact_size it is renamed to <path>.old and a snapshot of the
+    model (the base file plus <path>.old) is written as the new base file in the background.
+    <path>.old is removed after the save, replaying it again after a crash during compaction
+    is harmless because every record holds the complete word.
+
+    Record layout (little endian): payload length, CRC32 of the rest, operation, guid, payload.
+    The payload of ADD and UPDATE is the word packed by BinDictMdlPersistence.pack_word.
+    """
+
+    JOURNAL_MAGIC = b'PDJN'
+    JOURNAL_VERSION = 1
+    JOURNAL_HEADER = struct.Struct('<4sH')
+    JOURNAL_RECORD = struct.Struct('<IIBQ')
+    JOURNAL_RECORD_KEY = struct.Struct('<BQ')
+    JOURNAL_OLD_SUFFIX = '.old'
+
+    DEFAULT_COMPACT_SIZE = 4 * 1024 * 1024
+
+
+    def __init__(self, dictmdl: DictModel, path: str, basepath: str, compact_size: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.dictmdl = dictmdl
+        self.path = path
+        self.basepath = basepath
+        self.fsync_en = True
+        self._tail = bytearray()
+        self._codec = BinDictMdlPersistence(path = path)
+        self._saver = None
+
+        if compact_size is None:
+            self.compact_size = self.DEFAULT_COMPACT_SIZE
+        else:
+            self.compact_size = compact_size
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        assert isinstance(value, str), 'The path property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, str.__name__)
+        self._path = value
+
+    @property
+    def old_path(self) -> str:
+        return self.path + self.JOURNAL_OLD_SUFFIX
+
+    @property
+    def basepath(self) -> str:
+        return self._basepath
+
+    @basepath.setter
+    def basepath(self, value: str) -> None:
+        assert isinstance(value, str), 'The basepath property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, str.__name__)
+        self._basepath = value
+
+    @property
+    def compact_size(self) -> int:
+        return self._compact_size
+
+    @compact_size.setter
+    def compact_size(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The compact_size property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._compact_size = value
+
+    @property
+    def fsync_en(self) -> bool:
+        return self._fsync_en
+
+    @fsync_en.setter
+    def fsync_en(self, value: bool) -> None:
+        assert isinstance(value, bool), 'The fsync_en property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, bool.__name__)
+        self._fsync_en = value
+
+    @property
+    def tail_size(self) -> int:
+        return len(self._tail)
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+
+    def attach(self) -> None:
+        EventWordAdded.subscribe(self.handler_word_added)
+        EventWordRemoved.subscribe(self.handler_word_removed)
+        EventWordUpdated.subscribe(self.handler_word_updated)
+        EventWordBatch.subscribe(self.handler_word_batch)
+
+    def detach(self) -> None:
+        EventWordAdded.unsubscribe(self.handler_word_added)
+        EventWordRemoved.unsubscribe(self.handler_word_removed)
+        EventWordUpdated.unsubscribe(self.handler_word_updated)
+        EventWordBatch.unsubscribe(self.handler_word_batch)
+
+
+    def append(self, op: JournalOp, guid: int, payload: bytes = b'') -> None:
+        key = self.JOURNAL_RECORD_KEY.pack(op, guid)
+        crc = zlib.crc32(payload, zlib.crc32(key))
+        self._tail += self.JOURNAL_RECORD.pack(len(payload), crc, op, guid)
+        self._tail += payload
+
+
+    def flush(self) -> None:
+        """Writes the tail to the journal file and starts a compaction if the file became too large."""
+        self._write_tail()
+        if self.size >= self.compact_size:
+            self.compact()
+
+
+    def _write_tail(self) -> None:
+        if not self._tail:
+            return
+        with open(self.path, 'ab') as fd:
+            if fd.tell() == 0:
+                fd.write(self.JOURNAL_HEADER.pack(self.JOURNAL_MAGIC, self.JOURNAL_VERSION))
+            fd.write(self._tail)
+            fd.flush()
+            if self.fsync_en:
+                os.fsync(fd.fileno())
+        self._tail.clear()
+
+
+    def replay(self) -> int:
+        """Applies the journal files to the dictionary model, returns the number of applied records."""
+        reccnt = 0
+        for path in (self.old_path, self.path):
+            if os.path.exists(path):
+                reccnt += self._replay_file(path, self.dictmdl)
+        return reccnt
+
+
+    def _replay_file(self, path: str, dictmdl: DictModel) -> int:
+        with open(path, 'r+b') as fd:
+            data = fd.read()
+            if len(data) < self.JOURNAL_HEADER.size:
+                # Nothing was completely written into the file.
+                self._truncate(fd, path, 0)
+                return 0
+
+            magic, version = self.JOURNAL_HEADER.unpack_from(data)
+            if magic != self.JOURNAL_MAGIC:
+                raise DictMdlLoadException(DictMdlLoadException.ID_JOURNAL_INVALID,
+                        filepath = path, reason = 'bad magic {}'.format(magic))
+            if version != self.JOURNAL_VERSION:
+                raise DictMdlLoadException(DictMdlLoadException.ID_JOURNAL_INVALID,
+                        filepath = path, reason = 'unsupported version {}'.format(version))
+
+            reccnt = 0
+            offset = self.JOURNAL_HEADER.size
+            while offset < len(data):
+                payload_start = offset + self.JOURNAL_RECORD.size
+                if payload_start > len(data):
+                    break
+                length, crc, op, guid = self.JOURNAL_RECORD.unpack_from(data, offset)
+                payload = data[payload_start:payload_start + length]
+                key = self.JOURNAL_RECORD_KEY.pack(op, guid)
+                if (len(payload) != length) or (zlib.crc32(payload, zlib.crc32(key)) != crc):
+                    break
+                self._apply(dictmdl, path, op, guid, payload)
+                reccnt += 1
+                offset = payload_start + length
+
+            if offset < len(data):
+                # The tail of the last write was lost (e.g. the application crashed during the flush).
+                self._truncate(fd, path, offset)
+        return reccnt
+
+
+    def _truncate(self, fd: object, path: str, offset: int) -> None:
+        logger.warning('Incomplete journal record is dropped from {} at offset {}.'.format(path, offset))
+        fd.truncate(offset)
+
+
+    def _apply(self, dictmdl: DictModel, path: str, op: int, guid: int, payload: bytes) -> None:
+        if (op == JournalOp.ADD) or (op == JournalOp.UPDATE):
+            word = self._codec.unpack_word(payload)
+            if word.guid != guid:
+                raise DictMdlLoadException(DictMdlLoadException.ID_JOURNAL_INVALID,
+                        filepath = path, reason = 'guid mismatch {} != {}'.format(word.guid, guid))
+            if word.guid in dictmdl:
+                dictmdl.update_word(word)
+            else:
+                dictmdl.add_word(word)
+        elif op == JournalOp.REMOVE:
+            if guid in dictmdl:
+                dictmdl.remove_word(guid)
+        else:
+            raise DictMdlLoadException(DictMdlLoadException.ID_JOURNAL_INVALID,
+                    filepath = path, reason = 'unknown operation {}'.format(op))
+
+
+    def compact(self) -> bool:
+        """Starts folding the journal into the base file, returns False if a compaction is running."""
+        if self.compacting:
+            return False
+
+        self._write_tail()
+        if not os.path.exists(self.path):
+            return False
+
+        if os.path.exists(self.old_path):
+            # The previous compaction failed, so its journal is still needed.
+            with open(self.path, 'rb') as fd_journal, open(self.old_path, 'ab') as fd_old:
+                fd_journal.seek(self.JOURNAL_HEADER.size)
+                fd_old.write(fd_journal.read())
+                fd_old.flush()
+                os.fsync(fd_old.fileno())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.old_path)
+
+        # The saver follows the current dictmdl and basepath properties.
+        if (self._saver is None) or (self._saver.dictmdl is not self.dictmdl) or (self._saver.path != self.basepath):
+            self._saver = AsyncDictMdlSaver(self.dictmdl, self.basepath, on_finished = self._handle_compacted)
+        self._saver.save()
+        return True
+
+
+    @property
+    def compacting(self) -> bool:
+        return (self._saver is not None) and self._saver.saving
+
+    def wait_compaction(self, timeout: float = None) -> bool:
+        return (self._saver is None) or self._saver.wait(timeout)
+
+
+    def _handle_compacted(self, basepath: str) -> None:
+        os.remove(self.old_path)
+        logger.info('The journal is compacted into {}.'.format(basepath))
+
+
+    def handler_word_added(self, event: EventWordAdded, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            word = self.dictmdl.get_word(event.guid)
+            self.append(JournalOp.ADD, word.guid, self._codec.pack_word(word))
+
+    def handler_word_removed(self, event: EventWordRemoved, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self.append(JournalOp.REMOVE, event.guid)
+
+    def handler_word_updated(self, event: EventWordUpdated, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            word = self.dictmdl.get_word(event.guid)
+            self.append(JournalOp.UPDATE, word.guid, self._codec.pack_word(word))
+
+    def handler_word_batch(self, event: EventWordBatch, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            for guid in EventWordBatch.iter_guids(event.removed):
+                self.append(JournalOp.REMOVE, guid)
+            for op, ranges in ((JournalOp.ADD, event.added), (JournalOp.UPDATE, event.updated)):
+                for guid in EventWordBatch.iter_guids(ranges):
+                    self.append(op, guid, self._codec.pack_word(self.dictmdl.get_word(guid)))
@@ -4,6 +4,8 @@ from abc import ABC
 class LangObj(ABC):
     """description of class"""
 
+    __slots__ = ('_guid',)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._guid = None
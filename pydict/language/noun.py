@@ -1,10 +1,13 @@
+import sys
 from language.word import Word, WordClass
 from language.langobj import LangObj
 from language.article import GrammaticalGender, GrammaticalCase, Article, ArticleType
 
 class Noun(Word):
     """description of class"""
-    
+
+    __slots__ = ('_gender', '_singular_exist', '_plural_exist', '_nounsn', '_nounpl')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._gender = None
@@ -60,7 +63,7 @@ class Noun(Word):
     def nounsn(self, value: str) -> None:
         assert (value is None) or isinstance(value, str), 'The nounsn property of {} class shall have {} type.'\
                .format(self.__class__.__name__, str.__name__)
-        self._nounsn = value
+        self._nounsn = None if value is None else sys.intern(value)
 
     @property
     def nounpl(self) -> str:
@@ -70,7 +73,7 @@ class Noun(Word):
     def nounpl(self, value: str) -> None:
         assert (value is None) or isinstance(value, str), 'The nounpl property of {} class shall have {} type.'\
                .format(self.__class__.__name__, str.__name__)
-        self._nounpl = value
+        self._nounpl = None if value is None else sys.intern(value)
 
     def __str__(self) -> str:
         articlestr = ''
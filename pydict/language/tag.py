@@ -1,8 +1,10 @@
+import sys
 from language.langobj import LangObj
 
 class Tag(LangObj):
     """description of class"""
-    
+
+    __slots__ = ('_tag', '_description')
 
     @property
     def tag(self) -> str:
@@ -12,7 +14,7 @@ class Tag(LangObj):
     def tag(self, value: str) -> None:
         assert isinstance(value, str), 'The tag property of {} class shall have {} type.'\
                .format(self.__class__.__name__, str.__name__)
-        self._tag = value
+        self._tag = sys.intern(value)
 
 
     @property
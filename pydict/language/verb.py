@@ -3,6 +3,8 @@ from word import Word, WordClass
 class Verb(Word):
     """description of class"""
 
+    __slots__ = ()
+
     def get_wordclass(self):
         return WordClass.VERB
 
@@ -1,6 +1,8 @@
 from language.langobj import LangObj
 from enum import Enum, unique
 import abc
+import copyreg
+import collections.abc
 
 @unique
 class WordClass(Enum):
@@ -10,9 +12,14 @@ class WordClass(Enum):
 class Word(LangObj):
     """description of class"""
 
+    __slots__ = ('_hun',)
+
+    # The translations of the words without any, shared until hun is requested for a change.
+    EMPTY_HUN = frozenset()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._hun = set()
+        self._hun = Word.EMPTY_HUN
 
     @abc.abstractmethod
     def get_wordclass(self):
@@ -24,6 +31,24 @@ class Word(LangObj):
        
     @property
     def hun(self) -> set:
+        """The translations for changing: a set is allocated for a word without translations, so
+        the readers shall use hun_view."""
+        if self._hun is Word.EMPTY_HUN:
+            self._hun = set()
+        return self._hun
+
+    @property
+    def hun_view(self) -> collections.abc.Set:
+        """The translations for reading only, a set which shall not be changed (the shared
+        EMPTY_HUN for a word without translations, no set is allocated)."""
         return self._hun
 
+    def __copy__(self) -> 'Word':
+        # The translations are copied too, so the copy can be edited without touching the original.
+        clone = self.__class__.__new__(self.__class__)
+        for name in copyreg._slotnames(self.__class__):
+            setattr(clone, name, getattr(self, name))
+        clone._hun = set(self._hun) if self._hun else Word.EMPTY_HUN
+        return clone
+
     
\ No newline at end of file
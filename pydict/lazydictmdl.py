@@ -0,0 +1,251 @@
+import os
+import mmap
+import logging
+from collections import OrderedDict
+from language.word import Word
+from dictmdl import DictModel
+from persistence import DictMdlLoadException
+from binpersistence import BinDictMdlPersistence
+
+logger = logging.getLogger(__name__)
+
+
+class LazyDictModel(DictModel):
+    """Dictionary model which builds the words of a binary snapshot on demand.
+
+    Only a guid -> record offset index is kept for the snapshot, the words are built in
+    get_word and kept in an LRU cache of cache_size words. The added and updated words are
+    pinned in memory, they are never evicted (the snapshot does not contain them). A word
+    shall be changed through update_word, an in-place edit of a cached word may be lost.
+
+    __contains__, __len__ and get_wordguidlist use the index only, get_wordlist builds every
+    word (without filling the cache). iter_records reads the records without building the words.
+    """
+
+    DEFAULT_CACHE_SIZE = 4096
+
+
+    def __init__(self, path: str = None, cache_size: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self._codec = BinDictMdlPersistence(path = path)
+        self._index = {}
+        self._cache = OrderedDict()
+        self._pinned = {}
+        self._mm = None
+        self._view = None
+        self._heap = None
+        self._heapstart = 0
+
+        if cache_size is None:
+            self.cache_size = self.DEFAULT_CACHE_SIZE
+        else:
+            self.cache_size = cache_size
+
+        if path is not None:
+            try:
+                self.open(path)
+            except BaseException:
+                # The model is not handed out, it shall not serve the word requests of the application.
+                self.disable_events()
+                raise
+
+
+    @property
+    def cache_size(self) -> int:
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The cache_size property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._cache_size = value
+        self._evict()
+
+    @property
+    def cached_count(self) -> int:
+        return len(self._cache)
+
+    @property
+    def pinned_count(self) -> int:
+        return len(self._pinned)
+
+
+    def open(self, path: str) -> None:
+        """Indexes the records of the binary snapshot at path."""
+        self.close()
+        self._codec.path = path
+        with open(path, 'rb') as fd:
+            if os.fstat(fd.fileno()).st_size == 0:
+                raise DictMdlLoadException(DictMdlLoadException.ID_SNAPSHOT_INVALID,
+                        filepath = path, reason = 'empty file')
+            # The mapping stays valid even if the file is replaced later.
+            self._mm = mmap.mmap(fd.fileno(), 0, access = mmap.ACCESS_READ)
+
+        try:
+            self._view = memoryview(self._mm)
+            tablestart, heapstart = self._codec._check_header(self._view)
+            self._heap = self._view[heapstart:]
+            self._heapstart = heapstart
+            recsize = self._codec.BIN_RECORD.size
+            with self._view[tablestart:heapstart] as table:
+                for offset, record in zip(range(tablestart, heapstart, recsize), self._codec.BIN_RECORD.iter_unpack(table)):
+                    guid = record[0]
+                    if guid in self._index:
+                        raise DictMdlLoadException(DictMdlLoadException.ID_GUID_NOT_UNIQUE,
+                                filepath = path, guid_value = guid)
+                    self._index[guid] = offset
+                    if guid > self._maxguid:
+                        self._maxguid = guid
+        except BaseException:
+            self.close()
+            raise
+        self.guid_alloc_en = True
+        logger.info('{} words are indexed in {}.'.format(len(self._index), path))
+
+
+    def close(self) -> None:
+        self._index.clear()
+        self._cache.clear()
+        self._pinned.clear()
+        self._clear_indexes()
+        self._maxguid = -1
+        # The views are released before the mapping, the header check of a failed open may
+        # have left only the view or only the mapping.
+        if self._heap is not None:
+            self._heap.release()
+            self._heap = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # Still viewed by a snapshot, it is unmapped when the last snapshot releases it.
+                pass
+            self._mm = None
+
+
+    def add_word(self, word: Word) -> None:
+        assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
+               .format(self.add_word.__name__, self.__class__.__name__, Word.__name__)
+        assert (word.guid not in self._index), 'The guid property of the word parameter of {} method in {} class shall '\
+               'not exist in dictionary model. (guid: {})'.format(self.add_word.__name__,self.__class__.__name__,word.guid)
+        self._index[word.guid] = None
+        self._pinned[word.guid] = word
+        if word.guid > self._maxguid:
+            self._maxguid = word.guid
+        self._notify_added(word.guid)
+
+
+    def remove_word(self, guid: int) -> Word:
+        assert isinstance(guid, int), 'The guid parameter of {} method in {} class shall have {} type.'\
+               .format(self.remove_word.__name__, self.__class__.__name__, int.__name__)
+        word = self.get_word(guid)
+        if word is None:
+            raise KeyError(guid)
+        self._notify_removed(guid)
+        del self._index[guid]
+        self._pinned.pop(guid, None)
+        self._cache.pop(guid, None)
+        return word
+
+
+    def update_word(self, word: Word) -> None:
+        assert isinstance(word, Word), 'The word parameter of {} method in {} class shall have {} type.'\
+               .format(self.update_word.__name__, self.__class__.__name__, Word.__name__)
+        assert (word.guid in self._index), 'The guid property of the word parameter of {} method in {} class shall '\
+               'exist in dictionary model. (guid: {})'.format(self.update_word.__name__,self.__class__.__name__,word.guid)
+        self._cache.pop(word.guid, None)
+        self._pinned[word.guid] = word
+        self._notify_updated(word.guid)
+
+
+    def get_word(self, guid: int) -> Word:
+        word = self._pinned.get(guid)
+        if word is not None:
+            return word
+
+        word = self._cache.get(guid)
+        if word is not None:
+            self._cache.move_to_end(guid)
+            return word
+
+        offset = self._index.get(guid)
+        if offset is None:
+            return None
+        word = self._build_word(offset)
+        self._cache[guid] = word
+        self._evict()
+        return word
+
+
+    def _get_words(self, guids: object) -> object:
+        return map(self.get_word, guids)
+
+
+    def _build_word(self, offset: int) -> Word:
+        record = self._codec.BIN_RECORD.unpack_from(self._view, offset)
+        return self._codec._unpack_word(record, self._heap)
+
+
+    def _evict(self) -> None:
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last = False)
+
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+
+    def get_wordlist(self, is_ordered: bool = False, guid_asc_ndesc: bool = True) -> list:
+        wordlist = []
+        guids = self._get_ordered_guids(guid_asc_ndesc) if is_ordered == True else self._index
+        for guid in guids:
+            word = self._pinned.get(guid) or self._cache.get(guid)
+            if word is None:
+                word = self._build_word(self._index[guid])
+            wordlist.append(word)
+        return wordlist
+
+
+    def iter_records(self) -> object:
+        """Yields the (BIN_RECORD tuple, heap of its strings) pairs of the words.
+
+        The records of the snapshot are read without building the words, the changed words are
+        packed by BinDictMdlPersistence.pack_word.
+        """
+        recsize = self._codec.BIN_RECORD.size
+        for word in self._pinned.values():
+            data = self._codec.pack_word(word)
+            yield self._codec.BIN_RECORD.unpack_from(data), data[recsize:]
+        if self._view is not None:
+            # The table is read in one pass, the removed and the pinned words are skipped.
+            with self._view[self._codec.BIN_HEADER.size:self._heapstart] as table:
+                for record in self._codec.BIN_RECORD.iter_unpack(table):
+                    if (record[0] in self._index) and (record[0] not in self._pinned):
+                        yield record, self._heap
+
+
+    def get_wordguidlist(self) -> list:
+        return list(self._index.keys())
+
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+    def snapshot(self) -> 'LazyDictModel':
+        # The snapshot shares the mapped file and the pinned words, only the index and the pin map are copied.
+        snapshot = LazyDictModel(cache_size = self.cache_size, event_en = False)
+        snapshot._codec.path = self._codec.path
+        if self._mm is not None:
+            # Views of its own, so the close of the model does not release them under a running save.
+            snapshot._mm = self._mm
+            snapshot._view = memoryview(self._mm)
+            snapshot._heap = snapshot._view[self._heapstart:]
+            snapshot._heapstart = self._heapstart
+        snapshot._index = dict(self._index)
+        snapshot._pinned = dict(self._pinned)
+        snapshot._maxguid = self._maxguid
+        return snapshot
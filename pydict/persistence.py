@@ -1,6 +1,17 @@
+import io
+import os
+import sys
 import abc
+import gzip
+import lzma
+import mmap
 import logging
+import tempfile
+import itertools
+import contextlib
+import concurrent.futures
 from abc import ABC
+from enum import Enum, unique
 from language.noun import Noun
 from language.word import Word, WordClass
 from language.article import GrammaticalGender, GrammaticalCase, ArticleType, Article
@@ -16,6 +27,8 @@ class DictMdlLoadException(Exception):
     ID_XML_INVALID_TEXT = 'XmlInvalidText'
     ID_GUID_NOT_UNIQUE = 'GuidNotUnique'
     ID_XML_SYNTAX_ERR = 'XmlSyntaxError'
+    ID_SNAPSHOT_INVALID = 'SnapshotInvalid'
+    ID_JOURNAL_INVALID = 'JournalInvalid'
 
     def __init__(self, id: str, *args, **kwargs):
         super().__init__()
@@ -33,6 +46,8 @@ class DictMdlLoadException(Exception):
             self.xtext = id + '{{filepath: {filepath}, guid_value: {guid_value}}}'.format(**kwargs)
         elif id == self.ID_XML_SYNTAX_ERR:
             self.xtext = id + str(kwargs)
+        elif (id == self.ID_SNAPSHOT_INVALID) or (id == self.ID_JOURNAL_INVALID):
+            self.xtext = id + '{{filepath: {filepath}, reason: {reason}}}'.format(**kwargs)
         else:
             self.xtext += id + str(kwargs)
         logger.error(self.xtext)
@@ -45,6 +60,29 @@ class DictMdlSaveException(Exception):
         super().__init__()
         self.xtext = 'NotFilledIn'
 
+@contextlib.contextmanager
+def atomic_open(path: str, mode: str = 'wb', **kwargs) -> object:
+    """Opens a temporary file next to path which replaces path only if the block succeeds.
+
+    The keyword arguments (e.g. encoding, newline) are passed to open for a text mode.
+    """
+    dirpath, filename = os.path.split(os.path.abspath(path))
+    fd, tmppath = tempfile.mkstemp(prefix = '.' + filename + '.', suffix = '.tmp', dir = dirpath)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            os.chmod(tmppath, os.stat(path).st_mode)
+        os.replace(tmppath, path)
+    except BaseException:
+        if os.path.exists(tmppath):
+            os.remove(tmppath)
+        raise
+
+
+
 class IDictMdlPersistence(ABC):
     """description of class"""
 
@@ -96,6 +134,33 @@ class IDictMdlPersistence(ABC):
 
 
 
+@unique
+class XmlLoadMode(Enum):
+    DOM       = 0
+    STREAMING = 1
+    PARALLEL  = 2
+
+@unique
+class XmlSaveMode(Enum):
+    DOM       = 0
+    STREAMING = 1
+
+@unique
+class XmlCompression(Enum):
+    NONE = 0
+    GZIP = 1
+    XZ   = 2
+
+
+
+class _GuidDictModel(DictModel):
+    # Used by XmlDictMdlPersistence.iter_words: only the guids of the added words are kept.
+
+    def add_word(self, word: Word) -> None:
+        self._worddict[word.guid] = None
+
+
+
 class XmlDictMdlPersistence(IDictMdlPersistence):
     
     XML_ROOT_TAG = 'Dictionary'
@@ -115,21 +180,185 @@ class XmlDictMdlPersistence(IDictMdlPersistence):
     XML_NOUN_GER_ART_DAS_TEXT = 'das'
     XML_NONE_TEXT = '__None__'
 
-    XML_FILE_DEFAULT_CODING = 'UTF-8'
+    # Dispatch tables of the single pass parser: the child tags of <Word> and <German> mapped to
+    # the position of the element in the result of _scan_children.
+    XML_WORD_SLOTS = {
+        XML_GUID_TAG      : 0,
+        XML_WORDCLASS_TAG : 1,
+        XML_WORD_GER_TAG  : 2,
+        XML_WORD_HUN_TAG  : 3
+    }
+    XML_NOUN_GER_SLOTS = {
+        XML_NOUN_GER_ART_TAG : 0,
+        XML_NOUN_GER_SN_TAG  : 1,
+        XML_NOUN_GER_PL_TAG  : 2
+    }
 
-    def __init__(self, **kwargs):
+    XML_FILE_DEFAULT_CODING = 'UTF-8'
+    XML_INDENT_TEXT = '  '
+
+    XML_COMPRESSION_MAGICS = {
+        XmlCompression.GZIP : b'\x1f\x8b',
+        XmlCompression.XZ   : b'\xfd7zXZ\x00'
+    }
+    XML_COMPRESSION_EXTENSIONS = {
+        XmlCompression.GZIP : '.gz',
+        XmlCompression.XZ   : '.xz'
+    }
+
+    XML_WORDCOLL_START = b'<WordCollection>'
+    XML_WORDCOLL_END = b'</WordCollection>'
+    XML_WORD_START = b'<Word>'
+    DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, load_mode: XmlLoadMode = None, save_mode: XmlSaveMode = None, **kwargs):
         super().__init__(**kwargs)
         self._dictxml = None
+        self._xmlpathbase = None
+        self._xmlpathidx = 0
+        self.workers = os.cpu_count() or 1
+        self.chunk_size = self.DEFAULT_CHUNK_SIZE
+        self.compression = None
+        self.compress_level = None
+
+        if load_mode is None:
+            self.load_mode = XmlLoadMode.DOM
+        else:
+            self.load_mode = load_mode
+
+        if save_mode is None:
+            self.save_mode = XmlSaveMode.DOM
+        else:
+            self.save_mode = save_mode
+
+
+    @property
+    def load_mode(self) -> XmlLoadMode:
+        return self._load_mode
+
+    @load_mode.setter
+    def load_mode(self, value: XmlLoadMode) -> None:
+        assert isinstance(value, XmlLoadMode), 'The load_mode property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, XmlLoadMode.__name__)
+        self._load_mode = value
+
+    @property
+    def save_mode(self) -> XmlSaveMode:
+        return self._save_mode
+
+    @save_mode.setter
+    def save_mode(self, value: XmlSaveMode) -> None:
+        assert isinstance(value, XmlSaveMode), 'The save_mode property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, XmlSaveMode.__name__)
+        self._save_mode = value
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @workers.setter
+    def workers(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The workers property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._workers = value
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The chunk_size property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._chunk_size = value
+
+
+    @property
+    def compression(self) -> XmlCompression:
+        """The compression of the file, None means detection by magic bytes (load) or extension (save)."""
+        return self._compression
+
+    @compression.setter
+    def compression(self, value: XmlCompression) -> None:
+        assert (value is None) or isinstance(value, XmlCompression), 'The compression property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, XmlCompression.__name__)
+        self._compression = value
+
+    @property
+    def compress_level(self) -> int:
+        """The gzip compresslevel or the xz preset (0-9) of the save, None means the default of the module."""
+        return self._compress_level
+
+    @compress_level.setter
+    def compress_level(self, value: int) -> None:
+        assert (value is None) or (isinstance(value, int) and (0 <= value <= 9)),\
+               'The compress_level property of {} class shall be an {} between 0 and 9.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._compress_level = value
+
+
+    def get_compression(self, for_save: bool = False) -> XmlCompression:
+        if self.compression is not None:
+            return self.compression
+
+        if not for_save and os.path.exists(self.path):
+            with open(self.path, 'rb') as fd:
+                head = fd.read(max(len(magic) for magic in self.XML_COMPRESSION_MAGICS.values()))
+            for compression, magic in self.XML_COMPRESSION_MAGICS.items():
+                if head.startswith(magic):
+                    return compression
+            return XmlCompression.NONE
+
+        for compression, extension in self.XML_COMPRESSION_EXTENSIONS.items():
+            if self.path.lower().endswith(extension):
+                return compression
+        return XmlCompression.NONE
+
+
+    @contextlib.contextmanager
+    def _open_load(self) -> object:
+        # The decompressed data is streamed into the parser, it is never held in memory at once.
+        compression = self.get_compression()
+        with open(self.path, 'rb') as fd:
+            if compression == XmlCompression.GZIP:
+                with gzip.GzipFile(fileobj = fd, mode = 'rb') as input:
+                    yield input
+            elif compression == XmlCompression.XZ:
+                with lzma.LZMAFile(fd, mode = 'rb') as input:
+                    yield input
+            else:
+                yield fd
+
+
+    @contextlib.contextmanager
+    def _open_save(self, fd: object) -> object:
+        compression = self.get_compression(for_save = True)
+        if compression == XmlCompression.GZIP:
+            level = 9 if self.compress_level is None else self.compress_level
+            with gzip.GzipFile(filename = '', fileobj = fd, mode = 'wb', compresslevel = level) as output:
+                yield output
+        elif compression == XmlCompression.XZ:
+            with lzma.LZMAFile(fd, mode = 'wb', preset = self.compress_level) as output:
+                yield output
+        else:
+            yield fd
 
 
     def load_dict(self) -> DictModel:
-        self._dictxml = etree.parse(self.path)
-        self._load_dict_skeleton()
+        if self.load_mode == XmlLoadMode.STREAMING:
+            self._load_dict_stream()
+        elif self.load_mode == XmlLoadMode.PARALLEL:
+            self._load_dict_parallel()
+        else:
+            with self._open_load() as input:
+                self._dictxml = etree.parse(input)
+            self._load_dict_skeleton()
         self.dictmdl.guid_alloc_en = True
 
 
     def from_string(self, string: str) -> DictModel:
-        self._dictxml = etree.fromstring(string)
+        # The string of to_string has an encoding declaration, which lxml accepts only in bytes.
+        self._dictxml = etree.ElementTree(etree.fromstring(string.encode(self.XML_FILE_DEFAULT_CODING)))
         self._load_dict_skeleton()
 
 
@@ -137,98 +366,298 @@ class XmlDictMdlPersistence(IDictMdlPersistence):
         if self.dictmdl is None:
             self.dictmdl = IDictMdlPersistence.DEFAULT_DICTMDL_CLASS()
         
+        xmlwordcoll = self._load_dict_head()
+        wordcntr = 0
+        try:
+            for xmlword in xmlwordcoll:
+                if xmlword.tag != self.XML_WORD_TAG:
+                    raise DictMdlLoadException(DictMdlLoadException.ID_XML_INVALID_TAG,
+                            filepath = self.path, xmlpath = self._getelementpath(xmlword),
+                            current_tag = xmlword.tag, expected_tag = self.XML_WORD_TAG)
+
+                # The words are indexed as in the streaming load, see _getelementpath.
+                wordcntr += 1
+                self._xmlpathbase = xmlword
+                self._xmlpathidx = wordcntr
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('XmlParseStage: {} file {}/{}.'.format(self.path,
+                                    xmlword.tag, self._getelementpath(xmlword)))
+                self._load_word(xmlword)
+                self._xmlpathbase = None
+        finally:
+            self._xmlpathbase = None
+
+
+    def _load_dict_head(self) -> etree._Element:
         xmlroot = self._dictxml.getroot()
         
         if xmlroot.tag != self.XML_ROOT_TAG:     
             raise DictMdlLoadException(DictMdlLoadException.ID_XML_INVALID_TAG,
-                    filepath = self.path, xmlpath = self._dictxml.getelementpath(xmlroot),
+                    filepath = self.path, xmlpath = self._getelementpath(xmlroot),
                     current_tag = xmlroot.tag, expected_tag = self.XML_ROOT_TAG)
 
         if len(xmlroot) == 0:
             raise DictMdlLoadException(DictMdlLoadException.ID_XML_MISSING_TAG,
-                    filepath = self.path, xmlpath = self._dictxml.getelementpath(xmlroot),
+                    filepath = self.path, xmlpath = self._getelementpath(xmlroot),
                     missing_tag = self.XML_WORDCOLL_TAG)
 
         if xmlroot[0].tag != self.XML_WORDCOLL_TAG:
             raise DictMdlLoadException(DictMdlLoadException.ID_XML_INVALID_TAG,
-                    filepath = self.path, xmlpath = self._dictxml.getelementpath(xmlroot[0]),
+                    filepath = self.path, xmlpath = self._getelementpath(xmlroot[0]),
                     current_tag = xmlroot[0].tag, expected_tag = self.XML_WORDCOLL_TAG)
         
-        xmlwordcoll = xmlroot[0]
-        for xmlword in xmlwordcoll:
-            if logger.isEnabledFor(logging.DEBUG):
-                logger.debug('XmlParseStage: {} file {}/{}.'.format(self.path,
-                                xmlword.tag, self._dictxml.getelementpath(xmlword)))
-            if xmlword.tag == self.XML_WORD_TAG:
-                self._load_word(xmlword)
-            else:
+        return xmlroot[0]
+
+
+    def iter_words(self) -> object:
+        """Yields the words of the file one by one, parsed as in streaming mode.
+
+        The words are not kept: the dictmdl property is not changed, only the guids are
+        collected for the uniqueness check.
+        """
+        dictmdl = self.dictmdl
+        self.dictmdl = _GuidDictModel(event_en = False)
+        try:
+            yield from self._iter_dict_stream()
+        finally:
+            self.dictmdl = dictmdl
+
+
+    def _load_dict_stream(self) -> DictModel:
+        if self.dictmdl is None:
+            self.dictmdl = IDictMdlPersistence.DEFAULT_DICTMDL_CLASS()
+        for word in self._iter_dict_stream():
+            pass
+
+
+    def _iter_dict_stream(self) -> object:
+        # Same checks as _load_dict_skeleton, but each <Word> is turned into a Word as soon as its
+        # end tag is parsed and then dropped from the tree, so only one word is kept in memory.
+        xmlwordcoll = None
+        wordcntr = 0
+
+        try:
+            with self._open_load() as input:
+                xmlcontext = etree.iterparse(input, tag = self.XML_WORD_TAG)
+                for event, xmlword in xmlcontext:
+                    if xmlwordcoll is None:
+                        self._dictxml = xmlword.getroottree()
+                        xmlwordcoll = self._load_dict_head()
+
+                    if xmlword.getparent() is not xmlwordcoll:
+                        continue
+
+                    # Only the last loaded word may precede this one, anything else is an invalid tag.
+                    self._load_dict_stream_check(xmlwordcoll, xmlword)
+
+                    wordcntr += 1
+                    self._xmlpathbase = xmlword
+                    self._xmlpathidx = wordcntr
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug('XmlParseStage: {} file {}/{}.'.format(self.path,
+                                        xmlword.tag, self._getelementpath(xmlword)))
+                    word = self._load_word(xmlword)
+                    self._xmlpathbase = None
+
+                    xmlword.clear()
+                    while xmlword.getprevious() is not None:
+                        del xmlwordcoll[0]
+                    if word is not None:
+                        yield word
+
+                if xmlwordcoll is None:
+                    self._dictxml = etree.ElementTree(xmlcontext.root)
+                    xmlwordcoll = self._load_dict_head()
+                self._load_dict_stream_check(xmlwordcoll, None)
+        finally:
+            self._dictxml = None
+            self._xmlpathbase = None
+
+
+    def _load_dict_stream_check(self, xmlwordcoll: etree._Element, xmlword: etree._Element) -> None:
+        for element in xmlwordcoll:
+            if element is xmlword:
+                break
+            elif element.tag != self.XML_WORD_TAG:
                 raise DictMdlLoadException(DictMdlLoadException.ID_XML_INVALID_TAG,
-                        filepath = self.path, xmlpath = self._dictxml.getelementpath(xmlword),
-                        current_tag = xmlword.tag, expected_tag = self.XML_WORD_TAG)
+                        filepath = self.path, xmlpath = self._getelementpath(element),
+                        current_tag = element.tag, expected_tag = self.XML_WORD_TAG)
+
+
+    def _load_dict_parallel(self) -> DictModel:
+        # The <Word> elements of the chunks are parsed into plain records by worker processes,
+        # then the records are merged in file order. Anything unusual (small file, syntax error,
+        # invalid word, ...) falls back to the streaming load, which raises the same exceptions
+        # as before with the correct xmlpath.
+        if self.dictmdl is None:
+            self.dictmdl = IDictMdlPersistence.DEFAULT_DICTMDL_CLASS()
+
+        # The chunk offsets exist only in an uncompressed file.
+        chunks = None if self.get_compression() != XmlCompression.NONE else self._split_dict_chunks()
+        if (chunks is None) or (len(chunks) < 2) or (self.workers < 2):
+            self._load_dict_stream()
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = min(self.workers, len(chunks)),
+                                                    initializer = _init_xml_chunk_worker) as executor:
+            results = list(executor.map(_load_xml_chunk, itertools.repeat(self.path), *zip(*chunks)))
+
+        if None in results:
+            logger.info('Parallel load of {} is not possible, it is loaded in streaming mode.'.format(self.path))
+            self._load_dict_stream()
+            return
+
+        for records in results:
+            for record in records:
+                if record[0] in self.dictmdl:
+                    raise DictMdlLoadException(DictMdlLoadException.ID_GUID_NOT_UNIQUE,
+                            filepath = self.path, guid_value = record[0])
+                if len(record) > 1:
+                    self.dictmdl.add_word(self._unpack_record(record))
+
+
+    def _split_dict_chunks(self) -> list:
+        """Returns the (start, end, preceding word count) of the <Word> aligned chunks of the
+        WordCollection, or None if the file cannot be split."""
+        with open(self.path, 'rb') as fd:
+            if os.fstat(fd.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(fd.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+                bodystart = mm.find(self.XML_WORDCOLL_START)
+                bodyend = mm.rfind(self.XML_WORDCOLL_END)
+                if (bodystart < 0) or (bodyend < bodystart):
+                    return None
+                bodystart += len(self.XML_WORDCOLL_START)
+
+                # Everything except the words is checked here: the chunks are parsed as UTF-8
+                # and they shall be the content of the first child of the root.
+                try:
+                    xmlroot = etree.fromstring(mm[:bodystart] + mm[bodyend:])
+                except etree.XMLSyntaxError:
+                    return None
+                encoding = xmlroot.getroottree().docinfo.encoding or self.XML_FILE_DEFAULT_CODING
+                if (encoding.upper() != self.XML_FILE_DEFAULT_CODING) or (xmlroot.tag != self.XML_ROOT_TAG) or \
+                   (len(xmlroot) == 0) or (xmlroot[0].tag != self.XML_WORDCOLL_TAG):
+                    return None
+
+                chunks = []
+                start = bodystart
+                wordoffset = 0
+                while start < bodyend:
+                    end = mm.find(self.XML_WORD_START, start + self.chunk_size, bodyend)
+                    if end < 0:
+                        end = bodyend
+                    chunks.append((start, end, wordoffset))
+                    # Only used for the xmlpath of the warnings.
+                    wordoffset += mm[start:end].count(self.XML_WORD_START)
+                    start = end
+        return chunks
+
+
+    def _load_dict_chunk(self, chunk: bytes, wordoffset: int) -> list:
+        xmlwordcoll = etree.fromstring(self.XML_WORDCOLL_START + chunk + self.XML_WORDCOLL_END)
+        records = []
+        for wordidx, xmlword in enumerate(xmlwordcoll, wordoffset + 1):
+            if xmlword.tag != self.XML_WORD_TAG:
+                return None
+            self._xmlpathbase = xmlword
+            self._xmlpathidx = wordidx
+            word = self._load_word(xmlword)
+            if word is None:
+                # A word which is not added still takes part in the GUID uniqueness check.
+                guid = self._parse_guid(self._scan_children(xmlword, self.XML_WORD_SLOTS)[0].text)
+                records.append((guid,))
+            else:
+                records.append(self._pack_record(word))
+        self._xmlpathbase = None
+        return records
+
+
+    def _pack_record(self, word: Word) -> tuple:
+        gender = None if word.gender is None else word.gender.value
+        return (word.guid, gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl, tuple(word.hun_view))
+
+    def _unpack_record(self, record: tuple) -> Word:
+        guid, gender, singular_exist, plural_exist, nounsn, nounpl, hun = record
+        noun = Noun()
+        noun.guid = guid
+        noun.gender = None if gender is None else GrammaticalGender(gender)
+        noun.singular_exist = singular_exist
+        noun.plural_exist = plural_exist
+        noun.nounsn = nounsn
+        noun.nounpl = nounpl
+        if hun:
+            noun.hun.update(map(sys.intern, hun))
+        return noun
+
+
+    def _getelementpath(self, element: etree._Element) -> str:
+        if self._xmlpathbase is None:
+            return self._dictxml.getelementpath(element)
+
+        # Inside a word: the streaming load has already dropped the preceding words, so the index
+        # of the word is counted during the parse and only the path inside the word comes from
+        # the tree. The index is written even for a single word (unlike getelementpath), since
+        # the streaming load cannot know whether more words follow, and the DOM load does the same.
+        xmlpath = '{}/{}[{}]'.format(self.XML_WORDCOLL_TAG, self.XML_WORD_TAG, self._xmlpathidx)
+        xmlsubpath = etree.ElementTree(self._xmlpathbase).getelementpath(element)
+        if xmlsubpath != '.':
+            xmlpath += '/' + xmlsubpath
+        return xmlpath
+
+
+    def _scan_children(self, xmlparent: etree._Element, slots: dict) -> list:
+        """Returns the last child of xmlparent for each tag of slots (tag -> index) in one pass."""
+        elements = [None] * len(slots)
+        for element in xmlparent:
+            slot = slots.get(element.tag)
+            if slot is not None:
+                elements[slot] = element
+        return elements
 
 
     def _load_word(self, xmlword: Word) -> Word:
-        guid = None
-        xmlguid = None
-        for element in xmlword:
-            if element.tag == self.XML_GUID_TAG:
-               xmlguid = element 
-               guid = self._parse_guid(element.text)
+        xmlguid, xmlwordclass, xmlger, xmlhun = self._scan_children(xmlword, self.XML_WORD_SLOTS)
 
         if xmlguid is None:
             raise DictMdlLoadException(DictMdlLoadException.ID_XML_MISSING_TAG,
-                    filepath = self.path, xmlpath = self._dictxml.getelementpath(xmlword),
+                    filepath = self.path, xmlpath = self._getelementpath(xmlword),
                     missing_tag = self.XML_GUID_TAG)
-        elif guid is None:
+        guid = self._parse_guid(xmlguid.text)
+        if guid is None:
             raise DictMdlLoadException(DictMdlLoadException.ID_XML_INVALID_TEXT,
-                    filepath = self.path, xmlpath = self._dictxml.getelementpath(xmlguid),
+                    filepath = self.path, xmlpath = self._getelementpath(xmlguid),
                     text = xmlguid.text)
         elif guid in self.dictmdl:
             raise DictMdlLoadException(DictMdlLoadException.ID_GUID_NOT_UNIQUE,
                     filepath = self.path, guid_value = guid)
 
         word = None
-        xmlhun = None
-        for element in xmlword:
-            if element.tag == self.XML_WORDCLASS_TAG:
-                if element.text == self.XML_WORDCLASS_NOUN_TEXT:
-                    word = self._load_noun(xmlword)
-                else:
-                    logger.warning('Unknown WordClass "{}" is found at {} in {}.'.format(
-                                    element.text, self._dictxml.getelementpath(element), self.path))
-            elif element.tag == self.XML_WORD_HUN_TAG:
-                xmlhun = element
+        if xmlwordclass is not None:
+            if xmlwordclass.text == self.XML_WORDCLASS_NOUN_TEXT:
+                word = self._load_noun(xmlger)
+            else:
+                logger.warning('Unknown WordClass "{}" is found at {} in {}.'.format(
+                                xmlwordclass.text, self._getelementpath(xmlwordclass), self.path))
 
         if word is not None:
             if xmlhun is not None:
-                xmlhunlongtext = element.text
+                xmlhunlongtext = xmlhun.text
                 if xmlhunlongtext is not None:
-                    word.hun.update([hunstr.strip() for hunstr in xmlhunlongtext.split(self.XML_WORD_HUN_TEXT_SEP)])
-                word.guid = guid
-                
+                    word.hun.update([sys.intern(hunstr.strip()) for hunstr in xmlhunlongtext.split(self.XML_WORD_HUN_TEXT_SEP)])
+            word.guid = guid
             self.dictmdl.add_word(word)
         return word
 
 
-    def _load_noun(self, xmlword: etree._Element) -> Noun:
+    def _load_noun(self, xmlger: etree._Element) -> Noun:
         noun = Noun()
 
-        xmlger = None
-        for element in xmlword:
-            if element.tag == self.XML_WORD_GER_TAG:
-                xmlger = element
-                xmlarticletext = None
-                xmlnounsntext = None
-                xmlnounpltext = None
-
         if xmlger is not None:
-            for gersubelement in xmlger:
-                if gersubelement.tag == self.XML_NOUN_GER_ART_TAG:
-                    xmlarticletext = gersubelement.text
-                elif gersubelement.tag == self.XML_NOUN_GER_SN_TAG:
-                    xmlnounsntext = gersubelement.text
-                elif gersubelement.tag == self.XML_NOUN_GER_PL_TAG:
-                    xmlnounpltext = gersubelement.text
+            xmlarticle, xmlnounsn, xmlnounpl = self._scan_children(xmlger, self.XML_NOUN_GER_SLOTS)
+            xmlarticletext = None if xmlarticle is None else xmlarticle.text
+            xmlnounsntext = None if xmlnounsn is None else xmlnounsn.text
+            xmlnounpltext = None if xmlnounpl is None else xmlnounpl.text
 
             if (xmlnounsntext is not None) and (xmlnounsntext.strip() == self.XML_NONE_TEXT):
                 xmlnounsntext = None
@@ -285,12 +714,21 @@ class XmlDictMdlPersistence(IDictMdlPersistence):
         
 
     def save_dict(self) -> None:
-        xmldict = self._save_dict_skeleton()
-        xmldict.write(self.path, pretty_print = True, encoding = self.XML_FILE_DEFAULT_CODING)
+        with atomic_open(self.path, 'wb') as fd, self._open_save(fd) as output:
+            if self.save_mode == XmlSaveMode.STREAMING:
+                self._save_dict_stream(output)
+            else:
+                xmldict = self._save_dict_skeleton()
+                xmldict.write(output, pretty_print = True, encoding = self.XML_FILE_DEFAULT_CODING)
 
     def to_string(self) -> str:
-        xmldict = self._save_dict_skeleton()
-        return etree.tostring(xmldict, pretty_print = True, encoding = self.XML_FILE_DEFAULT_CODING).decode(self.XML_FILE_DEFAULT_CODING)
+        if self.save_mode == XmlSaveMode.STREAMING:
+            output = io.BytesIO()
+            self._save_dict_stream(output)
+            return output.getvalue().decode(self.XML_FILE_DEFAULT_CODING)
+        else:
+            xmldict = self._save_dict_skeleton()
+            return etree.tostring(xmldict, pretty_print = True, encoding = self.XML_FILE_DEFAULT_CODING).decode(self.XML_FILE_DEFAULT_CODING)
 
 
     def _save_dict_skeleton(self) -> etree._ElementTree:
@@ -304,54 +742,97 @@ class XmlDictMdlPersistence(IDictMdlPersistence):
         wordlist = self.dictmdl.get_wordlist()
 
         for word in wordlist:
-            if (word.guid is None):
-                raise ValueError('The guid of Word object shall not be None.')
+            xmlwordcoll.append(self._save_word(word))
+        return xmldict
 
-            xmlword = etree.SubElement(xmlwordcoll, self.XML_WORD_TAG)
-            xmlguid = etree.SubElement(xmlword, self.XML_GUID_TAG)
-            xmlguid.text = hex(word.guid)
-            xmlwordclass = etree.SubElement(xmlword, self.XML_WORDCLASS_TAG)
 
-            if word.get_wordclass() == WordClass.NOUN:
-                xmlwordclass.text = self.XML_WORDCLASS_NOUN_TEXT
-                xmlger = etree.SubElement(xmlword, self.XML_WORD_GER_TAG)
+    def _save_dict_stream(self, output: object) -> None:
+        # Writes the same bytes as the pretty printed _save_dict_skeleton tree, but only one
+        # <Word> element exists at a time. The indentation is written explicitly because
+        # xmlfile does not pretty print the elements it opens itself.
+        if self.dictmdl is None:
+            raise ValueError('The dictmdl shall not be None during save.')
 
-                xmlarticle = etree.SubElement(xmlger, self.XML_NOUN_GER_ART_TAG)
-                
-                if word.gender is None:
-                    xmlarticle.text = ''
+        with etree.xmlfile(output, encoding = self.XML_FILE_DEFAULT_CODING) as xmlfile:
+            with xmlfile.element(self.XML_ROOT_TAG):
+                xmlfile.write('\n' + self.XML_INDENT_TEXT)
+                if len(self.dictmdl) == 0:
+                    xmlfile.write(etree.Element(self.XML_WORDCOLL_TAG))
                 else:
-                    articleenum = Article.get_article(ArticleType.DEFINITE, word.gender, 
-                                                      GrammaticalCase.NOMINATIVE)
-                    if articleenum == Article.DER:
-                        xmlarticle.text = self.XML_NOUN_GER_ART_DER_TEXT
-                    elif articleenum == Article.DIE:
-                        xmlarticle.text = self.XML_NOUN_GER_ART_DIE_TEXT
-                    elif articleenum == Article.DAS:
-                        xmlarticle.text = self.XML_NOUN_GER_ART_DAS_TEXT
-                    else:
-                        xmlarticle.text = ''
-
-                xmlnounsn = etree.SubElement(xmlger, self.XML_NOUN_GER_SN_TAG)
-                if word.singular_exist:
-                    xmlnounsn.text = '' if word.nounsn is None else word.nounsn
+                    with xmlfile.element(self.XML_WORDCOLL_TAG):
+                        for word in self.dictmdl.get_wordlist():
+                            xmlfile.write('\n' + self.XML_INDENT_TEXT * 2)
+                            xmlword = self._save_word(word)
+                            etree.indent(xmlword, space = self.XML_INDENT_TEXT, level = 2)
+                            xmlfile.write(xmlword)
+                        xmlfile.write('\n' + self.XML_INDENT_TEXT)
+                xmlfile.write('\n')
+        output.write(b'\n')
+
+
+    def _save_word(self, word: Word) -> etree._Element:
+        if (word.guid is None):
+            raise ValueError('The guid of Word object shall not be None.')
+
+        xmlword = etree.Element(self.XML_WORD_TAG)
+        xmlguid = etree.SubElement(xmlword, self.XML_GUID_TAG)
+        xmlguid.text = hex(word.guid)
+        xmlwordclass = etree.SubElement(xmlword, self.XML_WORDCLASS_TAG)
+
+        if word.get_wordclass() == WordClass.NOUN:
+            xmlwordclass.text = self.XML_WORDCLASS_NOUN_TEXT
+            xmlger = etree.SubElement(xmlword, self.XML_WORD_GER_TAG)
+
+            xmlarticle = etree.SubElement(xmlger, self.XML_NOUN_GER_ART_TAG)
+            
+            if word.gender is None:
+                xmlarticle.text = ''
+            else:
+                articleenum = Article.get_article(ArticleType.DEFINITE, word.gender, 
+                                                  GrammaticalCase.NOMINATIVE)
+                if articleenum == Article.DER:
+                    xmlarticle.text = self.XML_NOUN_GER_ART_DER_TEXT
+                elif articleenum == Article.DIE:
+                    xmlarticle.text = self.XML_NOUN_GER_ART_DIE_TEXT
+                elif articleenum == Article.DAS:
+                    xmlarticle.text = self.XML_NOUN_GER_ART_DAS_TEXT
                 else:
-                    xmlnounsn.text = self.XML_NONE_TEXT
+                    xmlarticle.text = ''
 
-                xmlnounpl = etree.SubElement(xmlger, self.XML_NOUN_GER_PL_TAG)
-                if word.plural_exist:
-                    xmlnounpl.text = '' if word.nounpl is None else word.nounpl
-                else:
-                    xmlnounpl.text = self.XML_NONE_TEXT
+            xmlnounsn = etree.SubElement(xmlger, self.XML_NOUN_GER_SN_TAG)
+            if word.singular_exist:
+                xmlnounsn.text = '' if word.nounsn is None else word.nounsn
+            else:
+                xmlnounsn.text = self.XML_NONE_TEXT
 
-            xmlhun = etree.SubElement(xmlword, self.XML_WORD_HUN_TAG)
-            if word.hun is None:
-                xmlhun.text = ''
+            xmlnounpl = etree.SubElement(xmlger, self.XML_NOUN_GER_PL_TAG)
+            if word.plural_exist:
+                xmlnounpl.text = '' if word.nounpl is None else word.nounpl
             else:
-                xmlhun.text = self.XML_WORD_HUN_TEXT_SEP.join(word.hun)
-        return xmldict
+                xmlnounpl.text = self.XML_NONE_TEXT
+
+        xmlhun = etree.SubElement(xmlword, self.XML_WORD_HUN_TAG)
+        xmlhun.text = self.XML_WORD_HUN_TEXT_SEP.join(word.hun_view)
+        return xmlword
         
 
+def _init_xml_chunk_worker() -> None:
+    # A failed chunk is loaded again in streaming mode, which logs the error itself.
+    logger.addFilter(lambda record: record.levelno < logging.ERROR)
+
+
+def _load_xml_chunk(path: str, start: int, end: int, wordoffset: int) -> list:
+    """Parses the <Word> elements of a WordCollection chunk in a worker process, returns None on failure."""
+    try:
+        with open(path, 'rb') as fd:
+            fd.seek(start)
+            chunk = fd.read(end - start)
+        dmp = XmlDictMdlPersistence(dictmdl = DictModel(event_en = False), path = path)
+        return dmp._load_dict_chunk(chunk, wordoffset)
+    except Exception:
+        return None
+
+
 # root = etree.Element('Dictionary')
 # etree.SubElement(root, 'WordCollection')
 # print(etree.tostring(root, pretty_print = True).decode('utf-8'))
\ No newline at end of file
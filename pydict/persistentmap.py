@@ -0,0 +1,147 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentMap(object):
+    """Immutable map from non-negative int keys (e.g. guids) to values other than None.
+
+    The map is a trie of WIDTH-tuples indexed by BITS bits of the key at every level, the leaves
+    hold the values. set and remove return a new map which copies only the nodes on the path of
+    the key (O(log n)) and shares every other node with the original map, so many versions of
+    a large map can be kept at the cost of their differences.
+    """
+
+    __slots__ = ('_root', '_shift', '_len')
+
+    BITS = 5
+    WIDTH = 1 << BITS
+    MASK = WIDTH - 1
+
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._root = None
+        # The number of the key bits below the root node.
+        self._shift = 0
+        self._len = 0
+
+
+    @classmethod
+    def _create(cls, root: tuple, shift: int, length: int) -> 'PersistentMap':
+        pmap = cls()
+        pmap._root = root
+        pmap._shift = shift
+        pmap._len = length
+        return pmap
+
+
+    @classmethod
+    def from_items(cls, items: object) -> 'PersistentMap':
+        """Builds a map of the (key, value) pairs level by level, without copying any path."""
+        nodes = {}
+        for key, value in items:
+            assert isinstance(key, int) and (key >= 0), 'The keys of {} shall be non-negative {}.'\
+                   .format(cls.__name__, int.__name__)
+            nodes.setdefault(key >> cls.BITS, [None] * cls.WIDTH)[key & cls.MASK] = value
+        length = sum(cls.WIDTH - node.count(None) for node in nodes.values())
+        if not nodes:
+            return cls()
+
+        shift = 0
+        while (len(nodes) > 1) or (0 not in nodes):
+            parents = {}
+            for idx, node in nodes.items():
+                parents.setdefault(idx >> cls.BITS, [None] * cls.WIDTH)[idx & cls.MASK] = tuple(node)
+            nodes = parents
+            shift += cls.BITS
+        return cls._create(tuple(nodes[0]), shift, length)
+
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None
+
+
+    def get(self, key: int, default: object = None) -> object:
+        if (self._root is None) or (key >> (self._shift + self.BITS)) or (key < 0):
+            return default
+        node = self._root
+        shift = self._shift
+        while shift:
+            node = node[(key >> shift) & self.MASK]
+            if node is None:
+                return default
+            shift -= self.BITS
+        value = node[key & self.MASK]
+        return default if value is None else value
+
+
+    def set(self, key: int, value: object) -> 'PersistentMap':
+        assert isinstance(key, int) and (key >= 0), 'The key parameter of {} method in {} class shall be a non-negative {}.'\
+               .format(self.set.__name__, self.__class__.__name__, int.__name__)
+        assert value is not None, 'The value parameter of {} method in {} class shall not be None.'\
+               .format(self.set.__name__, self.__class__.__name__)
+        root = self._root
+        shift = self._shift
+        # The trie grows at the root until the key fits.
+        while key >> (shift + self.BITS):
+            root = (root,) + (None,) * (self.WIDTH - 1) if root is not None else None
+            shift += self.BITS
+        root, added = self._set_node(root, shift, key, value)
+        return self._create(root, shift, self._len + added)
+
+
+    def _set_node(self, node: tuple, shift: int, key: int, value: object) -> tuple:
+        idx = (key >> shift) & self.MASK
+        if node is None:
+            node = (None,) * self.WIDTH
+        if shift:
+            child, added = self._set_node(node[idx], shift - self.BITS, key, value)
+        else:
+            child, added = value, node[idx] is None
+        return node[:idx] + (child,) + node[idx + 1:], added
+
+
+    def remove(self, key: int) -> 'PersistentMap':
+        if key not in self:
+            raise KeyError(key)
+        root = self._remove_node(self._root, self._shift, key)
+        if root is None:
+            return self.__class__()
+        return self._create(root, self._shift, self._len - 1)
+
+
+    def _remove_node(self, node: tuple, shift: int, key: int) -> tuple:
+        # Returns None instead of an empty node, so the removed branches are not kept.
+        idx = (key >> shift) & self.MASK
+        child = self._remove_node(node[idx], shift - self.BITS, key) if shift else None
+        if (child is None) and (node.count(None) == self.WIDTH - 1):
+            return None
+        return node[:idx] + (child,) + node[idx + 1:]
+
+
+    def items(self) -> object:
+        """Yields the (key, value) pairs in ascending key order."""
+        if self._root is not None:
+            yield from self._iter_node(self._root, self._shift, 0)
+
+    def _iter_node(self, node: tuple, shift: int, prefix: int) -> object:
+        for idx, child in enumerate(node):
+            if child is not None:
+                key = (prefix << self.BITS) | idx
+                if shift:
+                    yield from self._iter_node(child, shift - self.BITS, key)
+                else:
+                    yield key, child
+
+    def keys(self) -> object:
+        return (key for key, value in self.items())
+
+    def values(self) -> object:
+        return (value for key, value in self.items())
+
+    def __iter__(self) -> object:
+        return self.keys()
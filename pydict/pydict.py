@@ -5,10 +5,18 @@ import numbers
 import logging
 import logging.config
 from abc import ABC
-from persistence import XmlDictMdlPersistence
+from persistence import XmlDictMdlPersistence, XmlLoadMode, DictMdlLoadException
+from binpersistence import BinDictMdlPersistence
+from lazydictmdl import LazyDictModel
+from journal import DictMdlJournal
+from watcher import DictMdlWatcher
+from dictstats import DictMdlStatistics
+from undostack import DictMdlUndoStack
 from view import PyDictAppView
-from dictmdl import WordListModel
+from dictmdl import DictModel
+from qtdictmdl import WordListModel, DictMdlSignalRelay
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from event import EventId, Event, EventSaveAll
 
 
@@ -19,37 +27,108 @@ logger = logging.getLogger('pydict')
 
 
 class PyDictApp(object):
+    DICT_XML_PATH = 'dict.xml'
+    DICT_SNAPSHOT_PATH = 'dict.snapshot'
+    DICT_JOURNAL_PATH = 'dict.journal'
+    # The words of an up-to-date snapshot are built only when they are used.
+    DICT_LAZY_LOAD = True
+    # Poll period of the external changes of the dictionary file in ms.
+    DICT_WATCH_INTERVAL = 2000
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._qapp = None
         self._dictmdl = None
+        self._journal = None
+        self._watcher = None
+        self._watchtimer = None
+        self._saverelay = None
+        self._stats = None
+        self._undostack = None
         self._appview = None
         self._eventlogger = logging.getLogger('event')
         EventSaveAll.subscribe(self.handler_saveall)
 
     def main(self) -> None:
-        dmp = XmlDictMdlPersistence()
-        dmp.path = 'dict.xml'
-        dmp.load_dict()
-        print(dmp.to_string())
-
-        self._dictmdl = dmp.dictmdl
+        self._dictmdl = self.load_dictmdl()
+        # The changes saved since the last compaction are only in the journal.
+        self._journal = DictMdlJournal(dictmdl = self._dictmdl, path = self.DICT_JOURNAL_PATH,
+                                       basepath = self.DICT_XML_PATH)
+        self._journal.replay()
+        self._journal.attach()
+        self._stats = DictMdlStatistics(self._dictmdl)
+        self._stats.attach()
+        # The changes of the journal are not undoable, the stack starts from the replayed model.
+        self._undostack = DictMdlUndoStack(self._dictmdl)
+        self._undostack.attach()
         self._qapp = QApplication(sys.argv)
 
         self._appview = PyDictAppView(self._qapp)
         self._appview.setWindowTitle('PyDict')
-        self._appview.central_widget.tab_dictview.wordlsmdl = self._dictmdl.create_wordlistmodel()
+        self._appview.central_widget.tab_dictview.wordlsmdl = WordListModel(self._dictmdl)
+        # The saves run on worker threads, the relay delivers their signals in the GUI thread.
+        self._saverelay = DictMdlSignalRelay(self._dictmdl)
+        self._saverelay.save_finished.connect(self._appview.handle_save_finished)
+        self._saverelay.save_failed.connect(self._appview.handle_save_failed)
+        self._appview.statsview.stats = self._stats
+        self._appview.act_undo.triggered.connect(self._undostack.undo)
+        self._appview.act_redo.triggered.connect(self._undostack.redo)
+        self._undostack.changed.connect(self.handle_undostack_changed)
+        self._watcher = DictMdlWatcher(self._dictmdl, self.DICT_XML_PATH)
+        self._watcher.attach()
+        self._watchtimer = QTimer()
+        self._watchtimer.timeout.connect(self._watcher.poll)
+        self._watchtimer.start(self.DICT_WATCH_INTERVAL)
         self._appview.show()
 
-        sys.exit(self._qapp.exec_())
+        exitcode = self._qapp.exec_()
+        self._watchtimer.stop()
+        self._watcher.detach()
+        self._saverelay.close()
+        self._appview.statsview.stats = None
+        self._stats.detach()
+        self._undostack.detach()
+        self._journal.wait_compaction()
+        sys.exit(exitcode)
+
+
+    def load_dictmdl(self) -> DictModel:
+        # The binary snapshot is only a cache of the XML file, so it is used only if nobody
+        # has touched the XML since the snapshot was written.
+        snapshot = BinDictMdlPersistence(path = self.DICT_SNAPSHOT_PATH)
+        if snapshot.is_uptodate(self.DICT_XML_PATH):
+            try:
+                if self.DICT_LAZY_LOAD:
+                    return LazyDictModel(path = self.DICT_SNAPSHOT_PATH)
+                snapshot.load_dict()
+                return snapshot.dictmdl
+            except DictMdlLoadException:
+                logger.warning('The {} snapshot is invalid, {} is loaded instead.'
+                               .format(self.DICT_SNAPSHOT_PATH, self.DICT_XML_PATH))
+
+        dmp = XmlDictMdlPersistence(load_mode = XmlLoadMode.PARALLEL)
+        dmp.path = self.DICT_XML_PATH
+        dmp.load_dict()
+        self.save_snapshot(dmp.dictmdl)
+        return dmp.dictmdl
+
+
+    def save_snapshot(self, dictmdl: DictModel) -> None:
+        snapshot = BinDictMdlPersistence(dictmdl = dictmdl, path = self.DICT_SNAPSHOT_PATH)
+        try:
+            snapshot.save_dict()
+        except OSError as ex:
+            logger.warning('The {} snapshot cannot be written: {}'.format(self.DICT_SNAPSHOT_PATH, ex))
+
+
+    def handle_undostack_changed(self) -> None:
+        self._appview.act_undo.setEnabled(self._undostack.undo_count > 0)
+        self._appview.act_redo.setEnabled(self._undostack.redo_count > 0)
 
 
     def handler_saveall(self, event: EventSaveAll, *args, **kwargs) -> None:
-        dmp = XmlDictMdlPersistence()
-        dmp.dictmdl = self._dictmdl
-        dmp.path = 'dict.xml'
-        dmp.save_dict()
+        # Only the changes are written, the dictionary file is rewritten by the journal compaction.
+        self._journal.flush()
 
 
 if __name__ == '__main__':
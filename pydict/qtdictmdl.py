@@ -0,0 +1,141 @@
+from language.word import Word
+from PyQt5.QtCore import QObject, QAbstractListModel, QModelIndex
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.Qt import Qt, QPixmap, QIcon, QColor
+from dictmdl import DictModel
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+
+
+class DictMdlSignalRelay(QObject):
+    """Re-emits the save signals of a DictModel as Qt signals.
+
+    The savers emit the signals of the model on their worker threads. The Qt signals of the
+    relay are delivered to the slots by Qt, so a slot of a widget runs in the GUI thread.
+    """
+
+    save_finished = pyqtSignal(str)
+    save_failed = pyqtSignal(str, str)
+
+    def __init__(self, dictmdl: DictModel, parent: QObject = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._dictmdl = dictmdl
+        dictmdl.save_finished.connect(self.handle_save_finished)
+        dictmdl.save_failed.connect(self.handle_save_failed)
+
+    def close(self) -> None:
+        self._dictmdl.save_finished.disconnect(self.handle_save_finished)
+        self._dictmdl.save_failed.disconnect(self.handle_save_failed)
+
+    def handle_save_finished(self, path: str) -> None:
+        self.save_finished.emit(path)
+
+    def handle_save_failed(self, path: str, message: str) -> None:
+        self.save_failed.emit(path, message)
+
+
+
+class WordListModel(QAbstractListModel):
+    ICON_DEFAULT_SIZE = 16
+    ICON_DEFAULT_BRIGHTNESS = 0.8
+
+    def __init__(self, dictmdl: DictModel, parent: QObject = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.dictmdl = dictmdl
+        EventWordAdded.subscribe(self.handle_word_added)
+        EventWordRemoved.subscribe(self.handle_word_removed)
+        EventWordUpdated.subscribe(self.handle_word_updated)
+        EventWordBatch.subscribe(self.handle_word_batch)
+
+    def allocate_guid(self) -> int:
+        return self.dictmdl.allocate_guid()
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        
+        self._dictmdl = value
+        self._guidlist = self.dictmdl.get_wordguidlist()
+        
+
+    def rowCount(self, parent = QModelIndex()):
+        return len(self._guidlist)
+
+    def data(self, index: QModelIndex, role: int, parent: QModelIndex = QModelIndex()):
+        if role == Qt.DisplayRole:
+            return str(self.get_word(index))
+
+        if role == Qt.DecorationRole:
+            pixmap = QPixmap(self.ICON_DEFAULT_SIZE, self.ICON_DEFAULT_SIZE)
+            quality = self.get_word(index).get_quality()
+            green = max(min((quality * 255 * self.ICON_DEFAULT_BRIGHTNESS), 255), 0)
+            red =  max(min(((1.0 - quality) * 255 * self.ICON_DEFAULT_BRIGHTNESS), 255), 0)
+            color = QColor(red, green, 0)
+            pixmap.fill(color)
+            icon = QIcon(pixmap)
+            return icon
+            
+
+    def get_guid(self, index: QModelIndex) -> int:
+        return self._guidlist[index.row()]
+
+    def get_word(self, index: QModelIndex) -> Word:
+        guid = self.get_guid(index)
+        return self.dictmdl.get_word(guid)
+
+    def insertRows(self, row: int, count: int, parent: QModelIndex) -> None:
+        raise NotImplementedError('The insertRows is not implemented in WordListModel.')
+        
+    def removeRows(self, row: int, count: int, parent: QModelIndex) -> None:
+        guidrmls = self._guidlist[row : row + count]
+        for guid in guidrmls:
+            self.dictmdl.remove_word(guid)
+ 
+
+    def handle_word_added(self, event: EventWordAdded) -> None:
+        if event.dictmdl is not self.dictmdl:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._guidlist), len(self._guidlist))
+        self._guidlist.append(event.guid)
+        self.endInsertRows()
+
+
+    def handle_word_removed(self, event: EventWordRemoved) -> None:
+        if event.dictmdl is not self.dictmdl:
+            return
+        self.beginRemoveRows(QModelIndex(), self._guidlist.index(event.guid), self._guidlist.index(event.guid))
+        self._guidlist.remove(event.guid)
+        self.endRemoveRows()
+
+
+    def handle_word_updated(self, event: EventWordUpdated) -> None:
+        if event.dictmdl is not self.dictmdl:
+            return
+        row = self._guidlist.index(event.guid)
+        self.dataChanged.emit(self.index(row), self.index(row))
+
+
+    def handle_word_batch(self, event: EventWordBatch) -> None:
+        # A whole batch is one row operation: a reset if words are removed, otherwise one insertion
+        # of the added rows and one change notification of the span of the updated rows.
+        if event.dictmdl is not self.dictmdl:
+            return
+        if event.removed:
+            self.beginResetModel()
+            self._guidlist = self.dictmdl.get_wordguidlist()
+            self.endResetModel()
+            return
+
+        updated = set(EventWordBatch.iter_guids(event.updated))
+        if updated:
+            rows = [row for row, guid in enumerate(self._guidlist) if guid in updated]
+            self.dataChanged.emit(self.index(rows[0]), self.index(rows[-1]))
+        added = list(EventWordBatch.iter_guids(event.added))
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self._guidlist), len(self._guidlist) + len(added) - 1)
+            self._guidlist.extend(added)
+            self.endInsertRows()
@@ -0,0 +1,354 @@
+import os
+import json
+import math
+import array
+import base64
+import hashlib
+import logging
+import unicodedata
+from language.word import Word
+from dictmdl import DictModel
+from event import EventSaveAll
+from persistence import IDictMdlPersistence, XmlDictMdlPersistence, XmlLoadMode, XmlSaveMode, DictMdlLoadException, atomic_open
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter(object):
+    """Bloom filter of string keys with double hashing (two 64 bit halves of a BLAKE2b digest)."""
+
+    DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+
+    def __init__(self, bitcnt: int, hashcnt: int, bits: bytes = None, **kwargs):
+        super().__init__(**kwargs)
+        self._bitcnt = max(bitcnt, 8)
+        self._hashcnt = max(hashcnt, 1)
+        self._bits = bytearray((self._bitcnt + 7) // 8) if bits is None else bytearray(bits)
+
+
+    @classmethod
+    def create(cls, keycnt: int, fprate: float = None) -> 'BloomFilter':
+        """Creates a filter sized for keycnt keys at the given false positive rate."""
+        fprate = cls.DEFAULT_FALSE_POSITIVE_RATE if fprate is None else fprate
+        bitcnt = math.ceil(-max(keycnt, 1) * math.log(fprate) / (math.log(2) ** 2))
+        hashcnt = round(bitcnt / max(keycnt, 1) * math.log(2))
+        return cls(bitcnt, hashcnt)
+
+
+    @property
+    def bitcnt(self) -> int:
+        return self._bitcnt
+
+    @property
+    def hashcnt(self) -> int:
+        return self._hashcnt
+
+    @property
+    def bits(self) -> bytes:
+        return bytes(self._bits)
+
+
+    def _positions(self, key: str) -> object:
+        digest = hashlib.blake2b(key.encode('UTF-8'), digest_size = 16).digest()
+        hash1 = int.from_bytes(digest[:8], 'little')
+        hash2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((hash1 + idx * hash2) % self._bitcnt for idx in range(self._hashcnt))
+
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+
+def get_shard_key(word: Word) -> str:
+    """Returns the shard of a word: the unaccented initial of its German form, or '_'."""
+    text = (word.nounsn or word.nounpl or '').strip()
+    if text:
+        initial = unicodedata.normalize('NFKD', text[0].casefold())[0]
+        if 'a' <= initial <= 'z':
+            return initial
+    return '_'
+
+
+def get_lookup_key(text: str) -> str:
+    return text.strip().casefold()
+
+
+
+class ShardedDictModel(DictModel):
+    """Dictionary model whose words are loaded shard by shard on first access.
+
+    The guids of the shards which are not loaded yet come from the manifest, so __contains__,
+    __len__ and get_wordguidlist do not load anything. find_german skips the shards whose
+    Bloom filter does not contain the text. The shards changed since the last save are dirty.
+    """
+
+    def __init__(self, dmp: 'ShardedDictMdlPersistence' = None, **kwargs):
+        super().__init__(**kwargs)
+        self._dmp = dmp
+        self._unloaded = {}
+        self._unloaded_keys = set()
+        self._dirty = set()
+
+
+    @property
+    def loaded_keys(self) -> set:
+        return set(self._dmp.shard_keys) - self._unloaded_keys
+
+    @property
+    def dirty_keys(self) -> set:
+        return set(self._dirty)
+
+
+    def _init_shards(self, shardguids: dict) -> None:
+        for key, guids in shardguids.items():
+            for guid in guids:
+                if guid in self._unloaded:
+                    raise DictMdlLoadException(DictMdlLoadException.ID_GUID_NOT_UNIQUE,
+                            filepath = self._dmp.manifest_path, guid_value = guid)
+                self._unloaded[guid] = key
+                if guid > self._maxguid:
+                    self._maxguid = guid
+            self._unloaded_keys.add(key)
+
+
+    def load_shard(self, key: str) -> None:
+        if key not in self._unloaded_keys:
+            return
+        for word in self._dmp.load_shard(key):
+            # The words of the shard were already part of the model, no events are fired.
+            if self._unloaded.pop(word.guid, None) != key:
+                raise DictMdlLoadException(DictMdlLoadException.ID_SNAPSHOT_INVALID, filepath = self._dmp.manifest_path,
+                        reason = 'the guid {} of the {} shard is not in the manifest'.format(word.guid, key))
+            self._worddict[word.guid] = word
+        self._unloaded_keys.discard(key)
+
+    def load_all(self) -> None:
+        for key in list(self._unloaded_keys):
+            self.load_shard(key)
+
+
+    def add_word(self, word: Word) -> None:
+        key = get_shard_key(word)
+        # The shard is rewritten at the next save, so its other words are needed.
+        self.load_shard(key)
+        super().add_word(word)
+        self._dirty.add(key)
+
+    def remove_word(self, guid: int) -> Word:
+        word = self.get_word(guid)
+        if word is not None:
+            self._dirty.add(get_shard_key(word))
+        return super().remove_word(guid)
+
+    def update_word(self, word: Word) -> None:
+        oldword = self.get_word(word.guid)
+        if oldword is not None:
+            self._dirty.add(get_shard_key(oldword))
+        key = get_shard_key(word)
+        self.load_shard(key)
+        super().update_word(word)
+        self._dirty.add(key)
+
+
+    def get_word(self, guid: int) -> Word:
+        key = self._unloaded.get(guid)
+        if key is not None:
+            self.load_shard(key)
+        return super().get_word(guid)
+
+    def _get_words(self, guids: object) -> object:
+        return map(self.get_word, guids)
+
+    def find_german(self, text: str) -> list:
+        """Returns the words whose singular or plural is text (case insensitive)."""
+        lookupkey = get_lookup_key(text)
+        for key in list(self._unloaded_keys):
+            if self._dmp.may_contain(key, lookupkey):
+                self.load_shard(key)
+        return [word for word in self._worddict.values()
+                if lookupkey in (get_lookup_key(word.nounsn or ''), get_lookup_key(word.nounpl or ''))]
+
+
+    def __contains__(self, key: object) -> bool:
+        return (key in self._worddict) or (key in self._unloaded)
+
+    def get_wordlist(self, is_ordered: bool = False, guid_asc_ndesc: bool = True) -> list:
+        self.load_all()
+        return super().get_wordlist(is_ordered, guid_asc_ndesc)
+
+    def get_wordguidlist(self) -> list:
+        return list(self._worddict.keys()) + list(self._unloaded.keys())
+
+    def __len__(self) -> int:
+        return len(self._worddict) + len(self._unloaded)
+
+    def snapshot(self) -> DictModel:
+        self.load_all()
+        return super().snapshot()
+
+
+
+class ShardedDictMdlPersistence(IDictMdlPersistence):
+    """Dictionary stored as one XML file per shard in the path directory plus a JSON manifest.
+
+    The words are partitioned by get_shard_key. For every shard the manifest holds its file,
+    the guids of its words and a Bloom filter of their German forms. load_dict reads only the
+    manifest into a ShardedDictModel, and save_dict rewrites only the dirty shards of it (any
+    other model is written completely).
+    """
+
+    MANIFEST_FILE_NAME = 'manifest.json'
+    MANIFEST_VERSION = 1
+    SHARD_FILE_NAME = 'shard_{}.xml'
+    SHARD_GUID_TYPECODE = 'Q'
+
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._manifest = {}
+        self._tracking = False
+
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, self.MANIFEST_FILE_NAME)
+
+    @property
+    def shard_keys(self) -> list:
+        return list(self._manifest.keys())
+
+
+    def track_saveall(self, enable: bool) -> None:
+        if enable and not self._tracking:
+            EventSaveAll.subscribe(self.handler_saveall)
+        elif not enable and self._tracking:
+            EventSaveAll.unsubscribe(self.handler_saveall)
+        self._tracking = enable
+
+
+    def load_dict(self) -> DictModel:
+        self._read_manifest()
+        self.dictmdl = ShardedDictModel(dmp = self)
+        self.dictmdl._init_shards({key: self._decode_guids(shard['guids']) for key, shard in self._manifest.items()})
+        self.dictmdl.guid_alloc_en = True
+
+    def from_string(self, string: str) -> DictModel:
+        """Loads the XML form of to_string, save_dict writes the model into every shard."""
+        xmldmp = XmlDictMdlPersistence(dictmdl = self.dictmdl)
+        xmldmp.from_string(string)
+        self.dictmdl = xmldmp.dictmdl
+
+
+    def _read_manifest(self) -> None:
+        try:
+            with open(self.manifest_path, 'r', encoding = 'UTF-8') as fd:
+                manifest = json.load(fd)
+            if manifest['version'] != self.MANIFEST_VERSION:
+                raise ValueError('unsupported version {}'.format(manifest['version']))
+            self._manifest = manifest['shards']
+        except (ValueError, KeyError, TypeError) as ex:
+            raise DictMdlLoadException(DictMdlLoadException.ID_SNAPSHOT_INVALID,
+                    filepath = self.manifest_path, reason = str(ex))
+
+    def _write_manifest(self) -> None:
+        with atomic_open(self.manifest_path, 'w') as fd:
+            json.dump({'version': self.MANIFEST_VERSION, 'shards': self._manifest}, fd, indent = 1, sort_keys = True)
+
+
+    def load_shard(self, key: str) -> list:
+        shard = self._manifest.get(key)
+        if shard is None:
+            return []
+        shardpath = os.path.join(self.path, shard['file'])
+        xmldmp = XmlDictMdlPersistence(load_mode = XmlLoadMode.STREAMING, dictmdl = DictModel(event_en = False),
+                                       path = shardpath)
+        xmldmp.load_dict()
+        logger.info('The {} shard is loaded from {} ({} words).'.format(key, shardpath, len(xmldmp.dictmdl)))
+        return xmldmp.dictmdl.get_wordlist()
+
+
+    def may_contain(self, key: str, lookupkey: str) -> bool:
+        shard = self._manifest.get(key)
+        if shard is None:
+            return False
+        bloom = BloomFilter(shard['bloom_bitcnt'], shard['bloom_hashcnt'], base64.b64decode(shard['bloom']))
+        return lookupkey in bloom
+
+
+    def save_dict(self) -> None:
+        if self.dictmdl is None:
+            raise ValueError('The dictmdl shall not be None during save.')
+
+        os.makedirs(self.path, exist_ok = True)
+        if isinstance(self.dictmdl, ShardedDictModel) and (self.dictmdl._dmp is self):
+            keys = self.dictmdl.dirty_keys
+            # Only the loaded (i.e. dirty) shards are listed, the others are not touched.
+            shardwords = {key: [] for key in keys}
+            for word in self.dictmdl._worddict.values():
+                key = get_shard_key(word)
+                if key in shardwords:
+                    shardwords[key].append(word)
+        else:
+            shardwords = {key: [] for key in self._manifest}
+            for word in self.dictmdl.get_wordlist():
+                shardwords.setdefault(get_shard_key(word), []).append(word)
+
+        for key, words in shardwords.items():
+            self._save_shard(key, words)
+        self._write_manifest()
+        if isinstance(self.dictmdl, ShardedDictModel):
+            self.dictmdl._dirty.clear()
+        logger.info('{} shards are written to {}.'.format(len(shardwords), self.path))
+
+    def to_string(self) -> str:
+        """Returns the XML form of the whole dictionary (every shard of a ShardedDictModel is loaded)."""
+        if self.dictmdl is None:
+            raise ValueError('The dictmdl shall not be None during save.')
+        return XmlDictMdlPersistence(save_mode = XmlSaveMode.STREAMING, dictmdl = self.dictmdl).to_string()
+
+
+    def _save_shard(self, key: str, words: list) -> None:
+        filename = self.SHARD_FILE_NAME.format(key)
+        shardpath = os.path.join(self.path, filename)
+        if not words:
+            self._manifest.pop(key, None)
+            if os.path.exists(shardpath):
+                os.remove(shardpath)
+            return
+
+        sharddictmdl = DictModel(event_en = False)
+        bloom = BloomFilter.create(2 * len(words))
+        for word in words:
+            sharddictmdl.add_word(word)
+            for text in (word.nounsn, word.nounpl):
+                if text:
+                    bloom.add(get_lookup_key(text))
+        XmlDictMdlPersistence(save_mode = XmlSaveMode.STREAMING, dictmdl = sharddictmdl, path = shardpath).save_dict()
+
+        self._manifest[key] = {
+            'file'          : filename,
+            'count'         : len(words),
+            'guids'         : self._encode_guids(word.guid for word in words),
+            'bloom'         : base64.b64encode(bloom.bits).decode('ascii'),
+            'bloom_bitcnt'  : bloom.bitcnt,
+            'bloom_hashcnt' : bloom.hashcnt
+        }
+
+
+    def _encode_guids(self, guids: object) -> str:
+        return base64.b64encode(array.array(self.SHARD_GUID_TYPECODE, guids).tobytes()).decode('ascii')
+
+    def _decode_guids(self, text: str) -> array.array:
+        guids = array.array(self.SHARD_GUID_TYPECODE)
+        guids.frombytes(base64.b64decode(text))
+        return guids
+
+
+    def handler_saveall(self, event: EventSaveAll, *args, **kwargs) -> None:
+        self.save_dict()
@@ -0,0 +1,125 @@
+import bisect
+import itertools
+import unicodedata
+import logging
+from language.word import Word
+
+logger = logging.getLogger(__name__)
+
+
+def get_din5007_key(text: str) -> str:
+    """Returns the DIN 5007-1 (dictionary) collation key of a German text.
+
+    The case is ignored, ß is sorted as ss and the letters with umlaut or other diacritics
+    as their base letters (ä as a), so Mädchen is sorted between Macht and Made.
+    """
+    if text.isascii():
+        return text.lower()
+    # casefold maps ß to ss, the decomposition separates the diacritics from the base letters.
+    text = unicodedata.normalize('NFD', text.casefold())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def get_sort_text(word: Word) -> str:
+    """Returns the text a word is sorted by: its singular, or its plural if it has no singular."""
+    nounsn = getattr(word, 'nounsn', None)
+    if nounsn and word.singular_exist:
+        return nounsn
+    return getattr(word, 'nounpl', None) or nounsn or ''
+
+
+def get_alphabetical_key(word: Word) -> tuple:
+    # The words with the same collation key are ordered by their text (so Schon precedes schön)
+    # and by guid, so every word has a key of its own.
+    text = get_sort_text(word)
+    return (get_din5007_key(text), text, word.guid)
+
+
+class SortedIndex(object):
+    """Sorted collection of unique, comparable keys with O(log n) add and remove.
+
+    The keys are kept in sorted blocks of at most 2 * BLOCK_SIZE keys, with the greatest key
+    of every block in a separate list. A change bisects that list and then the block, so it
+    moves at most one block instead of the whole index, and the iteration and irange walk the
+    blocks in order without any sorting.
+    """
+
+    BLOCK_SIZE = 1000
+
+
+    def __init__(self, keys: object = (), **kwargs):
+        super().__init__(**kwargs)
+        keys = sorted(keys)
+        self._blocks = [keys[idx:idx + self.BLOCK_SIZE] for idx in range(0, len(keys), self.BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> object:
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __reversed__(self) -> object:
+        return itertools.chain.from_iterable(reversed(block) for block in reversed(self._blocks))
+
+    def __contains__(self, key: object) -> bool:
+        blockidx = bisect.bisect_left(self._maxes, key)
+        if blockidx == len(self._maxes):
+            return False
+        block = self._blocks[blockidx]
+        return block[bisect.bisect_left(block, key)] == key
+
+
+    def add(self, key: object) -> None:
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        blockidx = min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+        block = self._blocks[blockidx]
+        bisect.insort(block, key)
+        self._maxes[blockidx] = block[-1]
+        self._len += 1
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self._blocks[blockidx:blockidx + 1] = [block[:self.BLOCK_SIZE], block[self.BLOCK_SIZE:]]
+            self._maxes[blockidx:blockidx + 1] = [block[self.BLOCK_SIZE - 1], block[-1]]
+
+
+    def remove(self, key: object) -> None:
+        blockidx = bisect.bisect_left(self._maxes, key)
+        block = self._blocks[blockidx] if blockidx < len(self._blocks) else []
+        keyidx = bisect.bisect_left(block, key)
+        if (keyidx == len(block)) or (block[keyidx] != key):
+            raise KeyError(key)
+        del block[keyidx]
+        self._len -= 1
+        if block:
+            self._maxes[blockidx] = block[-1]
+        else:
+            del self._blocks[blockidx]
+            del self._maxes[blockidx]
+
+
+    def irange(self, low: object = None, high: object = None, reverse: bool = False) -> object:
+        """Yields the keys from low to high (both inclusive, None is unbounded) in order."""
+        startblock = 0 if low is None else bisect.bisect_left(self._maxes, low)
+        stopblock = len(self._blocks) if high is None else min(bisect.bisect_left(self._maxes, high) + 1,
+                                                               len(self._blocks))
+        blocks = []
+        for blockidx in range(startblock, stopblock):
+            block = self._blocks[blockidx]
+            start = 0 if (low is None) or (blockidx != startblock) else bisect.bisect_left(block, low)
+            stop = len(block) if (high is None) or (blockidx != stopblock - 1) else bisect.bisect_right(block, high)
+            blocks.append((block, start, stop))
+
+        if reverse:
+            for block, start, stop in reversed(blocks):
+                for keyidx in range(stop - 1, start - 1, -1):
+                    yield block[keyidx]
+        else:
+            for block, start, stop in blocks:
+                yield from itertools.islice(block, start, stop)
@@ -0,0 +1,262 @@
+import sys
+import logging
+import sqlite3
+from language.noun import Noun
+from language.word import Word, WordClass
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from persistence import IDictMdlPersistence, XmlDictMdlPersistence, XmlLoadMode, XmlSaveMode
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteDictMdlPersistence(IDictMdlPersistence):
+    """Dictionary model stored in an SQLite database.
+
+    After load_dict (or the first save_dict) the persistence follows the word events and
+    save_dict writes only the words changed since the last save: one upsert or delete per
+    word, in a single transaction.
+    """
+
+    SQL_SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS word (
+            guid           INTEGER PRIMARY KEY,
+            wordclass      INTEGER NOT NULL,
+            gender         INTEGER,
+            singular_exist INTEGER NOT NULL,
+            plural_exist   INTEGER NOT NULL,
+            nounsn         TEXT,
+            nounpl         TEXT
+        );
+        CREATE INDEX IF NOT EXISTS word_nounsn_idx ON word (nounsn);
+        CREATE INDEX IF NOT EXISTS word_nounpl_idx ON word (nounpl);
+        CREATE TABLE IF NOT EXISTS hun (
+            guid INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (guid, text)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS hun_text_idx ON hun (text);
+    '''
+    SQL_UPSERT_WORD = '''
+        INSERT INTO word (guid, wordclass, gender, singular_exist, plural_exist, nounsn, nounpl)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (guid) DO UPDATE SET
+            wordclass = excluded.wordclass, gender = excluded.gender,
+            singular_exist = excluded.singular_exist, plural_exist = excluded.plural_exist,
+            nounsn = excluded.nounsn, nounpl = excluded.nounpl
+    '''
+    SQL_DELETE_WORD = 'DELETE FROM word WHERE guid = ?'
+    SQL_DELETE_HUN = 'DELETE FROM hun WHERE guid = ?'
+    SQL_INSERT_HUN = 'INSERT INTO hun (guid, text) VALUES (?, ?)'
+    SQL_SELECT_WORDS = 'SELECT guid, wordclass, gender, singular_exist, plural_exist, nounsn, nounpl FROM word ORDER BY guid'
+    SQL_SELECT_HUNS = 'SELECT guid, text FROM hun'
+    SQL_MEMORY_PATH = ':memory:'
+
+    WORDCLASS_CODES = {
+        WordClass.NOUN : 0,
+        WordClass.VERB : 1
+    }
+
+    DEFAULT_BATCH_SIZE = 1000
+
+
+    def __init__(self, batch_size: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self._connection = None
+        self._pending = {}
+        self._tracking = False
+
+        if batch_size is None:
+            self.batch_size = self.DEFAULT_BATCH_SIZE
+        else:
+            self.batch_size = batch_size
+
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, value: int) -> None:
+        assert isinstance(value, int) and (value > 0), 'The batch_size property of {} class shall be a positive {}.'\
+               .format(self.__class__.__name__, int.__name__)
+        self._batch_size = value
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+
+    def connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path or self.SQL_MEMORY_PATH)
+            self._connection.executescript(self.SQL_SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self.flush()
+        self.track_events(False)
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+    def track_events(self, enable: bool) -> None:
+        if enable and not self._tracking:
+            EventWordAdded.subscribe(self.handler_word_added)
+            EventWordRemoved.subscribe(self.handler_word_removed)
+            EventWordUpdated.subscribe(self.handler_word_updated)
+            EventWordBatch.subscribe(self.handler_word_batch)
+        elif not enable and self._tracking:
+            EventWordAdded.unsubscribe(self.handler_word_added)
+            EventWordRemoved.unsubscribe(self.handler_word_removed)
+            EventWordUpdated.unsubscribe(self.handler_word_updated)
+            EventWordBatch.unsubscribe(self.handler_word_batch)
+        self._tracking = enable
+
+
+    def load_dict(self) -> DictModel:
+        self._load_dict_skeleton()
+        self.dictmdl.guid_alloc_en = True
+
+    def from_string(self, string: str) -> DictModel:
+        self.close()
+        self.path = self.SQL_MEMORY_PATH
+        self.connect().executescript(string)
+        self._load_dict_skeleton()
+
+
+    def _load_dict_skeleton(self) -> DictModel:
+        if self.dictmdl is None:
+            self.dictmdl = IDictMdlPersistence.DEFAULT_DICTMDL_CLASS()
+
+        connection = self.connect()
+        hundict = {}
+        for guid, text in connection.execute(self.SQL_SELECT_HUNS):
+            hundict.setdefault(guid, []).append(text)
+
+        for row in connection.execute(self.SQL_SELECT_WORDS):
+            word = self._load_word(row)
+            huns = hundict.get(word.guid)
+            if huns:
+                word.hun.update(map(sys.intern, huns))
+            self.dictmdl.add_word(word)
+
+        self._pending.clear()
+        self.track_events(True)
+
+
+    def _load_word(self, row: tuple) -> Word:
+        guid, wordclass, gender, singular_exist, plural_exist, nounsn, nounpl = row
+        if wordclass != self.WORDCLASS_CODES[WordClass.NOUN]:
+            raise ValueError('The {} word class code is not supported by {} (guid: {}).'
+                             .format(wordclass, self.__class__.__name__, guid))
+        noun = Noun()
+        noun.guid = guid
+        noun.gender = None if gender is None else GrammaticalGender(gender)
+        noun.singular_exist = bool(singular_exist)
+        noun.plural_exist = bool(plural_exist)
+        noun.nounsn = nounsn
+        noun.nounpl = nounpl
+        return noun
+
+
+    def save_dict(self) -> None:
+        if self.dictmdl is None:
+            raise ValueError('The dictmdl shall not be None during save.')
+
+        if self._tracking:
+            self.flush()
+        else:
+            self._save_dict_skeleton()
+            self.track_events(True)
+
+    def to_string(self) -> str:
+        self.save_dict()
+        return '\n'.join(self.connect().iterdump())
+
+
+    def _save_dict_skeleton(self) -> None:
+        connection = self.connect()
+        with connection:
+            connection.execute('DELETE FROM hun')
+            connection.execute('DELETE FROM word')
+            for word in self.dictmdl.get_wordlist():
+                self._save_word(connection, word)
+        self._pending.clear()
+
+
+    def _save_word(self, connection: sqlite3.Connection, word: Word) -> None:
+        if word.guid is None:
+            raise ValueError('The guid of Word object shall not be None.')
+        if word.get_wordclass() != WordClass.NOUN:
+            raise ValueError('The {} word class is not supported by {}.'
+                             .format(word.get_wordclass().name, self.__class__.__name__))
+
+        gender = None if word.gender is None else int(word.gender)
+        connection.execute(self.SQL_UPSERT_WORD, (word.guid, self.WORDCLASS_CODES[WordClass.NOUN], gender,
+                           int(word.singular_exist), int(word.plural_exist), word.nounsn, word.nounpl))
+        connection.execute(self.SQL_DELETE_HUN, (word.guid,))
+        connection.executemany(self.SQL_INSERT_HUN, [(word.guid, text) for text in word.hun_view])
+
+
+    def flush(self) -> None:
+        """Writes the words changed since the last flush in one transaction."""
+        if not self._pending:
+            return
+
+        connection = self.connect()
+        with connection:
+            for guid, exists in self._pending.items():
+                word = self.dictmdl.get_word(guid) if exists else None
+                if word is not None:
+                    self._save_word(connection, word)
+                else:
+                    connection.execute(self.SQL_DELETE_HUN, (guid,))
+                    connection.execute(self.SQL_DELETE_WORD, (guid,))
+        logger.info('{} word changes are written to {}.'.format(len(self._pending), self.path))
+        self._pending.clear()
+
+
+    def import_xml(self, xmlpath: str) -> DictModel:
+        """Replaces the content of the database with the dictionary of an XML file."""
+        xmldmp = XmlDictMdlPersistence(load_mode = XmlLoadMode.STREAMING, dictmdl = self.dictmdl, path = xmlpath)
+        xmldmp.load_dict()
+        self.dictmdl = xmldmp.dictmdl
+        self._save_dict_skeleton()
+        self.track_events(True)
+        return self.dictmdl
+
+    def export_xml(self, xmlpath: str) -> None:
+        if self.dictmdl is None:
+            self.load_dict()
+        self.flush()
+        xmldmp = XmlDictMdlPersistence(save_mode = XmlSaveMode.STREAMING, dictmdl = self.dictmdl, path = xmlpath)
+        xmldmp.save_dict()
+
+
+    def _mark_pending(self, guid: int, exists: bool) -> None:
+        self._pending[guid] = exists
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def handler_word_added(self, event: EventWordAdded, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._mark_pending(event.guid, True)
+
+    def handler_word_removed(self, event: EventWordRemoved, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._mark_pending(event.guid, False)
+
+    def handler_word_updated(self, event: EventWordUpdated, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._mark_pending(event.guid, True)
+
+    def handler_word_batch(self, event: EventWordBatch, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            for guid in EventWordBatch.iter_guids(event.removed):
+                self._mark_pending(guid, False)
+            for guid in EventWordBatch.iter_guids(event.added + event.updated):
+                self._mark_pending(guid, True)
@@ -0,0 +1,350 @@
+import json
+import struct
+import bisect
+import hashlib
+import logging
+from dictmdl import DictModel
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from persistence import XmlDictMdlPersistence
+from dictdiff import get_word_dict
+
+logger = logging.getLogger(__name__)
+
+
+class SocketSyncTransport(object):
+    """Length-prefixed JSON messages over a connected stream socket (e.g. of socket.socketpair)."""
+
+    MESSAGE_HEADER = struct.Struct('<I')
+
+
+    def __init__(self, sock: object, **kwargs):
+        super().__init__(**kwargs)
+        self._sock = sock
+
+
+    def send(self, message: dict) -> None:
+        payload = json.dumps(message, ensure_ascii = False).encode('UTF-8')
+        self._sock.sendall(self.MESSAGE_HEADER.pack(len(payload)) + payload)
+
+    def recv(self) -> dict:
+        size, = self.MESSAGE_HEADER.unpack(self._recv_exact(self.MESSAGE_HEADER.size))
+        return json.loads(self._recv_exact(size).decode('UTF-8'))
+
+    def _recv_exact(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('The sync connection is closed by the peer.')
+            data += chunk
+        return bytes(data)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+
+class DictMdlSyncPeer(object):
+    """Synchronises a dictionary model with a remote one by comparing Merkle trees over guid ranges.
+
+    The tree covers [0, span), where span is LEAF_WIDTH * FANOUT**n and larger than the greatest
+    guid of both sides. A node is split into FANOUT equal ranges down to LEAF_WIDTH guids. The hash
+    of a leaf is the hash of the digests of its words, the hash of an inner node is the hash of the
+    hashes of its children, and an empty range has EMPTY_HASH at any level.
+
+    pull() (or push()) asks the remote peer for the hashes of the differing nodes level by level,
+    starting at the root, then copies the words of the differing leaves from (or to) the remote
+    model, so the local (or the remote) model gets equal to the other. The words are transferred
+    as the XML of XmlDictMdlPersistence. serve() answers the requests of the remote peer until it
+    closes the connection.
+
+    The word digests, the sorted guids and the node hashes are cached. While the peer is attached
+    they are kept up to date by the word events of the model: a changed word drops only the
+    hashes of the nodes on its path, so the tree is kept between the syncs. A detached peer
+    rebuilds the tree for every sync.
+    """
+
+    FANOUT = 16
+    LEAF_WIDTH = 64
+    EMPTY_HASH = ''
+    HASH_DIGEST_SIZE = 16
+
+
+    def __init__(self, dictmdl: DictModel, **kwargs):
+        super().__init__(**kwargs)
+        self.dictmdl = dictmdl
+        self._attached = False
+        self._codec = XmlDictMdlPersistence()
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+        self._digests = {}
+        self._clear_tree()
+
+
+    def attach(self) -> None:
+        if not self._attached:
+            # The tree built while detached may be stale.
+            self._clear_tree()
+            EventWordAdded.subscribe(self.handler_word_added)
+            EventWordRemoved.subscribe(self.handler_word_removed)
+            EventWordUpdated.subscribe(self.handler_word_updated)
+            EventWordBatch.subscribe(self.handler_word_batch)
+            self._attached = True
+
+    def detach(self) -> None:
+        if self._attached:
+            EventWordAdded.unsubscribe(self.handler_word_added)
+            EventWordRemoved.unsubscribe(self.handler_word_removed)
+            EventWordUpdated.unsubscribe(self.handler_word_updated)
+            EventWordBatch.unsubscribe(self.handler_word_batch)
+            self._attached = False
+
+
+    def _clear_tree(self) -> None:
+        self._guids = None
+        self._nodehashes = {}
+        # The width of the widest cached node, the bound of the path of a changed guid.
+        self._maxwidth = 0
+
+    def _reset_tree(self) -> None:
+        # Without the word events the cached tree is not trusted by a new sync.
+        if not self._attached:
+            self._clear_tree()
+
+
+    def _invalidate(self, guid: int) -> None:
+        """Drops the digest of the word and the hashes of the nodes on its path, one per level."""
+        self._digests.pop(guid, None)
+        width = self.LEAF_WIDTH
+        while width <= self._maxwidth:
+            low = guid - guid % width
+            self._nodehashes.pop((low, low + width), None)
+            width *= self.FANOUT
+
+
+    def _is_tree_range(self, low: int, high: int) -> bool:
+        # Only the nodes of the tree are cached (not any range asked by a peer), so the path of
+        # a guid covers every cached node which contains it.
+        width = self.LEAF_WIDTH
+        while width < high - low:
+            width *= self.FANOUT
+        return (width == high - low) and (low % width == 0)
+
+
+    def _get_guids(self) -> list:
+        if self._guids is None:
+            self._guids = sorted(self.dictmdl.get_wordguidlist())
+        return self._guids
+
+
+    def _get_digest(self, guid: int) -> bytes:
+        digest = self._digests.get(guid) if self._attached else None
+        if digest is None:
+            # The hun set is sorted by get_word_dict, so the digest does not depend on the set order.
+            wordtext = json.dumps(get_word_dict(self.dictmdl.get_word(guid)), ensure_ascii = False, sort_keys = True)
+            digest = hashlib.blake2b(wordtext.encode('UTF-8'), digest_size = self.HASH_DIGEST_SIZE).digest()
+            if self._attached:
+                self._digests[guid] = digest
+        return digest
+
+
+    def _get_range_guids(self, low: int, high: int) -> list:
+        guids = self._get_guids()
+        return guids[bisect.bisect_left(guids, low):bisect.bisect_left(guids, high)]
+
+
+    def get_node_hash(self, low: int, high: int) -> str:
+        nodehash = self._nodehashes.get((low, high))
+        if nodehash is not None:
+            return nodehash
+
+        guids = self._get_range_guids(low, high)
+        if not guids:
+            nodehash = self.EMPTY_HASH
+        else:
+            hasher = hashlib.blake2b(digest_size = self.HASH_DIGEST_SIZE)
+            if high - low <= self.LEAF_WIDTH:
+                for guid in guids:
+                    hasher.update(guid.to_bytes(8, 'little'))
+                    hasher.update(self._get_digest(guid))
+            else:
+                for childlow, childhigh in self.split_range(low, high):
+                    hasher.update(self.get_node_hash(childlow, childhigh).encode('ascii'))
+            nodehash = hasher.hexdigest()
+        if self._is_tree_range(low, high):
+            self._nodehashes[(low, high)] = nodehash
+            self._maxwidth = max(self._maxwidth, high - low)
+        return nodehash
+
+
+    def split_range(self, low: int, high: int) -> list:
+        width = (high - low) // self.FANOUT
+        return [(low + idx * width, low + (idx + 1) * width) for idx in range(self.FANOUT)]
+
+
+    def get_span(self, maxguid: int) -> int:
+        span = self.LEAF_WIDTH
+        while span <= maxguid:
+            span *= self.FANOUT
+        return span
+
+
+    def get_maxguid(self) -> int:
+        guids = self._get_guids()
+        return guids[-1] if guids else -1
+
+
+    def to_xml(self, guids: list) -> str:
+        dictmdl = DictModel(event_en = False)
+        for guid in guids:
+            dictmdl.add_word(self.dictmdl.get_word(guid))
+        self._codec.dictmdl = dictmdl
+        return self._codec.to_string()
+
+
+    def from_xml(self, text: str) -> list:
+        self._codec.dictmdl = DictModel(event_en = False)
+        self._codec.from_string(text)
+        return self._codec.dictmdl.get_wordlist()
+
+
+    def apply_words(self, ranges: list, words: list) -> int:
+        """Makes the given ranges of the model hold exactly words, returns the number of changed words."""
+        oldguids = set()
+        for low, high in ranges:
+            oldguids.update(self._get_range_guids(low, high))
+        changecnt = 0
+        with self.dictmdl.batch():
+            for word in words:
+                if word.guid in oldguids:
+                    oldguids.discard(word.guid)
+                    if get_word_dict(word) == get_word_dict(self.dictmdl.get_word(word.guid)):
+                        continue
+                    self.dictmdl.update_word(word)
+                else:
+                    self.dictmdl.add_word(word)
+                changecnt += 1
+            self.dictmdl.remove_words(sorted(oldguids))
+        changecnt += len(oldguids)
+        self._reset_tree()
+        return changecnt
+
+
+    def _find_diff_ranges(self, transport: SocketSyncTransport) -> list:
+        transport.send({'op': 'info'})
+        span = self.get_span(max(self.get_maxguid(), transport.recv()['maxguid']))
+
+        leaves = []
+        ranges = [(0, span)]
+        while ranges:
+            transport.send({'op': 'hashes', 'ranges': ranges})
+            remotehashes = transport.recv()['hashes']
+            childranges = []
+            for (low, high), remotehash in zip(ranges, remotehashes):
+                if self.get_node_hash(low, high) == remotehash:
+                    continue
+                if high - low <= self.LEAF_WIDTH:
+                    leaves.append((low, high))
+                else:
+                    childranges.extend(self.split_range(low, high))
+            ranges = childranges
+        return leaves
+
+
+    def pull(self, transport: SocketSyncTransport) -> int:
+        """Copies the differing words of the remote model, returns the number of changed local words."""
+        self._reset_tree()
+        leaves = self._find_diff_ranges(transport)
+        changecnt = 0
+        if leaves:
+            transport.send({'op': 'words', 'ranges': leaves})
+            changecnt = self.apply_words(leaves, self.from_xml(transport.recv()['words']))
+        transport.send({'op': 'close'})
+        logger.info('{} differing guid ranges are pulled, {} words are changed.'.format(len(leaves), changecnt))
+        return changecnt
+
+
+    def push(self, transport: SocketSyncTransport) -> int:
+        """Copies the differing words to the remote model, returns the number of changed remote words."""
+        self._reset_tree()
+        leaves = self._find_diff_ranges(transport)
+        changecnt = 0
+        if leaves:
+            guids = [guid for low, high in leaves for guid in self._get_range_guids(low, high)]
+            transport.send({'op': 'put', 'ranges': leaves, 'words': self.to_xml(guids)})
+            changecnt = transport.recv()['changecnt']
+        transport.send({'op': 'close'})
+        logger.info('{} differing guid ranges are pushed, {} words are changed.'.format(len(leaves), changecnt))
+        return changecnt
+
+
+    def serve(self, transport: SocketSyncTransport) -> None:
+        """Answers the requests of a pulling or pushing remote peer until it closes the sync."""
+        self._reset_tree()
+        while True:
+            request = transport.recv()
+            op = request['op']
+            if op == 'info':
+                transport.send({'maxguid': self.get_maxguid()})
+            elif op == 'hashes':
+                transport.send({'hashes': [self.get_node_hash(low, high) for low, high in request['ranges']]})
+            elif op == 'words':
+                guids = [guid for low, high in request['ranges'] for guid in self._get_range_guids(low, high)]
+                transport.send({'words': self.to_xml(guids)})
+            elif op == 'put':
+                changecnt = self.apply_words(request['ranges'], self.from_xml(request['words']))
+                transport.send({'changecnt': changecnt})
+            elif op == 'close':
+                return
+            else:
+                raise ValueError('Unknown sync request: {}'.format(op))
+
+
+    def _insert_guid(self, guid: int) -> None:
+        if self._guids is not None:
+            idx = bisect.bisect_left(self._guids, guid)
+            if (idx == len(self._guids)) or (self._guids[idx] != guid):
+                self._guids.insert(idx, guid)
+
+    def _remove_guid(self, guid: int) -> None:
+        if self._guids is not None:
+            idx = bisect.bisect_left(self._guids, guid)
+            if (idx < len(self._guids)) and (self._guids[idx] == guid):
+                del self._guids[idx]
+
+
+    def handler_word_added(self, event: EventWordAdded, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._invalidate(event.guid)
+            self._insert_guid(event.guid)
+
+    def handler_word_removed(self, event: EventWordRemoved, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._invalidate(event.guid)
+            self._remove_guid(event.guid)
+
+    def handler_word_updated(self, event: EventWordUpdated, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._invalidate(event.guid)
+
+    def handler_word_batch(self, event: EventWordBatch, *args, **kwargs) -> None:
+        # The guids are checked before they are inserted or removed, since the sorted guids may
+        # have been built during the batch.
+        if event.dictmdl is self.dictmdl:
+            for guid in EventWordBatch.iter_guids(event.removed):
+                self._invalidate(guid)
+                self._remove_guid(guid)
+            for guid in EventWordBatch.iter_guids(event.added):
+                self._invalidate(guid)
+                self._insert_guid(guid)
+            for guid in EventWordBatch.iter_guids(event.updated):
+                self._invalidate(guid)
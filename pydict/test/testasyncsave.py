@@ -0,0 +1,113 @@
+import os
+import copy
+import tempfile
+import threading
+import unittest
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence
+from asyncsave import AsyncDictMdlSaver
+
+class GatedDictMdlSaver(AsyncDictMdlSaver):
+    """Saver whose writes wait for the gate, so the requests can be made during a save."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.savecnt = 0
+
+    def _save_snapshot(self, snapshot: DictModel) -> None:
+        self.entered.set()
+        self.gate.wait()
+        self.savecnt += 1
+        super()._save_snapshot(snapshot)
+
+
+class Test_AsyncDictMdlSaver(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmpdir.name, 'dict.xml')
+        self.xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        self.xmldmp.load_dict()
+        self.dictmdl = self.xmldmp.dictmdl
+        self.words = self.get_words(self.dictmdl)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def load_words(self) -> dict:
+        xmldmp = XmlDictMdlPersistence(path = self.xml_path)
+        xmldmp.load_dict()
+        return self.get_words(xmldmp.dictmdl)
+
+    def get_words(self, dictmdl: DictModel) -> dict:
+        # The order of the Hungarian translations is not stable, so the words are compared by value.
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def edit_word(self, guid: int) -> None:
+        word = copy.copy(self.dictmdl.get_word(guid))
+        word.hun.add('szerkesztett')
+        self.dictmdl.update_word(word)
+
+    def test_snapshot_isolation(self):
+        snapshot = self.dictmdl.snapshot()
+        self.edit_word(1)
+        self.dictmdl.remove_word(2)
+        self.assertFalse(snapshot.event_en)
+        self.assertEqual(self.get_words(snapshot), self.words)
+        # The unchanged words are shared, not copied.
+        self.assertIs(snapshot.get_word(3), self.dictmdl.get_word(3))
+
+    def test_save_coalescing(self):
+        results = []
+        self.dictmdl.save_finished.connect(results.append)
+        saver = GatedDictMdlSaver(self.dictmdl, self.xml_path)
+        # A failed assertion shall not leave the worker blocked.
+        self.addCleanup(saver.gate.set)
+
+        self.assertTrue(saver.save())
+        self.assertTrue(saver.entered.wait(10.0))
+        self.edit_word(1)
+        # The first save is blocked, the next two requests are coalesced into one save.
+        self.assertTrue(saver.save())
+        self.edit_word(3)
+        self.assertFalse(saver.save())
+        expected_words = self.get_words(self.dictmdl)
+
+        saver.gate.set()
+        self.assertTrue(saver.wait(10.0))
+        self.assertFalse(saver.saving)
+        self.assertEqual(saver.savecnt, 2)
+        self.assertEqual(results, [self.xml_path, self.xml_path])
+        self.assertEqual(self.load_words(), expected_words)
+
+    def test_save_failure(self):
+        failures = []
+        self.dictmdl.save_failed.connect(lambda path, message: failures.append(path))
+        saver = AsyncDictMdlSaver(self.dictmdl, os.path.join(self.tmpdir.name, 'missing', 'dict.xml'))
+        # The error may be logged by the worker before save() returns.
+        with self.assertLogs('asyncsave', 'ERROR'):
+            saver.save()
+            self.assertTrue(saver.wait(10.0))
+        self.assertEqual(failures, [saver.path])
+
+    def test_on_finished_failure(self):
+        results = []
+        self.dictmdl.save_finished.connect(results.append)
+        self.dictmdl.save_failed.connect(lambda path, message: results.append(message))
+        def on_finished(path: str) -> None:
+            raise OSError('on_finished')
+        saver = AsyncDictMdlSaver(self.dictmdl, self.xml_path, on_finished = on_finished)
+        with self.assertLogs('asyncsave', 'ERROR'):
+            saver.save()
+            self.assertTrue(saver.wait(10.0))
+        self.assertEqual(results, [self.xml_path])
+        self.assertEqual(self.load_words(), self.words)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from persistence import XmlDictMdlPersistence, DictMdlLoadException
+from binpersistence import BinDictMdlPersistence
+from lazydictmdl import LazyDictModel
+from event import Event, EventId
+
+class Test_BinDictMdlPersistence(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.xmldmp = XmlDictMdlPersistence()
+        self.xmldmp.path = r'dict.xml'
+        self.xmldmp.load_dict()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmpdir.name, 'dict.snapshot')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def test_snapshot_roundtrip(self):
+        snapshot = BinDictMdlPersistence(dictmdl = self.xmldmp.dictmdl, path = self.snapshot_path)
+        snapshot.save_dict()
+
+        loaded = BinDictMdlPersistence(path = self.snapshot_path)
+        loaded.load_dict()
+        self.assertEqual(len(loaded.dictmdl), len(self.xmldmp.dictmdl))
+        self.assertTrue(loaded.dictmdl.guid_alloc_en)
+        self.assertEqual(XmlDictMdlPersistence(dictmdl = loaded.dictmdl).to_string(), self.xmldmp.to_string())
+
+    def test_snapshot_string(self):
+        snapshot = BinDictMdlPersistence(dictmdl = self.xmldmp.dictmdl)
+        loaded = BinDictMdlPersistence()
+        loaded.from_string(snapshot.to_string())
+        self.assertEqual(XmlDictMdlPersistence(dictmdl = loaded.dictmdl).to_string(), self.xmldmp.to_string())
+
+    def test_snapshot_invalid(self):
+        data = BinDictMdlPersistence(dictmdl = self.xmldmp.dictmdl).to_bytes()
+        # The gender byte of the first record is out of range, the last heap byte is not UTF-8.
+        gender_offset = BinDictMdlPersistence.BIN_HEADER.size + 9
+        bad_gender = data[:gender_offset] + b'\x07' + data[gender_offset + 1:]
+        bad_text = data[:-1] + b'\xff'
+        for invalid_data in (data[:-1], b'XXXX' + data[4:], b'', bad_gender, bad_text):
+            with open(self.snapshot_path, 'wb') as fd:
+                fd.write(invalid_data)
+            with self.assertRaises(DictMdlLoadException) as context:
+                BinDictMdlPersistence(path = self.snapshot_path).load_dict()
+            self.assertTrue(context.exception.xtext.startswith(DictMdlLoadException.ID_SNAPSHOT_INVALID))
+
+    def test_snapshot_invalid_unsubscribed(self):
+        # The model of a failed load does not serve the word requests along with the loaded one.
+        data = BinDictMdlPersistence(dictmdl = self.xmldmp.dictmdl).to_bytes()
+        with open(self.snapshot_path, 'wb') as fd:
+            fd.write(data[:-1])
+        handlercnt = len(Event.handlers.get(EventId.EVENT_WORD_REMOVE_REQ, []))
+        dmp = BinDictMdlPersistence(path = self.snapshot_path)
+        with self.assertRaises(DictMdlLoadException):
+            dmp.load_dict()
+        self.assertIsNone(dmp.dictmdl)
+        with self.assertRaises(DictMdlLoadException):
+            LazyDictModel(path = self.snapshot_path)
+        self.assertEqual(len(Event.handlers.get(EventId.EVENT_WORD_REMOVE_REQ, [])), handlercnt)
+
+    def test_snapshot_uptodate(self):
+        xml_path = os.path.join(self.tmpdir.name, 'dict.xml')
+        snapshot = BinDictMdlPersistence(dictmdl = self.xmldmp.dictmdl, path = self.snapshot_path)
+        self.xmldmp.path = xml_path
+        self.xmldmp.save_dict()
+        self.assertFalse(snapshot.is_uptodate(xml_path))
+        snapshot.save_dict()
+        self.assertTrue(snapshot.is_uptodate(xml_path))
+        xml_mtime_ns = os.stat(self.snapshot_path).st_mtime_ns + 1000000000
+        os.utime(xml_path, ns = (xml_mtime_ns, xml_mtime_ns))
+        self.assertFalse(snapshot.is_uptodate(xml_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import copy
+import unittest
+from language.word import WordClass
+from language.noun import Noun
+from language.article import GrammaticalGender
+from persistence import XmlDictMdlPersistence
+from columnardictmdl import ColumnarDictModel
+
+class Test_ColumnarDictModel(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        self.xmldmp.load_dict()
+        self.colmdl = ColumnarDictModel(event_en = False)
+        for word in self.xmldmp.dictmdl.get_wordlist():
+            self.colmdl.add_word(word)
+
+    def get_words(self, dictmdl: object) -> dict:
+        # The order of the Hungarian translations is not stable, so the words are compared by value.
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def test_rows(self):
+        dictmdl = self.xmldmp.dictmdl
+        self.assertEqual(len(self.colmdl), len(dictmdl))
+        self.assertEqual(self.get_words(self.colmdl), self.get_words(dictmdl))
+        for guid in dictmdl.get_wordguidlist():
+            self.assertEqual(str(self.colmdl.get_word(guid)), str(dictmdl.get_word(guid)))
+        self.assertIsNone(self.colmdl.get_word(max(dictmdl.get_wordguidlist()) + 1))
+
+        # A view is read-only, its copy is an editable noun.
+        view = self.colmdl.get_word(1)
+        with self.assertRaises(AttributeError):
+            view.nounsn = 'Gast'
+        noun = copy.copy(view)
+        noun.hun.add('új')
+        self.colmdl.update_word(noun)
+        self.assertIn('új', view.hun_view)
+        dictmdl.get_word(1).hun.add('új')
+
+        removed = self.colmdl.remove_word(2)
+        dictmdl.remove_word(2)
+        self.assertEqual(removed.guid, 2)
+        self.assertNotIn(2, self.colmdl)
+        self.colmdl.compact()
+        self.assertEqual(self.get_words(self.colmdl), self.get_words(dictmdl))
+
+    def test_find(self):
+        noun = Noun()
+        noun.guid = max(self.colmdl.get_wordguidlist()) + 1
+        noun.gender = GrammaticalGender.FEMININE
+        noun.singular_exist = True
+        noun.nounsn = 'Milch'
+        self.colmdl.add_word(noun)
+        self.xmldmp.dictmdl.add_word(noun)
+        words = self.xmldmp.dictmdl.get_wordlist()
+        expected = [word.guid for word in words
+                    if (word.gender == GrammaticalGender.FEMININE) and not word.plural_exist]
+        guids = self.colmdl.find_guids(wordclass = WordClass.NOUN, genders = {GrammaticalGender.FEMININE},
+                                       plural_exist = False)
+        self.assertEqual(sorted(guids), sorted(expected))
+        self.assertIn(noun.guid, guids)
+        self.assertEqual(self.colmdl.count_words(genders = {None, GrammaticalGender.MASCULINE}, singular_exist = True),
+                         len([word for word in words if (word.gender in (None, GrammaticalGender.MASCULINE))
+                              and word.singular_exist]))
+        self.assertEqual(self.colmdl.count_words(), len(words))
+
+    def test_snapshot(self):
+        snapshot = self.colmdl.snapshot()
+        expected = self.get_words(self.colmdl)
+        self.colmdl.remove_word(0)
+        noun = copy.copy(self.colmdl.get_word(1))
+        noun.nounsn = 'Geist'
+        self.colmdl.update_word(noun)
+        self.assertEqual(self.get_words(snapshot), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
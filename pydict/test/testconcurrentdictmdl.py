@@ -0,0 +1,103 @@
+import random
+import threading
+import unittest
+from language.noun import Noun
+from event import EventWordBatch
+from concurrentdictmdl import ConcurrentDictModel
+
+class Test_ConcurrentDictModel(unittest.TestCase):
+
+    WORD_COUNT = 100
+    BATCH_COUNT = 200
+    READER_COUNT = 4
+
+    def setUp(self):
+        super().setUp()
+        self.dictmdl = ConcurrentDictModel()
+        self.dictmdl.guid_alloc_en = True
+        self.dictmdl.add_words(self.create_noun(self.dictmdl.allocate_guid(), 0) for _ in range(self.WORD_COUNT))
+        self.errors = []
+
+    def create_noun(self, guid: int, generation: int) -> Noun:
+        noun = Noun()
+        noun.guid = guid
+        noun.singular_exist = True
+        noun.nounsn = 'Wort{}'.format(guid)
+        noun.nounpl = 'G{}'.format(generation)
+        return noun
+
+    def run_threads(self, targets: list) -> None:
+        threads = [threading.Thread(target = self.catch_errors, args = (target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.errors, [])
+
+    def catch_errors(self, target: object) -> None:
+        try:
+            target()
+        except BaseException as ex:
+            self.errors.append(ex)
+
+    def test_batch_consistency(self):
+        done = threading.Event()
+        versions = []
+
+        def write() -> None:
+            rnd = random.Random(25)
+            try:
+                for generation in range(1, self.BATCH_COUNT + 1):
+                    # Every batch replaces a word and moves every word to the next generation.
+                    with self.dictmdl.batch():
+                        self.dictmdl.remove_word(rnd.choice(self.dictmdl.get_wordguidlist()))
+                        self.dictmdl.add_word(self.create_noun(self.dictmdl.allocate_guid(), generation - 1))
+                        self.dictmdl.update_words(self.create_noun(guid, generation)
+                                                  for guid in self.dictmdl.get_wordguidlist())
+            finally:
+                done.set()
+
+        def read() -> None:
+            numbers = []
+            while not done.is_set():
+                version = self.dictmdl.get_version()
+                words = version.get_wordlist(is_ordered = True)
+                # A half-applied batch would show two generations or a different word count.
+                self.assertEqual(len(words), self.WORD_COUNT)
+                self.assertEqual(len({word.nounpl for word in words}), 1)
+                numbers.append(version.number)
+                # The state of the model is read as well, it shall not fail during the writes.
+                self.dictmdl.get_wordlist()
+            self.assertEqual(numbers, sorted(numbers))
+            versions.extend(numbers)
+
+        self.run_threads([write] + [read] * self.READER_COUNT)
+        self.assertEqual(self.dictmdl.get_version().get_word(self.dictmdl.get_wordguidlist()[0]).nounpl,
+                         'G{}'.format(self.BATCH_COUNT))
+        self.assertGreater(len(versions), 0)
+
+    def test_concurrent_writers(self):
+        def write() -> None:
+            for _ in range(300):
+                self.dictmdl.add_word(self.create_noun(self.dictmdl.allocate_guid(), 0))
+
+        self.run_threads([write] * 4)
+        self.assertEqual(len(self.dictmdl), self.WORD_COUNT + 1200)
+        self.assertEqual(self.dictmdl.get_version().get_wordguidlist(), list(range(self.WORD_COUNT + 1200)))
+
+    def test_version_isolation(self):
+        version = self.dictmdl.get_version()
+        word = self.create_noun(5, 1)
+        self.dictmdl.update_word(word)
+        self.dictmdl.remove_word(6)
+        # The model keeps a copy, the word of the caller is not shared with the versions.
+        word.nounpl = 'G2'
+        self.assertEqual(version.get_word(5).nounpl, 'G0')
+        self.assertIn(6, version)
+        self.assertEqual(self.dictmdl.get_version().get_word(5).nounpl, 'G1')
+        self.assertNotIn(6, self.dictmdl.get_version())
+        self.assertEqual(self.dictmdl.get_version().number, version.number + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import copy
+import tempfile
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from persistence import XmlDictMdlPersistence
+from dictdiff import ChangeType, diff_words, merge_words, create_dictmdl, load_words, main
+
+class Test_DictDiff(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.base = load_words(r'dict.xml')
+
+    def edit(self, words: list, guid: int, hun: str) -> list:
+        words = [copy.copy(word) for word in words]
+        for word in words:
+            if word.guid == guid:
+                word.hun.add(hun)
+        return words
+
+    def remove(self, words: list, guid: int) -> list:
+        return [word for word in words if word.guid != guid]
+
+    def add(self, words: list, guid: int, nounsn: str) -> list:
+        noun = Noun()
+        noun.guid = guid
+        noun.gender = GrammaticalGender.NEUTRAL
+        noun.singular_exist = True
+        noun.nounsn = nounsn
+        return words + [noun]
+
+    def test_diff(self):
+        newguid = self.base[-1].guid + 1
+        new = self.add(self.remove(self.edit(self.base, 1, 'új'), 2), newguid, 'Haus')
+        changes = list(diff_words(self.base, new))
+        self.assertEqual([(change.guid, change.changetype) for change in changes],
+                         [(1, ChangeType.UPDATED), (2, ChangeType.REMOVED), (newguid, ChangeType.ADDED)])
+        self.assertEqual(list(diff_words(self.base, self.base)), [])
+        with self.assertRaises(ValueError):
+            list(diff_words(self.base, list(reversed(self.base))))
+
+    def test_merge(self):
+        newguid = self.base[-1].guid + 1
+        ours = self.add(self.edit(self.base, 1, 'mienk'), newguid, 'Haus')
+        theirs = self.remove(self.edit(self.base, 2, 'övék'), 3)
+        conflicts = []
+        merged = list(merge_words(self.base, ours, theirs, conflicts))
+        self.assertEqual(conflicts, [])
+        expected = self.add(self.remove(self.edit(self.edit(self.base, 1, 'mienk'), 2, 'övék'), 3), newguid, 'Haus')
+        self.assertEqual(list(diff_words(expected, merged)), [])
+
+        # The same word changed differently on both sides is a conflict, our version is kept.
+        theirs = self.edit(self.base, 1, 'övék')
+        merged = create_dictmdl(merge_words(self.base, ours, theirs, conflicts))
+        self.assertEqual([conflict.guid for conflict in conflicts], [1])
+        self.assertIn('mienk', merged.get_word(1).hun_view)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            merged_path = os.path.join(tmpdir, 'merged.xml')
+            self.assertEqual(main([r'dict.xml', r'dict.xml', '--base', r'dict.xml', '--merge', merged_path]), 0)
+            self.assertEqual(list(diff_words(self.base, load_words(merged_path))), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
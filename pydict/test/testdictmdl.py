@@ -0,0 +1,58 @@
+import unittest
+from language.noun import Noun
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from dictmdl import DictModel
+
+class Test_DictModelBatch(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dictmdl = DictModel()
+        self.dictmdl.guid_alloc_en = True
+        self.dictmdl.add_words(self.create_noun(guid) for guid in range(10))
+        self.events = []
+        for eventclass in (EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch):
+            eventclass.subscribe(self.handler_event)
+            self.addCleanup(eventclass.unsubscribe, self.handler_event)
+
+    def create_noun(self, guid: int) -> Noun:
+        noun = Noun()
+        noun.guid = guid
+        noun.singular_exist = True
+        noun.nounsn = 'Wort{}'.format(guid)
+        return noun
+
+    def handler_event(self, event: object, *args, **kwargs) -> None:
+        if event.dictmdl is not self.dictmdl:
+            return
+        if isinstance(event, EventWordBatch):
+            self.events.append((event.added, event.removed, event.updated))
+        else:
+            self.events.append((event.__class__, event.guid))
+
+    def test_batch(self):
+        with self.dictmdl.batch():
+            self.dictmdl.add_words(self.create_noun(guid) for guid in (10, 11, 12, 14))
+            self.dictmdl.remove_words([3, 4, 5, 12])
+            self.dictmdl.update_words([self.create_noun(7), self.create_noun(8)])
+            # Added and removed within the batch: not reported. Removed and added again: updated.
+            self.dictmdl.remove_word(11)
+            self.dictmdl.add_word(self.create_noun(4))
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.events, [([range(10, 11), range(14, 15)], [range(3, 4), range(5, 6)],
+                                        [range(4, 5), range(7, 9)])])
+        self.assertEqual(sorted(self.dictmdl.get_wordguidlist()), [0, 1, 2, 4, 6, 7, 8, 9, 10, 14])
+
+        # Outside of a batch every change is an event of its own.
+        self.events.clear()
+        self.dictmdl.remove_word(14)
+        self.assertEqual(self.events, [(EventWordRemoved, 14)])
+
+    def test_batch_exception(self):
+        with self.assertRaises(KeyError):
+            self.dictmdl.remove_words([1, 2, 100])
+        self.assertEqual(self.events, [([], [range(1, 3)], [])])
+
+
+if __name__ == '__main__':
+    unittest.main()
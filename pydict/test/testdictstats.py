@@ -0,0 +1,78 @@
+import random
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from columnardictmdl import ColumnarDictModel
+from dictstats import DictMdlStatistics
+
+class Test_DictMdlStatistics(unittest.TestCase):
+
+    STEP_COUNT = 300
+
+    def create_noun(self, rnd: random.Random, guid: int) -> Noun:
+        noun = Noun()
+        noun.guid = guid
+        noun.gender = rnd.choice([None] + list(GrammaticalGender))
+        noun.singular_exist = rnd.random() < 0.8
+        noun.plural_exist = rnd.random() < 0.7
+        noun.nounsn = 'Wort{}'.format(guid)
+        noun.hun.update(rnd.sample(['szó', 'kifejezés', 'beszéd', 'ige'], rnd.randrange(4)))
+        return noun
+
+    def mutate(self, rnd: random.Random, dictmdl: DictModel) -> None:
+        guids = dictmdl.get_wordguidlist()
+        action = rnd.randrange(5)
+        if (action == 0) or not guids:
+            dictmdl.add_word(self.create_noun(rnd, dictmdl.allocate_guid()))
+        elif action == 1:
+            dictmdl.remove_word(rnd.choice(guids))
+        elif action == 2:
+            dictmdl.update_word(self.create_noun(rnd, rnd.choice(guids)))
+        elif action == 3:
+            # Edited in place: the statistics shall not depend on the previous state of the word.
+            # (The rows of a ColumnarDictModel are read-only views.)
+            word = dictmdl.get_word(rnd.choice(guids))
+            if type(word) is Noun:
+                word.plural_exist = not word.plural_exist
+                word.hun.add('új')
+                dictmdl.update_word(word)
+        else:
+            with dictmdl.batch():
+                for _ in range(rnd.randrange(1, 6)):
+                    self.mutate(rnd, dictmdl)
+
+    def test_rescan_equivalence(self):
+        for dictmdl in (DictModel(), ColumnarDictModel()):
+            with self.subTest(dictmdl = dictmdl.__class__.__name__):
+                rnd = random.Random(23)
+                dictmdl.guid_alloc_en = True
+                dictmdl.add_words(self.create_noun(rnd, dictmdl.allocate_guid()) for _ in range(50))
+                stats = DictMdlStatistics(dictmdl)
+                stats.attach()
+                self.addCleanup(stats.detach)
+                changes = []
+                stats.changed.connect(lambda: changes.append(None))
+                for _ in range(self.STEP_COUNT):
+                    self.mutate(rnd, dictmdl)
+                    self.assertEqual(stats.get_summary(), DictMdlStatistics(dictmdl).get_summary())
+                self.assertGreater(len(changes), 0)
+
+    def test_queries(self):
+        dictmdl = DictModel(event_en = False)
+        stats = DictMdlStatistics(dictmdl)
+        self.assertEqual(stats.get_translations_per_word(), 0.0)
+        rnd = random.Random(1)
+        for guid in range(3):
+            dictmdl.add_word(self.create_noun(rnd, guid))
+        stats.rescan()
+        words = dictmdl.get_wordlist()
+        self.assertEqual(stats.word_count, 3)
+        self.assertEqual(stats.no_plural_count, sum(1 for word in words if not word.plural_exist))
+        self.assertEqual(stats.no_translation_count, sum(1 for word in words if not word.hun_view))
+        self.assertEqual(stats.translation_count, sum(len(word.hun_view) for word in words))
+        self.assertEqual(sum(stats.get_gender_count(gender) for gender in [None] + list(GrammaticalGender)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import json
+import tempfile
+import unittest
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence
+from binpersistence import BinDictMdlPersistence
+from importer import CsvDictMdlImporter
+from exporter import DictMdlExporter, ExportFormat
+
+class Test_DictMdlExporter(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        self.xmldmp.load_dict()
+        self.dictmdl = self.xmldmp.dictmdl
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def get_path(self, filename: str) -> str:
+        return os.path.join(self.tmpdir.name, filename)
+
+    def read_lines(self, path: str) -> list:
+        with open(path, 'r', encoding = 'UTF-8') as fd:
+            return fd.read().splitlines()
+
+    def test_jsonl(self):
+        exporter = DictMdlExporter(self.get_path('dict.jsonl'), fields = ('guid', 'gender', 'hungarian'),
+                                   genders = {GrammaticalGender.MASCULINE})
+        expected = [word for word in self.dictmdl.get_wordlist() if word.gender == GrammaticalGender.MASCULINE]
+        self.assertEqual(exporter.export_dictmdl(self.dictmdl), len(expected))
+        records = [json.loads(line) for line in self.read_lines(exporter.path)]
+        self.assertEqual(records, [{'guid': word.guid, 'gender': 'MASCULINE', 'hungarian': sorted(word.hun_view)}
+                                   for word in expected])
+
+    def test_csv_round_trip(self):
+        for filename in ('dict.csv', 'dict.tsv'):
+            exporter = DictMdlExporter(self.get_path(filename))
+            self.assertEqual(exporter.export_dictmdl(self.dictmdl), len(self.dictmdl))
+            imported = DictModel(event_en = False)
+            imported.guid_alloc_en = True
+            CsvDictMdlImporter(imported, exporter.path, workers = 1).run()
+            # The importer skips the repeated singular and plural pairs of the dictionary.
+            expected = {}
+            for word in self.dictmdl.get_wordlist():
+                expected.setdefault((word.nounsn, word.nounpl), (word.gender, word.nounsn, word.nounpl, word.hun_view))
+            self.assertEqual([(word.gender, word.nounsn, word.nounpl, word.hun_view) for word in imported.get_wordlist()],
+                             list(expected.values()))
+
+    def test_shards(self):
+        snapshot_path = self.get_path('dict.snapshot')
+        BinDictMdlPersistence(dictmdl = self.dictmdl, path = snapshot_path).save_dict()
+        exporter = DictMdlExporter(self.get_path('dict.jsonl'), export_format = ExportFormat.JSONL)
+        exporter.export_dictmdl(self.dictmdl)
+        shardpaths = exporter.export_shards(snapshot_path, 3, workers = 2)
+        self.assertEqual(sum((self.read_lines(path) for path in shardpaths), []), self.read_lines(exporter.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from language.article import GrammaticalGender
+from persistence import XmlDictMdlPersistence
+from importer import CsvDictMdlImporter, ImportResult
+
+class Test_CsvDictMdlImporter(unittest.TestCase):
+
+    CSV_TEXT = ('hungarian,article,singular,plural\n'
+                'ház; otthon ,das,Haus,Häuser\n'
+                'vendég,der,gast,GÄSTE\n'
+                'szülők,die,-,Eltern\n'
+                'hiba,den,Fehler,Fehler\n'
+                '\n'
+                'ház,das,Haus,Häuser\n')
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        self.xmldmp.load_dict()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def write(self, filename: str, text: str) -> str:
+        path = os.path.join(self.tmpdir.name, filename)
+        with open(path, 'w', encoding = 'UTF-8') as fd:
+            fd.write(text)
+        return path
+
+    def test_import(self):
+        dictmdl = self.xmldmp.dictmdl
+        wordcnt = len(dictmdl)
+        maxguid = max(dictmdl.get_wordguidlist())
+        importer = CsvDictMdlImporter(dictmdl, self.write('words.csv', self.CSV_TEXT), workers = 1)
+        with self.assertLogs('importer', 'WARNING'):
+            self.assertEqual(importer.run(), ImportResult(2, 2, 1))
+        self.assertEqual(len(dictmdl), wordcnt + 2)
+
+        haus, eltern = dictmdl.get_word(maxguid + 1), dictmdl.get_word(maxguid + 2)
+        self.assertEqual((haus.gender, haus.nounsn, haus.nounpl, haus.hun_view),
+                         (GrammaticalGender.NEUTRAL, 'Haus', 'Häuser', {'ház', 'otthon'}))
+        self.assertEqual((eltern.gender, eltern.singular_exist, eltern.nounsn, eltern.nounpl),
+                         (GrammaticalGender.PLURAL, False, None, 'Eltern'))
+
+    def test_header_after_empty_rows(self):
+        importer = CsvDictMdlImporter(self.xmldmp.dictmdl, self.write('words.csv', '\n ,\n' + self.CSV_TEXT), workers = 1)
+        with self.assertLogs('importer', 'WARNING'):
+            self.assertEqual(importer.run(), ImportResult(2, 2, 1))
+
+    def test_parallel_import(self):
+        rows = ''.join('das\tWort{0}\tWorte{0}\tszó{0}\n'.format(idx) for idx in range(100))
+        importer = CsvDictMdlImporter(self.xmldmp.dictmdl, self.write('words.tsv', rows + rows), workers = 2)
+        importer.chunk_size = 7
+        importer.batch_size = 30
+        self.assertEqual(importer.run(), ImportResult(100, 100, 0))
+        words = self.xmldmp.dictmdl.get_wordlist(is_ordered = True)[-100:]
+        self.assertEqual([word.nounsn for word in words], ['Wort{}'.format(idx) for idx in range(100)])
+
+
+if __name__ == '__main__':
+    unittest.main()
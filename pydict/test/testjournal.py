@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence
+from journal import DictMdlJournal
+
+class Test_DictMdlJournal(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmpdir.name, 'dict.xml')
+        self.journal_path = os.path.join(self.tmpdir.name, 'dict.journal')
+        shutil.copyfile(r'dict.xml', self.xml_path)
+        self.journals = []
+
+    def tearDown(self):
+        for journal in self.journals:
+            journal.detach()
+            journal.wait_compaction()
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def load_journal(self) -> DictMdlJournal:
+        xmldmp = XmlDictMdlPersistence(path = self.xml_path)
+        xmldmp.load_dict()
+        journal = DictMdlJournal(dictmdl = xmldmp.dictmdl, path = self.journal_path, basepath = self.xml_path)
+        journal.fsync_en = False
+        self.journals.append(journal)
+        return journal
+
+    def get_words(self, dictmdl: DictModel) -> dict:
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def modify(self, dictmdl: DictModel) -> None:
+        noun = Noun()
+        noun.guid = dictmdl.allocate_guid()
+        noun.gender = GrammaticalGender.NEUTRAL
+        noun.singular_exist = True
+        noun.nounsn = 'Haus'
+        noun.hun.update(['ház'])
+        dictmdl.add_word(noun)
+
+        updated = dictmdl.get_word(1)
+        updated.hun.add('látogató')
+        dictmdl.update_word(updated)
+        dictmdl.remove_word(2)
+
+    def test_journal_replay(self):
+        journal = self.load_journal()
+        journal.attach()
+        self.modify(journal.dictmdl)
+        # The changes of an unrelated model shall not be journaled.
+        other = XmlDictMdlPersistence(path = self.xml_path)
+        other.load_dict()
+        other.dictmdl.remove_word(3)
+        journal.flush()
+        journal.detach()
+        expected_words = self.get_words(journal.dictmdl)
+
+        replayed = self.load_journal()
+        self.assertEqual(replayed.replay(), 3)
+        self.assertEqual(self.get_words(replayed.dictmdl), expected_words)
+
+        # A torn record at the end of the journal is dropped during the replay.
+        journal_size = os.path.getsize(self.journal_path)
+        with open(self.journal_path, 'ab') as fd:
+            fd.write(b'\x10\x00\x00\x00torn')
+        replayed = self.load_journal()
+        with self.assertLogs('journal', 'WARNING'):
+            self.assertEqual(replayed.replay(), 3)
+        self.assertEqual(self.get_words(replayed.dictmdl), expected_words)
+        self.assertEqual(os.path.getsize(self.journal_path), journal_size)
+
+    def test_journal_batch(self):
+        journal = self.load_journal()
+        journal.attach()
+        with journal.dictmdl.batch():
+            self.modify(journal.dictmdl)
+        journal.flush()
+        journal.detach()
+        expected_words = self.get_words(journal.dictmdl)
+
+        replayed = self.load_journal()
+        self.assertEqual(replayed.replay(), 3)
+        self.assertEqual(self.get_words(replayed.dictmdl), expected_words)
+
+    def test_journal_compaction(self):
+        journal = self.load_journal()
+        journal.compact_size = 1
+        journal.attach()
+        self.modify(journal.dictmdl)
+        journal.flush()
+        journal.wait_compaction()
+        expected_words = self.get_words(journal.dictmdl)
+
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertFalse(os.path.exists(journal.old_path))
+        compacted = XmlDictMdlPersistence(path = self.xml_path)
+        compacted.load_dict()
+        self.assertEqual(self.get_words(compacted.dictmdl), expected_words)
+
+
+if __name__ == '__main__':
+    unittest.main()
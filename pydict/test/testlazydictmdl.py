@@ -0,0 +1,119 @@
+import os
+import copy
+import tempfile
+import unittest
+from persistence import XmlDictMdlPersistence, DictMdlLoadException
+from binpersistence import BinDictMdlPersistence
+from lazydictmdl import LazyDictModel
+from dictstats import DictMdlStatistics
+from undostack import DictMdlUndoStack
+
+class BuildCountingLazyDictModel(LazyDictModel):
+
+    built_count = 0
+
+    def _build_word(self, offset: int) -> object:
+        self.built_count += 1
+        return super()._build_word(offset)
+
+class Test_LazyDictModel(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmpdir.name, 'dict.snapshot')
+        self.xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        self.xmldmp.load_dict()
+        BinDictMdlPersistence(dictmdl = self.xmldmp.dictmdl, path = self.snapshot_path).save_dict()
+        self.lazymdl = LazyDictModel(path = self.snapshot_path, cache_size = 2, event_en = False)
+
+    def tearDown(self):
+        self.lazymdl.close()
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def get_words(self, dictmdl: object) -> list:
+        # The order of the Hungarian translations is not stable, so the words are compared by value.
+        return [(word.guid, word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()]
+
+    def test_lazy_index(self):
+        dictmdl = self.xmldmp.dictmdl
+        self.assertEqual(len(self.lazymdl), len(dictmdl))
+        self.assertEqual(self.lazymdl.get_wordguidlist(), dictmdl.get_wordguidlist())
+        self.assertIn(1, self.lazymdl)
+        self.assertEqual(self.lazymdl.cached_count, 0)
+
+        for guid in dictmdl.get_wordguidlist():
+            self.assertEqual(str(self.lazymdl.get_word(guid)), str(dictmdl.get_word(guid)))
+        self.assertEqual(self.lazymdl.cached_count, 2)
+        self.assertIsNone(self.lazymdl.get_word(max(dictmdl.get_wordguidlist()) + 1))
+        self.assertEqual(self.get_words(self.lazymdl), self.get_words(dictmdl))
+
+    def test_lazy_edit(self):
+        for dictmdl in (self.xmldmp.dictmdl, self.lazymdl):
+            word = copy.copy(dictmdl.get_word(1))
+            word.hun.add('szerkesztett')
+            dictmdl.update_word(word)
+            added = copy.copy(word)
+            added.guid = dictmdl.allocate_guid()
+            dictmdl.add_word(added)
+            dictmdl.remove_word(2)
+
+        # The edited words are not evicted by reading every other word.
+        for guid in self.lazymdl.get_wordguidlist():
+            self.lazymdl.get_word(guid)
+        self.assertEqual(self.lazymdl.pinned_count, 2)
+        self.assertIn('szerkesztett', self.lazymdl.get_word(1).hun_view)
+        self.assertNotIn(2, self.lazymdl)
+        self.assertEqual(self.get_words(self.lazymdl), self.get_words(self.xmldmp.dictmdl))
+        self.assertEqual(self.get_words(self.lazymdl.snapshot()), self.get_words(self.xmldmp.dictmdl))
+
+    def test_records(self):
+        # The statistics and the undo stack read the records of the snapshot, not the words.
+        lazymdl = BuildCountingLazyDictModel(path = self.snapshot_path, cache_size = 2)
+        self.addCleanup(lazymdl.close)
+        for dictmdl in (self.xmldmp.dictmdl, lazymdl):
+            word = copy.copy(dictmdl.get_word(1))
+            word.hun.add('szerkesztett')
+            dictmdl.update_word(word)
+            dictmdl.remove_word(2)
+        expected = sorted(self.get_words(lazymdl))
+        built_count = lazymdl.built_count
+
+        stats = DictMdlStatistics(lazymdl)
+        undostack = DictMdlUndoStack(lazymdl)
+        undostack.attach()
+        self.addCleanup(undostack.detach)
+        self.assertEqual(lazymdl.built_count, built_count)
+        self.assertEqual(stats.get_summary(), DictMdlStatistics(self.xmldmp.dictmdl).get_summary())
+
+        lazymdl.remove_word(1)
+        lazymdl.remove_word(3)
+        self.assertTrue(undostack.undo())
+        self.assertTrue(undostack.undo())
+        self.assertEqual(sorted(self.get_words(lazymdl)), expected)
+
+    def test_truncated_snapshot(self):
+        with open(self.snapshot_path, 'rb') as fd:
+            data = fd.read()
+        for size in (10, len(data) - 10):
+            truncated_path = os.path.join(self.tmpdir.name, 'truncated{}.snapshot'.format(size))
+            with open(truncated_path, 'wb') as fd:
+                fd.write(data[:size])
+            with self.assertRaises(DictMdlLoadException):
+                LazyDictModel(path = truncated_path, event_en = False)
+
+    def test_snapshot_after_close(self):
+        # A snapshot being saved in the background outlives the close (or reopen) of the model.
+        expected = self.get_words(self.lazymdl)
+        snapshot = self.lazymdl.snapshot()
+        self.lazymdl.close()
+        self.lazymdl.open(self.snapshot_path)
+        self.lazymdl.close()
+        self.assertEqual(self.get_words(snapshot), expected)
+        snapshot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
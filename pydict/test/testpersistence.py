@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence, XmlLoadMode, XmlSaveMode, XmlCompression, DictMdlLoadException
+
+class Test_XmlDictMdlPersistence(unittest.TestCase):
+
+    INVALID_DICTS = (
+        '<Foo/>',
+        '<Dictionary/>',
+        '<Dictionary><Bar/></Dictionary>',
+        '<Dictionary><WordCollection><Word><GUID>0x1</GUID><WordClass>Noun</WordClass><Hungarian/></Word>'
+        '<Word><GUID>0x1</GUID></Word></WordCollection></Dictionary>',
+        '<Dictionary><WordCollection><Word><GUID>0x1</GUID></Word><Word><WordClass/></Word></WordCollection></Dictionary>',
+        '<Dictionary><WordCollection><Word><GUID>0x1</GUID></Word><Word><GUID>zz</GUID></Word></WordCollection></Dictionary>',
+        '<Dictionary><WordCollection><Word><GUID>0x1</GUID></Word><Nope/></WordCollection></Dictionary>',
+        # The xmlpath of a single word is indexed, as the streaming load cannot know the next words.
+        '<Dictionary><WordCollection><Word><GUID>zz</GUID></Word></WordCollection></Dictionary>',
+    )
+
+    def setUp(self):
+        super().setUp()
+        fd, self.tmppath = tempfile.mkstemp(suffix = '.xml')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.tmppath)
+        super().tearDown()
+
+    def load(self, path: str, load_mode: XmlLoadMode) -> XmlDictMdlPersistence:
+        dmp = XmlDictMdlPersistence(load_mode = load_mode)
+        dmp.path = path
+        # Small chunks, so even the test dictionaries are split between the workers.
+        dmp.workers = 2
+        dmp.chunk_size = 64
+        dmp.load_dict()
+        return dmp
+
+    def load_error(self, path: str, load_mode: XmlLoadMode) -> str:
+        with self.assertRaises(DictMdlLoadException) as context:
+            self.load(path, load_mode)
+        return context.exception.xtext
+
+    def test_stream_load(self):
+        dmp_dom = self.load(r'dict.xml', XmlLoadMode.DOM)
+        dmp_stream = self.load(r'dict.xml', XmlLoadMode.STREAMING)
+        self.assertEqual(len(dmp_dom.dictmdl), len(dmp_stream.dictmdl))
+        self.assertEqual(dmp_dom.to_string(), dmp_stream.to_string())
+        self.assertTrue(dmp_stream.dictmdl.guid_alloc_en)
+
+    def test_stream_load_errors(self):
+        for xmltext in self.INVALID_DICTS:
+            with open(self.tmppath, 'w') as fd:
+                fd.write(xmltext)
+            self.assertEqual(self.load_error(self.tmppath, XmlLoadMode.DOM),
+                             self.load_error(self.tmppath, XmlLoadMode.STREAMING))
+
+    def test_word_children(self):
+        # Of the duplicate children the last one is loaded, and the Hungarian translations come
+        # from the Hungarian child of the Word only.
+        xmltext = ('<Dictionary><WordCollection>'
+                   '<Word><GUID>0x1</GUID><WordClass>Verb</WordClass><WordClass>Noun</WordClass>'
+                   '<German><Article>der</Article><Article>das</Article><Singular>Haus</Singular></German>'
+                   '<Hungarian>első</Hungarian><Hungarian>ház</Hungarian></Word>'
+                   '<Word><GUID>0x2</GUID><WordClass>Noun</WordClass>'
+                   '<German><Singular>Gast</Singular><Hungarian>beágyazott</Hungarian></German></Word>'
+                   '<Word><GUID>0x3</GUID><WordClass>Noun</WordClass><WordClass>Verb</WordClass></Word>'
+                   '</WordCollection></Dictionary>')
+        with open(self.tmppath, 'w', encoding = 'UTF-8') as fd:
+            fd.write(xmltext)
+        for load_mode in XmlLoadMode:
+            with self.subTest(load_mode = load_mode):
+                if load_mode == XmlLoadMode.PARALLEL:
+                    # The warning of the unknown WordClass is logged by a worker process.
+                    dictmdl = self.load(self.tmppath, load_mode).dictmdl
+                else:
+                    with self.assertLogs('persistence', 'WARNING'):
+                        dictmdl = self.load(self.tmppath, load_mode).dictmdl
+                self.assertEqual(dictmdl.get_wordguidlist(), [1, 2])
+                haus, gast = dictmdl.get_word(1), dictmdl.get_word(2)
+                self.assertEqual((haus.gender, haus.nounsn, set(haus.hun_view)), (GrammaticalGender.NEUTRAL, 'Haus', {'ház'}))
+                self.assertEqual((gast.guid, gast.nounsn, set(gast.hun_view)), (2, 'Gast', set()))
+
+    def test_parallel_load(self):
+        dmp_dom = self.load(r'dict.xml', XmlLoadMode.DOM)
+        dmp_parallel = self.load(r'dict.xml', XmlLoadMode.PARALLEL)
+        self.assertEqual(dmp_dom.to_string(), dmp_parallel.to_string())
+        self.assertTrue(dmp_parallel.dictmdl.guid_alloc_en)
+
+    def test_parallel_load_errors(self):
+        duplicate_words = ''.join('<Word><GUID>{}</GUID><WordClass>Noun</WordClass><Hungarian>szó</Hungarian></Word>'
+                                  .format(hex(guid)) for guid in (1, 2, 3, 4, 5, 6, 2))
+        duplicate_dict = '<Dictionary><WordCollection>' + duplicate_words + '</WordCollection></Dictionary>'
+        for xmltext in self.INVALID_DICTS + (duplicate_dict,):
+            with open(self.tmppath, 'w') as fd:
+                fd.write(xmltext)
+            self.assertEqual(self.load_error(self.tmppath, XmlLoadMode.DOM),
+                             self.load_error(self.tmppath, XmlLoadMode.PARALLEL))
+
+    def test_stream_save(self):
+        dmp = self.load(r'dict.xml', XmlLoadMode.STREAMING)
+        dmp.path = self.tmppath
+        dmp.save_mode = XmlSaveMode.STREAMING
+        dmp.save_dict()
+        with open(r'dict.xml', 'rb') as fd_orig, open(self.tmppath, 'rb') as fd_saved:
+            self.assertEqual(fd_orig.read(), fd_saved.read())
+
+    def test_compressed_save_load(self):
+        dmp = self.load(r'dict.xml', XmlLoadMode.DOM)
+        xmltext = dmp.to_string()
+        for compression, extension in ((XmlCompression.GZIP, '.xml.gz'), (XmlCompression.XZ, '.xml.xz')):
+            dmp.path = self.tmppath + extension
+            dmp.compress_level = 1
+            for save_mode in XmlSaveMode:
+                dmp.save_mode = save_mode
+                dmp.save_dict()
+                self.assertEqual(dmp.get_compression(), compression)
+                for load_mode in XmlLoadMode:
+                    self.assertEqual(self.load(dmp.path, load_mode).to_string(), xmltext)
+            os.remove(dmp.path)
+
+        # The magic bytes are detected even if the extension does not tell the compression.
+        dmp.path = self.tmppath
+        dmp.compression = XmlCompression.GZIP
+        dmp.save_dict()
+        self.assertEqual(self.load(self.tmppath, XmlLoadMode.STREAMING).to_string(), xmltext)
+
+    def test_stream_save_empty(self):
+        dmp = XmlDictMdlPersistence()
+        dmp.dictmdl = DictModel()
+        xmltext = dmp.to_string()
+        dmp.save_mode = XmlSaveMode.STREAMING
+        self.assertEqual(xmltext, dmp.to_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
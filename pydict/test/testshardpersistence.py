@@ -0,0 +1,101 @@
+import os
+import copy
+import tempfile
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence
+from shardpersistence import ShardedDictMdlPersistence, BloomFilter, get_shard_key
+
+class Test_ShardedDictMdlPersistence(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.shard_path = os.path.join(self.tmpdir.name, 'dict')
+        self.xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        self.xmldmp.load_dict()
+        ShardedDictMdlPersistence(dictmdl = self.xmldmp.dictmdl, path = self.shard_path).save_dict()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def load_shards(self) -> ShardedDictMdlPersistence:
+        dmp = ShardedDictMdlPersistence(path = self.shard_path)
+        dmp.load_dict()
+        return dmp
+
+    def get_words(self, dictmdl: DictModel) -> dict:
+        # The words are ordered by shard, so they are compared by value.
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter.create(100)
+        for idx in range(100):
+            bloom.add('word{}'.format(idx))
+        restored = BloomFilter(bloom.bitcnt, bloom.hashcnt, bloom.bits)
+        self.assertTrue(all('word{}'.format(idx) in restored for idx in range(100)))
+        self.assertLess(sum('other{}'.format(idx) in restored for idx in range(1000)), 50)
+
+    def test_lazy_shards(self):
+        dictmdl = self.xmldmp.dictmdl
+        dmp = self.load_shards()
+        shardmdl = dmp.dictmdl
+        self.assertEqual(len(shardmdl), len(dictmdl))
+        self.assertEqual(sorted(shardmdl.get_wordguidlist()), sorted(dictmdl.get_wordguidlist()))
+        self.assertEqual(shardmdl.loaded_keys, set())
+
+        word = dictmdl.get_word(1)
+        self.assertEqual(str(shardmdl.get_word(1)), str(word))
+        self.assertEqual(shardmdl.loaded_keys, {get_shard_key(word)})
+        # The negative lookup is answered by the Bloom filters.
+        self.assertEqual(shardmdl.find_german('Nichtvorhandenes'), [])
+        self.assertEqual(shardmdl.loaded_keys, {get_shard_key(word)})
+        self.assertEqual([found.guid for found in shardmdl.find_german(word.nounsn.upper())], [1])
+
+        self.assertEqual(self.get_words(shardmdl.snapshot()), self.get_words(dictmdl))
+
+    def test_string(self):
+        dmp = ShardedDictMdlPersistence()
+        dmp.from_string(self.load_shards().to_string())
+        self.assertEqual(self.get_words(dmp.dictmdl), self.get_words(self.xmldmp.dictmdl))
+
+        # The loaded string is written into every shard.
+        dmp.path = os.path.join(self.tmpdir.name, 'string')
+        dmp.save_dict()
+        dmp = ShardedDictMdlPersistence(path = dmp.path)
+        dmp.load_dict()
+        self.assertEqual(self.get_words(dmp.dictmdl), self.get_words(self.xmldmp.dictmdl))
+
+    def test_dirty_shards(self):
+        dmp = self.load_shards()
+        shardmdl = dmp.dictmdl
+        updated = copy.copy(shardmdl.get_word(1))
+        updated.hun.add('szerkesztett')
+        shardmdl.update_word(updated)
+        noun = Noun()
+        noun.guid = shardmdl.allocate_guid()
+        noun.gender = GrammaticalGender.NEUTRAL
+        noun.singular_exist = True
+        noun.nounsn = 'Ärger'
+        noun.hun.update(['bosszúság'])
+        shardmdl.add_word(noun)
+        self.assertEqual(shardmdl.dirty_keys, {get_shard_key(updated), 'a'})
+
+        for filename in os.listdir(self.shard_path):
+            os.utime(os.path.join(self.shard_path, filename), ns = (0, 0))
+        dmp.save_dict()
+        rewritten = {filename for filename in os.listdir(self.shard_path)
+                     if os.stat(os.path.join(self.shard_path, filename)).st_mtime_ns != 0}
+        self.assertEqual(rewritten, {dmp.MANIFEST_FILE_NAME, 'shard_a.xml', dmp.SHARD_FILE_NAME.format(get_shard_key(updated))})
+        self.assertEqual(shardmdl.dirty_keys, set())
+
+        expected = shardmdl.snapshot()
+        self.assertEqual(self.get_words(self.load_shards().dictmdl), self.get_words(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+from language.noun import Noun
+from sortedindex import SortedIndex, get_din5007_key
+from dictmdl import DictModel, WordOrder
+from columnardictmdl import ColumnarDictModel
+
+class Test_SortedIndex(unittest.TestCase):
+
+    def test_index(self):
+        rnd = random.Random(5007)
+        keys = rnd.sample(range(100000), 5000)
+        index = SortedIndex(keys[:1000])
+        index.BLOCK_SIZE = 16
+        for key in keys[1000:]:
+            index.add(key)
+        for key in keys[::3]:
+            index.remove(key)
+        expected = sorted(set(keys) - set(keys[::3]))
+        self.assertEqual(len(index), len(expected))
+        self.assertEqual(list(index), expected)
+        self.assertEqual(list(reversed(index)), expected[::-1])
+        self.assertEqual(list(index.irange(20000, 30000)), [key for key in expected if 20000 <= key <= 30000])
+        self.assertEqual(list(index.irange(high = 500, reverse = True)), [key for key in expected if key <= 500][::-1])
+        self.assertNotIn(keys[0], index)
+        with self.assertRaises(KeyError):
+            index.remove(keys[0])
+
+    def test_din5007_key(self):
+        self.assertEqual(get_din5007_key('Mädchen'), 'madchen')
+        self.assertEqual(get_din5007_key('Straße'), 'strasse')
+        self.assertEqual(get_din5007_key('Öl'), get_din5007_key('ol'))
+
+
+
+class Test_DictModelOrder(unittest.TestCase):
+
+    TEXTS = ['Hof', 'Haus', 'Magen', 'Häuschen', 'Made', 'Mädchen', 'Straße', 'Strasse', 'Hofer', 'Ähre']
+
+    def create_dictmdl(self, dictmdl: DictModel) -> DictModel:
+        dictmdl.add_words(self.create_noun(guid, text) for guid, text in enumerate(self.TEXTS))
+        return dictmdl
+
+    def create_noun(self, guid: int, text: str) -> Noun:
+        noun = Noun()
+        noun.guid = guid
+        noun.singular_exist = True
+        noun.nounsn = text
+        return noun
+
+    def get_texts(self, words: list) -> list:
+        return [word.nounsn for word in words]
+
+    def test_order(self):
+        for dictmdl in (DictModel(event_en = False), ColumnarDictModel(event_en = False)):
+            with self.subTest(dictmdl = dictmdl.__class__.__name__):
+                self.create_dictmdl(dictmdl)
+                self.assertEqual(self.get_texts(dictmdl.iter_words(WordOrder.ALPHABETICAL)),
+                        ['Ähre', 'Haus', 'Häuschen', 'Hof', 'Hofer', 'Mädchen', 'Made', 'Magen', 'Strasse', 'Straße'])
+                self.assertEqual(self.get_texts(dictmdl.get_range('Haus', 'Hof')), ['Haus', 'Häuschen', 'Hof'])
+                self.assertEqual([word.guid for word in dictmdl.get_wordlist(True, False)], list(range(9, -1, -1)))
+
+                # The indexes follow the changes.
+                dictmdl.remove_word(3)
+                dictmdl.update_word(self.create_noun(4, 'Hose'))
+                dictmdl.add_word(self.create_noun(20, 'Hase'))
+                self.assertEqual(self.get_texts(dictmdl.get_range('H', 'I')), ['Hase', 'Haus', 'Hof', 'Hofer', 'Hose'])
+                self.assertEqual(self.get_texts(dictmdl.get_range('H', 'Hof', reverse = True)), ['Hof', 'Haus', 'Hase'])
+                self.assertEqual([word.guid for word in dictmdl.get_range(7, None, WordOrder.GUID)], [7, 8, 9, 20])
+
+    def test_update_in_place(self):
+        dictmdl = self.create_dictmdl(DictModel(event_en = False))
+        self.assertEqual(self.get_texts(dictmdl.get_range('Hof', 'Hof')), ['Hof'])
+        word = dictmdl.get_word(0)
+        word.nounsn = 'Zaun'
+        dictmdl.update_word(word)
+        self.assertEqual(self.get_texts(dictmdl.get_range('Hof', 'Hof')), [])
+        self.assertEqual(self.get_texts(dictmdl.get_range('Z')), ['Zaun'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence
+from sqlpersistence import SqliteDictMdlPersistence
+
+class Test_SqliteDictMdlPersistence(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'dict.sqlite')
+        xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        xmldmp.load_dict()
+        self.xml_text = xmldmp.to_string()
+        self.dmps = []
+
+    def tearDown(self):
+        for dmp in self.dmps:
+            dmp.close()
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def create_dmp(self) -> SqliteDictMdlPersistence:
+        dmp = SqliteDictMdlPersistence(path = self.db_path)
+        self.dmps.append(dmp)
+        return dmp
+
+    def reload_xml_text(self) -> str:
+        dmp = self.create_dmp()
+        dmp.load_dict()
+        xml_text = XmlDictMdlPersistence(dictmdl = dmp.dictmdl).to_string()
+        dmp.close()
+        return xml_text
+
+    def reload_words(self) -> dict:
+        dmp = self.create_dmp()
+        dmp.load_dict()
+        words = self.get_words(dmp.dictmdl)
+        dmp.close()
+        return words
+
+    def get_words(self, dictmdl: DictModel) -> dict:
+        # The order of the Hungarian translations is not stable, so the words are compared by value.
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def test_xml_import_export(self):
+        dmp = self.create_dmp()
+        dmp.import_xml(r'dict.xml')
+        dmp.close()
+        self.assertEqual(self.reload_xml_text(), self.xml_text)
+
+        xml_path = os.path.join(self.tmpdir.name, 'dict.xml')
+        dmp = self.create_dmp()
+        dmp.export_xml(xml_path)
+        with open(r'dict.xml', 'rb') as fd_orig, open(xml_path, 'rb') as fd_exported:
+            self.assertEqual(fd_orig.read(), fd_exported.read())
+
+    def test_incremental_save(self):
+        dmp = self.create_dmp()
+        dmp.import_xml(r'dict.xml')
+        dictmdl = dmp.dictmdl
+
+        noun = Noun()
+        noun.guid = dictmdl.allocate_guid()
+        noun.gender = GrammaticalGender.NEUTRAL
+        noun.singular_exist = True
+        noun.nounsn = 'Haus'
+        noun.hun.update(['ház'])
+        dictmdl.add_word(noun)
+
+        updated = dictmdl.get_word(1)
+        updated.hun.add('látogató')
+        dictmdl.update_word(updated)
+        dictmdl.remove_word(2)
+        self.assertEqual(dmp.pending_count, 3)
+
+        changes_before = dmp.connect().total_changes
+        dmp.save_dict()
+        self.assertEqual(dmp.pending_count, 0)
+        # One upsert and hun rewrite per changed word, instead of a rewrite of every word.
+        self.assertLess(dmp.connect().total_changes - changes_before, 10)
+        expected_words = self.get_words(dictmdl)
+        dmp.close()
+        self.assertEqual(self.reload_words(), expected_words)
+
+    def test_other_model_events(self):
+        dmp = self.create_dmp()
+        dmp.import_xml(r'dict.xml')
+        expected_words = self.get_words(dmp.dictmdl)
+
+        # The changes of an unrelated model shall not reach the database.
+        xmldmp = XmlDictMdlPersistence(path = r'dict.xml')
+        xmldmp.load_dict()
+        xmldmp.dictmdl.remove_word(1)
+        self.assertEqual(dmp.pending_count, 0)
+        dmp.save_dict()
+        dmp.close()
+        self.assertEqual(self.reload_words(), expected_words)
+
+
+if __name__ == '__main__':
+    unittest.main()
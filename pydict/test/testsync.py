@@ -0,0 +1,89 @@
+import copy
+import socket
+import threading
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence
+from sync import DictMdlSyncPeer, SocketSyncTransport
+
+class Test_DictMdlSyncPeer(unittest.TestCase):
+
+    def load_peer(self) -> DictMdlSyncPeer:
+        dmp = XmlDictMdlPersistence(path = r'dict.xml')
+        dmp.load_dict()
+        peer = DictMdlSyncPeer(dmp.dictmdl)
+        peer.attach()
+        self.addCleanup(peer.detach)
+        return peer
+
+    def get_words(self, dictmdl: DictModel) -> dict:
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def modify(self, dictmdl: DictModel) -> None:
+        noun = Noun()
+        noun.guid = dictmdl.allocate_guid() + 1000
+        noun.gender = GrammaticalGender.NEUTRAL
+        noun.singular_exist = True
+        noun.nounsn = 'Haus'
+        noun.hun.update(['ház'])
+        dictmdl.add_word(noun)
+        updated = dictmdl.get_word(1)
+        updated.hun.add('látogató')
+        dictmdl.update_word(updated)
+        dictmdl.remove_word(2)
+
+    def run_sync(self, local: DictMdlSyncPeer, remote: DictMdlSyncPeer, method: str) -> int:
+        localsock, remotesock = socket.socketpair()
+        localtransport = SocketSyncTransport(localsock)
+        remotetransport = SocketSyncTransport(remotesock)
+        server = threading.Thread(target = remote.serve, args = (remotetransport,))
+        server.start()
+        try:
+            return getattr(local, method)(localtransport)
+        finally:
+            server.join(10)
+            localtransport.close()
+            remotetransport.close()
+
+    def test_pull_push(self):
+        local = self.load_peer()
+        remote = self.load_peer()
+        self.modify(remote.dictmdl)
+        self.assertNotEqual(self.get_words(local.dictmdl), self.get_words(remote.dictmdl))
+
+        self.assertEqual(self.run_sync(local, remote, 'pull'), 3)
+        self.assertEqual(self.get_words(local.dictmdl), self.get_words(remote.dictmdl))
+        self.assertEqual(self.run_sync(local, remote, 'pull'), 0)
+
+        local.dictmdl.remove_word(3)
+        self.assertEqual(self.run_sync(local, remote, 'push'), 1)
+        self.assertEqual(self.get_words(local.dictmdl), self.get_words(remote.dictmdl))
+
+    def test_incremental_tree(self):
+        # The tree of an attached peer is kept between the changes, only the changed paths are rebuilt.
+        peer = self.load_peer()
+        span = peer.get_span(peer.get_maxguid() + 2000)
+        ranges = [(0, span)] + peer.split_range(0, span)
+        for low, high in ranges:
+            peer.get_node_hash(low, high)
+        self.modify(peer.dictmdl)
+        with peer.dictmdl.batch():
+            peer.dictmdl.remove_word(3)
+            noun = copy.copy(peer.dictmdl.get_word(4))
+            noun.hun.add('köteg')
+            peer.dictmdl.update_word(noun)
+            noun = copy.copy(noun)
+            noun.guid = peer.dictmdl.allocate_guid()
+            peer.dictmdl.add_word(noun)
+
+        fresh = DictMdlSyncPeer(peer.dictmdl)
+        self.assertEqual(peer.get_maxguid(), fresh.get_maxguid())
+        self.assertEqual([peer.get_node_hash(low, high) for low, high in ranges],
+                         [fresh.get_node_hash(low, high) for low, high in ranges])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import random
+import unittest
+from language.noun import Noun
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from dictmdl import DictModel
+from persistentmap import PersistentMap
+from undostack import DictMdlUndoStack
+
+class Test_PersistentMap(unittest.TestCase):
+
+    def test_versions(self):
+        rnd = random.Random(24)
+        pmap = PersistentMap.from_items((key, str(key)) for key in range(0, 3000, 3))
+        expected = {key: str(key) for key in range(0, 3000, 3)}
+        versions = [(pmap, dict(expected))]
+        for step in range(2000):
+            key = rnd.randrange(1 << rnd.choice((5, 12, 40)))
+            if (key in expected) and rnd.random() < 0.5:
+                pmap = pmap.remove(key)
+                del expected[key]
+            else:
+                pmap = pmap.set(key, step)
+                expected[key] = step
+            versions.append((pmap, dict(expected)))
+        # Every version is still intact.
+        for pmap, expected in versions[::97] + versions[-1:]:
+            self.assertEqual(len(pmap), len(expected))
+            self.assertEqual(list(pmap.items()), sorted(expected.items()))
+        self.assertIsNone(pmap.get(1 << 60))
+        with self.assertRaises(KeyError):
+            pmap.remove(1 << 60)
+        self.assertEqual(len(PersistentMap().set(7, 'x').remove(7)), 0)
+
+
+
+class Test_DictMdlUndoStack(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dictmdl = DictModel()
+        self.dictmdl.guid_alloc_en = True
+        self.dictmdl.add_words(self.create_noun(guid, 'Wort') for guid in range(5))
+        self.undostack = DictMdlUndoStack(self.dictmdl)
+        self.undostack.attach()
+        self.addCleanup(self.undostack.detach)
+        self.events = []
+        for eventclass in (EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch):
+            eventclass.subscribe(self.handler_event)
+            self.addCleanup(eventclass.unsubscribe, self.handler_event)
+
+    def create_noun(self, guid: int, text: str) -> Noun:
+        noun = Noun()
+        noun.guid = guid
+        noun.singular_exist = True
+        noun.nounsn = '{}{}'.format(text, guid)
+        noun.hun.add('szó')
+        return noun
+
+    def handler_event(self, event: object, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self.events.append(event.__class__)
+
+    def get_words(self) -> dict:
+        return {word.guid: (word.nounsn, frozenset(word.hun_view)) for word in self.dictmdl.get_wordlist()}
+
+    def test_undo_redo(self):
+        states = [self.get_words()]
+        self.dictmdl.add_word(self.create_noun(5, 'Neu'))
+        states.append(self.get_words())
+        # Edited in place: the previous state is kept by the stack, not by the word.
+        word = self.dictmdl.get_word(1)
+        word.nounsn = 'Haus'
+        word.hun.add('ház')
+        self.dictmdl.update_word(word)
+        states.append(self.get_words())
+        with self.dictmdl.batch():
+            self.dictmdl.remove_words([0, 2])
+            self.dictmdl.update_word(self.create_noun(3, 'Hof'))
+        states.append(self.get_words())
+        self.assertEqual(self.undostack.undo_count, 3)
+
+        self.events.clear()
+        for state in reversed(states[:-1]):
+            self.assertTrue(self.undostack.undo())
+            self.assertEqual(self.get_words(), state)
+        self.assertFalse(self.undostack.undo())
+        # The undo steps are replayed by the usual events, so the views follow them.
+        self.assertEqual(self.events, [EventWordBatch] * 3)
+
+        for state in states[1:]:
+            self.assertTrue(self.undostack.redo())
+            self.assertEqual(self.get_words(), state)
+        self.assertFalse(self.undostack.redo())
+
+        # A new change clears the redo steps.
+        self.undostack.undo()
+        self.dictmdl.remove_word(4)
+        self.assertEqual(self.undostack.redo_count, 0)
+        self.assertTrue(self.undostack.undo())
+        self.assertEqual(self.get_words(), states[-2])
+
+    def test_limit(self):
+        undostack = DictMdlUndoStack(self.dictmdl, limit = 2)
+        undostack.attach()
+        self.addCleanup(undostack.detach)
+        for guid in range(3):
+            self.dictmdl.remove_word(guid)
+        self.assertEqual(undostack.undo_count, 2)
+        self.assertTrue(undostack.undo())
+        self.assertTrue(undostack.undo())
+        self.assertFalse(undostack.undo())
+        self.assertEqual(sorted(self.dictmdl.get_wordguidlist()), [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
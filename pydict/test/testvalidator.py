@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from persistence import DictMdlLoadException
+from validator import XmlDictMdlValidator
+
+class Test_XmlDictMdlValidator(unittest.TestCase):
+
+    INVALID_DICT_TEXT = '''<?xml version='1.0' encoding='UTF-8'?>
+<Dictionary>
+  <WordCollection>
+    <Word>
+      <GUID>0x1</GUID>
+      <WordClass>Noun</WordClass>
+      <German><Article>dér</Article><Singular>Haus</Singular></German>
+    </Word>
+    <Word>
+      <GUID>1</GUID>
+      <WordClass>Verb</WordClass>
+    </Word>
+    <Bar/>
+    <Word>
+      <GUID>xyz</GUID>
+      <WordClass>Noun</WordClass>
+      <Foo/>
+    </Word>
+  </WordCollection>
+</Dictionary>
+'''
+
+    def validate_text(self, text: str) -> list:
+        fd, path = tempfile.mkstemp(suffix = '.xml')
+        try:
+            with os.fdopen(fd, 'w', encoding = 'UTF-8') as output:
+                output.write(text)
+            return XmlDictMdlValidator(path = path).validate()
+        finally:
+            os.remove(path)
+
+    def test_valid(self):
+        self.assertEqual(XmlDictMdlValidator(path = r'dict.xml').validate(), [])
+
+    def test_invalid(self):
+        issues = self.validate_text(self.INVALID_DICT_TEXT)
+        self.assertEqual([(issue.id, issue.xmlpath, issue.line) for issue in issues], [
+            (XmlDictMdlValidator.ID_INVALID_ARTICLE, 'WordCollection/Word[1]/German/Article', 7),
+            (DictMdlLoadException.ID_GUID_NOT_UNIQUE, 'WordCollection/Word[2]/GUID', 10),
+            (XmlDictMdlValidator.ID_UNKNOWN_WORDCLASS, 'WordCollection/Word[2]/WordClass', 11),
+            (DictMdlLoadException.ID_XML_INVALID_TAG, 'WordCollection/Bar', 13),
+            (XmlDictMdlValidator.ID_XML_SCHEMA_ERROR, 'WordCollection/Word[3]', 17),
+            (DictMdlLoadException.ID_XML_INVALID_TEXT, 'WordCollection/Word[3]/GUID', 15)])
+
+    def test_layout(self):
+        issues = self.validate_text('<Dictionary/>')
+        self.assertEqual([issue.id for issue in issues], [DictMdlLoadException.ID_XML_MISSING_TAG])
+        issues = self.validate_text('<Dictionary><WordCollection><Word></WordCollection></Dictionary>')
+        self.assertEqual([issue.id for issue in issues], [XmlDictMdlValidator.ID_XML_SYNTAX_ERROR])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+from language.noun import Noun
+from language.article import GrammaticalGender
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from persistence import XmlDictMdlPersistence
+from journal import DictMdlJournal
+from watcher import DictMdlWatcher
+
+class Test_DictMdlWatcher(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmpdir.name, 'dict.xml')
+        shutil.copyfile(r'dict.xml', self.xml_path)
+        self.xmldmp = XmlDictMdlPersistence(path = self.xml_path)
+        self.xmldmp.load_dict()
+        self.watcher = DictMdlWatcher(self.xmldmp.dictmdl, self.xml_path)
+        self.watcher.attach()
+        self.events = []
+        for eventclass in (EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch):
+            eventclass.subscribe(self.handler_event)
+            self.addCleanup(eventclass.unsubscribe, self.handler_event)
+
+    def tearDown(self):
+        self.watcher.detach()
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def handler_event(self, event: object, *args, **kwargs) -> None:
+        if event.dictmdl is not self.xmldmp.dictmdl:
+            return
+        if isinstance(event, EventWordBatch):
+            self.events.append((event.__class__, event.added, event.removed, event.updated))
+        else:
+            self.events.append((event.__class__, event.guid))
+
+    def get_words(self, dictmdl: object) -> dict:
+        # The order of the Hungarian translations is not stable, so the words are compared by value.
+        return {word.guid: (word.gender, word.singular_exist, word.plural_exist, word.nounsn, word.nounpl,
+                frozenset(word.hun_view)) for word in dictmdl.get_wordlist()}
+
+    def edit_file(self) -> XmlDictMdlPersistence:
+        dmp = XmlDictMdlPersistence(path = self.xml_path)
+        dmp.load_dict()
+        noun = Noun()
+        noun.guid = dmp.dictmdl.allocate_guid()
+        noun.gender = GrammaticalGender.NEUTRAL
+        noun.singular_exist = True
+        noun.nounsn = 'Haus'
+        noun.hun.update(['ház'])
+        dmp.dictmdl.add_word(noun)
+        updated = dmp.dictmdl.get_word(1)
+        updated.hun.add('látogató')
+        dmp.dictmdl.update_word(updated)
+        dmp.dictmdl.remove_word(2)
+        dmp.save_dict()
+        return dmp
+
+    def test_external_change(self):
+        self.assertEqual(self.watcher.poll(), 0)
+        unchanged = self.xmldmp.dictmdl.get_word(3)
+        self.events.clear()
+
+        edited = self.edit_file()
+        self.assertEqual(self.watcher.poll(), 3)
+        newguid = max(edited.dictmdl.get_wordguidlist())
+        self.assertEqual(self.events, [(EventWordBatch, [range(newguid, newguid + 1)], [range(2, 3)], [range(1, 2)])])
+        self.assertEqual(self.get_words(self.xmldmp.dictmdl), self.get_words(edited.dictmdl))
+        self.assertIs(self.xmldmp.dictmdl.get_word(3), unchanged)
+        self.assertEqual(self.watcher.poll(), 0)
+
+    def test_own_save(self):
+        # The file saved by the model holds an earlier state, the later edits are kept.
+        self.xmldmp.save_dict()
+        self.xmldmp.dictmdl.save_finished.emit(self.xml_path)
+        word = self.xmldmp.dictmdl.get_word(1)
+        word.hun.add('helyi')
+        self.xmldmp.dictmdl.update_word(word)
+        self.assertEqual(self.watcher.poll(), 0)
+        self.assertIn('helyi', self.xmldmp.dictmdl.get_word(1).hun_view)
+
+    def test_journal_edits_kept(self):
+        # The edits kept only in the journal survive a touch of the file and an external edit.
+        journal_path = os.path.join(self.tmpdir.name, 'dict.journal')
+        journal = DictMdlJournal(dictmdl = self.xmldmp.dictmdl, path = journal_path, basepath = self.xml_path)
+        journal.attach()
+        self.addCleanup(journal.detach)
+        self.assertEqual(self.watcher.poll(), 0)
+        dictmdl = self.xmldmp.dictmdl
+        noun = Noun()
+        # Not the guid allocated by the external edit, which would be a conflict.
+        noun.guid = dictmdl.allocate_guid() + 100
+        noun.singular_exist = True
+        noun.nounsn = 'Journal'
+        dictmdl.add_word(noun)
+        word = dictmdl.get_word(4)
+        word.hun.add('napló')
+        dictmdl.update_word(word)
+        dictmdl.remove_word(5)
+        journal.flush()
+        expected = self.get_words(dictmdl)
+
+        with open(self.xml_path, 'a') as fd:
+            fd.write('\n')
+        self.assertEqual(self.watcher.poll(), 0)
+        self.assertEqual(self.get_words(dictmdl), expected)
+
+        # The external edit is applied, the journal edits are kept.
+        edited = self.edit_file()
+        self.assertEqual(self.watcher.poll(), 3)
+        self.assertEqual(self.watcher.conflicts, [])
+        expected.pop(2)
+        expected[1] = self.get_words(edited.dictmdl)[1]
+        newguid = max(edited.dictmdl.get_wordguidlist())
+        expected[newguid] = self.get_words(edited.dictmdl)[newguid]
+        self.assertEqual(self.get_words(dictmdl), expected)
+        journal.flush()
+
+        # The journal replayed over the changed file gives the same model.
+        replayed = XmlDictMdlPersistence(path = self.xml_path)
+        replayed.load_dict()
+        replay_journal = DictMdlJournal(dictmdl = replayed.dictmdl, path = journal_path, basepath = self.xml_path)
+        replay_journal.replay()
+        self.assertEqual(self.get_words(replayed.dictmdl), self.get_words(dictmdl))
+        self.assertIn(noun.guid, replayed.dictmdl)
+        self.assertNotIn(5, replayed.dictmdl)
+        self.assertIn('napló', replayed.dictmdl.get_word(4).hun_view)
+
+    def test_conflict(self):
+        self.assertEqual(self.watcher.poll(), 0)
+        word = self.xmldmp.dictmdl.get_word(1)
+        word.hun.add('helyi')
+        self.xmldmp.dictmdl.update_word(word)
+        self.edit_file()
+        self.assertEqual(self.watcher.poll(), 2)
+        self.assertEqual([conflict.guid for conflict in self.watcher.conflicts], [1])
+        self.assertIn('helyi', self.xmldmp.dictmdl.get_word(1).hun_view)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import logging
+from collections import deque
+from dictmdl import DictModel
+from event import EventWordAdded, EventWordRemoved, EventWordUpdated, EventWordBatch
+from event import Signal
+from binpersistence import BinDictMdlPersistence
+from persistentmap import PersistentMap
+from lazydictmdl import LazyDictModel
+
+logger = logging.getLogger(__name__)
+
+
+class DictMdlUndoStack(object):
+    """Undo and redo of the word changes of a dictionary model.
+
+    The state of the model is a PersistentMap from guid to the word packed by
+    BinDictMdlPersistence.pack_word, which is immutable. Every word event (and every batch as a
+    whole) is a step: the state before the change and the guids changed by it. A new state
+    shares every unchanged node with the previous one, so a step costs O(log n) new nodes
+    instead of a copy of the words.
+
+    undo and redo apply the difference of the current and the restored state to the model in
+    a batch, so the other components (WordListModel, the journal) follow them by the usual
+    events. A new change clears the redo steps, beyond limit the oldest steps are dropped.
+    changed is emitted when a step is recorded, undone or redone.
+    """
+
+    DEFAULT_LIMIT = 1000
+
+
+    def __init__(self, dictmdl: DictModel, limit: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.dictmdl = dictmdl
+        self._codec = BinDictMdlPersistence()
+        self._undo = deque(maxlen = self.DEFAULT_LIMIT if limit is None else limit)
+        self._redo = []
+        self._replaying = False
+        self.changed = Signal()
+        if isinstance(self.dictmdl, LazyDictModel):
+            # The snapshot records are packed already, the words are not built.
+            self._state = PersistentMap.from_items((record[0], self._codec.repack_record(record, heap))
+                                                   for record, heap in self.dictmdl.iter_records())
+        else:
+            self._state = PersistentMap.from_items((word.guid, self._codec.pack_word(word))
+                                                   for word in self.dictmdl.get_wordlist())
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+
+    @property
+    def limit(self) -> int:
+        return self._undo.maxlen
+
+    @property
+    def undo_count(self) -> int:
+        return len(self._undo)
+
+    @property
+    def redo_count(self) -> int:
+        return len(self._redo)
+
+
+    def attach(self) -> None:
+        EventWordAdded.subscribe(self.handler_word_added)
+        EventWordRemoved.subscribe(self.handler_word_removed)
+        EventWordUpdated.subscribe(self.handler_word_updated)
+        EventWordBatch.subscribe(self.handler_word_batch)
+
+    def detach(self) -> None:
+        EventWordAdded.unsubscribe(self.handler_word_added)
+        EventWordRemoved.unsubscribe(self.handler_word_removed)
+        EventWordUpdated.unsubscribe(self.handler_word_updated)
+        EventWordBatch.unsubscribe(self.handler_word_batch)
+
+
+    def undo(self) -> bool:
+        """Reverts the last step, returns False if there is nothing to undo."""
+        if not self._undo:
+            return False
+        state, guids = self._undo.pop()
+        self._redo.append((self._state, guids))
+        self._restore(state, guids)
+        return True
+
+
+    def redo(self) -> bool:
+        """Applies the last undone step again, returns False if there is nothing to redo."""
+        if not self._redo:
+            return False
+        state, guids = self._redo.pop()
+        self._undo.append((self._state, guids))
+        self._restore(state, guids)
+        return True
+
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self.changed.emit()
+
+
+    def _restore(self, state: PersistentMap, guids: tuple) -> None:
+        self._replaying = True
+        try:
+            with self.dictmdl.batch():
+                for guid in guids:
+                    record = state.get(guid)
+                    if record is None:
+                        if guid in self.dictmdl:
+                            self.dictmdl.remove_word(guid)
+                    elif guid in self.dictmdl:
+                        self.dictmdl.update_word(self._codec.unpack_word(record))
+                    else:
+                        self.dictmdl.add_word(self._codec.unpack_word(record))
+        finally:
+            self._replaying = False
+            self._state = state
+        self.changed.emit()
+
+
+    def _record(self, removed: object, changed: object) -> None:
+        # removed are the guids of the removed words, changed of the added and updated ones.
+        if self._replaying:
+            return
+        state = self._state
+        guids = []
+        for guid in removed:
+            if guid in state:
+                state = state.remove(guid)
+            guids.append(guid)
+        for guid in changed:
+            state = state.set(guid, self._codec.pack_word(self.dictmdl.get_word(guid)))
+            guids.append(guid)
+        self._undo.append((self._state, tuple(guids)))
+        self._redo.clear()
+        self._state = state
+        self.changed.emit()
+
+
+    def handler_word_added(self, event: EventWordAdded, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._record((), (event.guid,))
+
+    def handler_word_removed(self, event: EventWordRemoved, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._record((event.guid,), ())
+
+    def handler_word_updated(self, event: EventWordUpdated, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._record((), (event.guid,))
+
+    def handler_word_batch(self, event: EventWordBatch, *args, **kwargs) -> None:
+        if event.dictmdl is self.dictmdl:
+            self._record(EventWordBatch.iter_guids(event.removed),
+                         EventWordBatch.iter_guids(event.added + event.updated))
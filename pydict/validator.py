@@ -0,0 +1,157 @@
+import sys
+import logging
+from collections import namedtuple
+from lxml import etree
+from persistence import XmlDictMdlPersistence, DictMdlLoadException
+
+logger = logging.getLogger(__name__)
+
+
+# A problem of a dictionary file: the id (one of the DictMdlLoadException ids or of the
+# XmlDictMdlValidator ids), the xmlpath and source line of the element, and a description.
+DictMdlValidationIssue = namedtuple('DictMdlValidationIssue', ['id', 'xmlpath', 'line', 'message'])
+
+
+class XmlDictMdlValidator(XmlDictMdlPersistence):
+    """Reports every problem of a dictionary file in one streaming pass, without building a model.
+
+    Every <Word> is checked against the precompiled RelaxNG schema of WORD_SCHEMA_TEXT (compiled
+    once per process), then by the checks of the load: GUID text, duplicate GUIDs, WordClass
+    and article text. The problems of the file layout (root, WordCollection and the elements
+    of WordCollection) are reported as by the load. Only a syntax error stops the validation.
+    """
+
+    ID_XML_SYNTAX_ERROR = 'XmlSyntaxError'
+    ID_XML_SCHEMA_ERROR = 'XmlSchemaError'
+    ID_UNKNOWN_WORDCLASS = 'UnknownWordClass'
+    ID_INVALID_ARTICLE = 'InvalidArticle'
+
+    WORD_SCHEMA_TEXT = '''
+        <element name="Word" xmlns="http://relaxng.org/ns/structure/1.0">
+          <interleave>
+            <element name="GUID"><text/></element>
+            <element name="WordClass"><text/></element>
+            <optional>
+              <element name="German">
+                <interleave>
+                  <optional><element name="Article"><text/></element></optional>
+                  <optional><element name="Singular"><text/></element></optional>
+                  <optional><element name="Plural"><text/></element></optional>
+                </interleave>
+              </element>
+            </optional>
+            <optional><element name="Hungarian"><text/></element></optional>
+          </interleave>
+        </element>'''
+
+    _word_schema = None
+
+
+    @classmethod
+    def get_word_schema(cls) -> etree.RelaxNG:
+        if XmlDictMdlValidator._word_schema is None:
+            XmlDictMdlValidator._word_schema = etree.RelaxNG(etree.fromstring(cls.WORD_SCHEMA_TEXT))
+        return XmlDictMdlValidator._word_schema
+
+
+    def validate(self) -> list:
+        """Returns the DictMdlValidationIssue list of the file, empty if the file is valid."""
+        self._issues = []
+        self._guids = {}
+        depth = 0
+        xmlroot = None
+        xmlwordcoll = None
+        wordcntr = 0
+
+        try:
+            with self._open_load() as input:
+                for event, element in etree.iterparse(input, events = ('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 1:
+                            xmlroot = element
+                            if element.tag != self.XML_ROOT_TAG:
+                                self._add_issue(DictMdlLoadException.ID_XML_INVALID_TAG, '.', element,
+                                                'expected {}, found {}'.format(self.XML_ROOT_TAG, element.tag))
+                        elif (depth == 2) and (xmlwordcoll is None) and (element.getprevious() is None):
+                            xmlwordcoll = element
+                            if element.tag != self.XML_WORDCOLL_TAG:
+                                self._add_issue(DictMdlLoadException.ID_XML_INVALID_TAG, element.tag, element,
+                                                'expected {}, found {}'.format(self.XML_WORDCOLL_TAG, element.tag))
+                        continue
+
+                    depth -= 1
+                    if (depth == 2) and (element.getparent() is xmlwordcoll):
+                        if element.tag == self.XML_WORD_TAG:
+                            wordcntr += 1
+                            self._validate_word(element, wordcntr)
+                        elif isinstance(element.tag, str):
+                            self._add_issue(DictMdlLoadException.ID_XML_INVALID_TAG,
+                                            '{}/{}'.format(self.XML_WORDCOLL_TAG, element.tag), element,
+                                            'expected {}, found {}'.format(self.XML_WORD_TAG, element.tag))
+                        # Only the current element is kept in memory, as in the streaming load.
+                        element.clear()
+                        while element.getprevious() is not None:
+                            del xmlwordcoll[0]
+        except etree.XMLSyntaxError as ex:
+            self._issues.append(DictMdlValidationIssue(self.ID_XML_SYNTAX_ERROR, None, ex.lineno, ex.msg))
+            return self._issues
+
+        if (xmlroot is not None) and (xmlwordcoll is None):
+            self._add_issue(DictMdlLoadException.ID_XML_MISSING_TAG, '.', xmlroot,
+                            'missing {}'.format(self.XML_WORDCOLL_TAG))
+        return self._issues
+
+
+    def _add_issue(self, id: str, xmlpath: str, element: etree._Element, message: str) -> None:
+        self._issues.append(DictMdlValidationIssue(id, xmlpath, element.sourceline, message))
+
+
+    def _validate_word(self, xmlword: etree._Element, wordidx: int) -> None:
+        self._xmlpathbase = xmlword
+        self._xmlpathidx = wordidx
+        try:
+            schema = self.get_word_schema()
+            if not schema.validate(xmlword):
+                for entry in schema.error_log:
+                    self._issues.append(DictMdlValidationIssue(self.ID_XML_SCHEMA_ERROR, self._getelementpath(xmlword),
+                                                               entry.line, entry.message))
+
+            xmlguid, xmlwordclass, xmlger, xmlhun = self._scan_children(xmlword, self.XML_WORD_SLOTS)
+            if xmlguid is not None:
+                guid = self._parse_guid(xmlguid.text)
+                if guid is None:
+                    self._add_issue(DictMdlLoadException.ID_XML_INVALID_TEXT, self._getelementpath(xmlguid), xmlguid,
+                                    'invalid GUID "{}"'.format(xmlguid.text))
+                elif guid in self._guids:
+                    self._add_issue(DictMdlLoadException.ID_GUID_NOT_UNIQUE, self._getelementpath(xmlguid), xmlguid,
+                                    'GUID {} is also used at line {}'.format(hex(guid), self._guids[guid]))
+                else:
+                    self._guids[guid] = xmlguid.sourceline
+
+            if (xmlwordclass is not None) and (xmlwordclass.text != self.XML_WORDCLASS_NOUN_TEXT):
+                self._add_issue(self.ID_UNKNOWN_WORDCLASS, self._getelementpath(xmlwordclass), xmlwordclass,
+                                'unknown WordClass "{}"'.format(xmlwordclass.text))
+
+            if xmlger is not None:
+                xmlarticle = self._scan_children(xmlger, self.XML_NOUN_GER_SLOTS)[0]
+                if (xmlarticle is not None) and (xmlarticle.text is not None) and (xmlarticle.text.strip() not in
+                        ('', self.XML_NOUN_GER_ART_DER_TEXT, self.XML_NOUN_GER_ART_DIE_TEXT, self.XML_NOUN_GER_ART_DAS_TEXT)):
+                    self._add_issue(self.ID_INVALID_ARTICLE, self._getelementpath(xmlarticle), xmlarticle,
+                                    'unknown article "{}"'.format(xmlarticle.text))
+        finally:
+            self._xmlpathbase = None
+
+
+
+def main(argv: list = None) -> int:
+    issuecnt = 0
+    for path in (sys.argv[1:] if argv is None else argv):
+        for issue in XmlDictMdlValidator(path = path).validate():
+            print('{}:{}: {} at {}: {}'.format(path, issue.line, issue.id, issue.xmlpath, issue.message))
+            issuecnt += 1
+    return 1 if issuecnt else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
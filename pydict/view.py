@@ -2,10 +2,12 @@ from PyQt5.QtWidgets import QStyle, QTabWidget, QListView, QSplitter, QLabel, QC
 from PyQt5.QtWidgets import QMenu, QAction
 from PyQt5.QtWidgets import QWidget, QMainWindow, QAbstractItemView, QApplication
 from PyQt5.QtWidgets import QVBoxLayout, QGridLayout, QHBoxLayout, QDialog
-from PyQt5.Qt import Qt, QPixmap, QIcon, QFont
+from PyQt5.Qt import Qt, QPixmap, QIcon, QFont, QKeySequence
 from PyQt5.QtCore import QObject, QSize, QRect, QAbstractListModel, QItemSelection, QModelIndex
 from PyQt5.QtCore import pyqtSignal, pyqtSlot
-from dictmdl import WordListModel, DictModel
+from dictmdl import DictModel
+from qtdictmdl import WordListModel
+from dictstats import DictMdlStatistics
 from language.noun import Noun
 from language.word import Word, WordClass
 from language.article import GrammaticalGender
@@ -125,11 +127,12 @@ class WordView(QWidget):
         self.parse_view()
         self.update_view()
         if self.word is not None:
+            # The model gets its own copy, the edited one stays with the view.
             if self.option == WordWidgetOption.WORD_EDIT_MODE:
-                event_wordupdreq = EventWordUpdateRequest(self.word)
+                event_wordupdreq = EventWordUpdateRequest(copy.copy(self.word))
                 event_wordupdreq.fire()
             elif self.option == WordWidgetOption.WORD_NEW_MODE:
-                event_wordaddreq = EventWordAddRequest(self.word)
+                event_wordaddreq = EventWordAddRequest(copy.copy(self.word))
                 event_wordaddreq.fire()
         self.event_accept.emit()
 
@@ -345,7 +348,8 @@ class WordEditView(QWidget):
             self.w_nounview.hide()
         elif word.get_wordclass() == WordClass.NOUN:
             self.l_empty.hide()
-            self.w_nounview.noun = word
+            # The view edits a copy, the word of the model may be shared with a snapshot being saved.
+            self.w_nounview.noun = copy.copy(word)
             self.w_nounview.show()
         else:
             raise NotImplementedError('Invalid WordClass in activate_wordview of {} class.'.format(self.__class__.__name__))
@@ -501,9 +505,55 @@ class PyDictCentralWidget(QWidget):
 
 
 
+class DictStatsView(QLabel):
+    """Status bar label of the statistics of the dictionary, hidden while stats is None."""
+
+    GENDER_TEXTS = {
+        GrammaticalGender.MASCULINE : 'der',
+        GrammaticalGender.NEUTRAL   : 'das',
+        GrammaticalGender.FEMININE  : 'die',
+        GrammaticalGender.PLURAL    : 'pl.'
+    }
+
+    def __init__(self, parent: QObject = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._stats = None
+        self.setVisible(False)
+
+
+    @property
+    def stats(self) -> DictMdlStatistics:
+        return self._stats
+
+    @stats.setter
+    def stats(self, value: DictMdlStatistics) -> None:
+        assert (value is None) or isinstance(value, DictMdlStatistics), 'The stats property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictMdlStatistics.__name__)
+        if self._stats is not None:
+            self._stats.changed.disconnect(self.update_view)
+        self._stats = value
+        if self._stats is not None:
+            self._stats.changed.connect(self.update_view)
+        self.setVisible(self._stats is not None)
+        self.update_view()
+
+
+    def update_view(self) -> None:
+        if self.stats is None:
+            self.setText('')
+            return
+        genders = ', '.join('{} {}'.format(self.GENDER_TEXTS[gender], self.stats.get_gender_count(gender))
+                            for gender in GrammaticalGender)
+        self.setText('{} words ({}) | {} without plural | {} without translation | {:.2f} translations/word'
+                     .format(self.stats.word_count, genders, self.stats.no_plural_count,
+                             self.stats.no_translation_count, self.stats.get_translations_per_word()))
+
+
+
 class PyDictAppView(QMainWindow):
     DESKTOP_DEFAULT_WIDTH = 1280
     DESKTOP_DEFAULT_HEIGHT = 720
+    STATUS_MESSAGE_TIMEOUT = 5000
 
     def __init__(self, qapp: QApplication = None, **kwargs):
         super().__init__(**kwargs)
@@ -526,10 +576,32 @@ class PyDictAppView(QMainWindow):
         self.act_save = QAction('&Save', None)
         self.mn_file.addAction(self.act_save)
 
+        self.mn_edit = self.menuBar().addMenu('&Edit')
+        self.act_undo = QAction('&Undo', None)
+        self.act_undo.setShortcut(QKeySequence.Undo)
+        self.act_undo.setEnabled(False)
+        self.act_redo = QAction('&Redo', None)
+        self.act_redo.setShortcut(QKeySequence.Redo)
+        self.act_redo.setEnabled(False)
+        self.mn_edit.addAction(self.act_undo)
+        self.mn_edit.addAction(self.act_redo)
+
         self.act_save.triggered.connect(self.handle_act_save_triggered)
         self.setCentralWidget(self.central_widget)
 
+        # Shown when the statistics are set, e.g. statsview.stats = DictMdlStatistics(dictmdl).
+        self.statsview = DictStatsView()
+        self.statusBar().addPermanentWidget(self.statsview)
+
 
     def handle_act_save_triggered(self, checked: bool) -> None:
         event_saveall = EventSaveAll()
         event_saveall.fire()
+
+    @pyqtSlot(str)
+    def handle_save_finished(self, path: str) -> None:
+        self.statusBar().showMessage('{} is saved.'.format(path), self.STATUS_MESSAGE_TIMEOUT)
+
+    @pyqtSlot(str, str)
+    def handle_save_failed(self, path: str, message: str) -> None:
+        self.statusBar().showMessage('{} cannot be saved: {}'.format(path, message))
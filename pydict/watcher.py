@@ -0,0 +1,151 @@
+import os
+import logging
+from lxml import etree
+from dictmdl import DictModel
+from persistence import XmlDictMdlPersistence, XmlLoadMode, DictMdlLoadException
+from dictdiff import ChangeType, diff_words, merge_words
+
+logger = logging.getLogger(__name__)
+
+
+class DictMdlWatcher(object):
+    """Applies the external changes of the dictionary file to the model.
+
+    The model is the file plus the changes kept only in the journal, so the model is not made
+    equal to the changed file. The words of the file as last seen (loaded, or saved by the
+    model) are the base: poll() three-way merges the base, the model and the changed file by
+    dictdiff.merge_words and applies the differences of the merged words to the model in one
+    batch. A word changed only in the file gets the change of the file, a word changed only in
+    the model keeps it. A word changed differently in both places is a conflict: the model
+    keeps its version and the conflict is logged and kept in conflicts.
+
+    The base is read from the file by the first poll() which finds it unchanged, and again after
+    every save of the model (reported by its save_finished signal), since the saved file holds
+    an earlier state of the model and is not applied. Without a base (a change before the first
+    read) the file is merged without a base: its new words are added and the differing words
+    are conflicts, nothing is removed.
+    """
+
+    def __init__(self, dictmdl: DictModel, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.dictmdl = dictmdl
+        self.path = path
+        self._stat = self._get_stat()
+        self._savedstat = None
+        self._base = None
+        self._attached = False
+        self.conflicts = []
+
+
+    @property
+    def dictmdl(self) -> DictModel:
+        return self._dictmdl
+
+    @dictmdl.setter
+    def dictmdl(self, value: DictModel) -> None:
+        assert isinstance(value, DictModel), 'The dictmdl property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, DictModel.__name__)
+        self._dictmdl = value
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        assert isinstance(value, str), 'The path property of {} class shall have {} type.'\
+               .format(self.__class__.__name__, str.__name__)
+        self._path = value
+        self._base = None
+
+
+    def attach(self) -> None:
+        if not self._attached:
+            # Called on the thread of the saver, before the next poll can see the saved file.
+            self.dictmdl.save_finished.connect(self.handle_save_finished)
+            self._attached = True
+
+    def detach(self) -> None:
+        if self._attached:
+            self.dictmdl.save_finished.disconnect(self.handle_save_finished)
+            self._attached = False
+
+
+    def _get_stat(self) -> tuple:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+    def _load_words(self) -> list:
+        """Returns the words of the file sorted by guid, None if it cannot be loaded."""
+        dmp = XmlDictMdlPersistence(load_mode = XmlLoadMode.STREAMING, dictmdl = DictModel(event_en = False),
+                                    path = self.path)
+        try:
+            dmp.load_dict()
+        except (DictMdlLoadException, etree.XMLSyntaxError, OSError) as ex:
+            logger.warning('The changed {} cannot be loaded, it is not applied: {}'.format(self.path, ex))
+            return None
+        return dmp.dictmdl.get_wordlist(is_ordered = True)
+
+
+    def _load_base(self, stat: tuple) -> None:
+        words = self._load_words()
+        # The base is kept only if the file was not changed during the load.
+        if (words is not None) and (self._get_stat() == stat):
+            self._base = words
+
+
+    def poll(self) -> int:
+        """Applies the changes of the file if it is changed since the last poll, returns the number of changed words."""
+        stat = self._get_stat()
+        if stat is None:
+            return 0
+        if (stat == self._stat) or (stat == self._savedstat):
+            # The file is the last seen one (or saved by the model), it is read as the base once.
+            self._stat = stat
+            if self._base is None:
+                self._load_base(stat)
+            return 0
+        # A failed load is not retried until the file is changed again (e.g. a write in progress is finished).
+        self._stat = stat
+
+        words = self._load_words()
+        if words is None:
+            return 0
+        if self._get_stat() == self._savedstat:
+            # Saved by the model while it was loaded.
+            return 0
+        return self.apply(words)
+
+
+    def apply(self, filewords: list) -> int:
+        """Merges the words of the changed file (sorted by guid) into the model, returns the number of changed words."""
+        ourwords = self.dictmdl.get_wordlist(is_ordered = True)
+        self.conflicts = []
+        merged = merge_words(self._base or (), ourwords, filewords, self.conflicts)
+        changes = list(diff_words(ourwords, merged))
+        self._base = filewords
+
+        added = [change.new for change in changes if change.changetype == ChangeType.ADDED]
+        removed = [change.guid for change in changes if change.changetype == ChangeType.REMOVED]
+        updated = [change.new for change in changes if change.changetype == ChangeType.UPDATED]
+        with self.dictmdl.batch():
+            self.dictmdl.remove_words(removed)
+            self.dictmdl.update_words(updated)
+            self.dictmdl.add_words(added)
+        if changes:
+            logger.info('{} is changed on disk: {} added, {} updated, {} removed words are applied.'
+                        .format(self.path, len(added), len(updated), len(removed)))
+        for conflict in self.conflicts:
+            logger.warning('The word {} is changed both in {} and in the model, the model version is kept.'
+                           .format(conflict.guid, self.path))
+        return len(changes)
+
+
+    def handle_save_finished(self, path: str) -> None:
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            self._savedstat = self._get_stat()
+            self._base = None